@@ -1,11 +1,11 @@
 import csv
 import time
 from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import NoSuchElementException
-from webdriver_manager.chrome import ChromeDriverManager
+
+from driver_cache import chrome_service
 
 def init_driver(headless=False):
     chrome_options = Options()
@@ -15,7 +15,7 @@ def init_driver(headless=False):
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--window-size=1920,1080")
     driver = webdriver.Chrome(
-        service=Service(ChromeDriverManager().install()),
+        service=chrome_service(),  # cached; webdriver_manager only runs when Chrome changes
         options=chrome_options
     )
     driver.implicitly_wait(10)
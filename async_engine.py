@@ -0,0 +1,370 @@
+import csv
+import time
+import asyncio
+import argparse
+import threading
+import itertools
+
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeout
+
+# ─── CONFIG ────────────────────────────────────────────────────────────────────
+BROWSERS             = 2       # browser processes
+CONTEXTS_PER_BROWSER = 8       # cookie/storage-isolated contexts, pages are spread across them
+CONCURRENCY          = 200     # pages open at once across everything
+HEADLESS             = True
+BLOCK_RESOURCES      = ("media", "font")  # request types aborted before they hit the network
+NAV_TIMEOUT_MS       = 30_000
+PAGE_LOAD_PAUSE      = 3       # same settle pauses as the Selenium scrapers
+POPUP_PAUSE          = 1
+DETAILS_PAUSE        = 1
+CLICK_PAUSE          = 1.0
+WAIT_TIMEOUT_MS      = 10_000
+
+
+# ─── ENGINE ────────────────────────────────────────────────────────────────────
+class AsyncEngine:
+    """
+    A few Chromium processes, many lightweight contexts, one event loop.
+
+    Every scrape is a coroutine that opens a page in the next context,
+    runs an extractor `async fn(page, url) -> dict` and closes the page.
+    A semaphore caps open pages at `concurrency`, so the number of
+    concurrent pages is a browser-memory decision, not a thread count.
+
+        async with AsyncEngine() as engine:
+            row = await engine.scrape(url, ff_product_data)
+    """
+
+    def __init__(self, browsers=BROWSERS, contexts_per_browser=CONTEXTS_PER_BROWSER,
+                 concurrency=CONCURRENCY, headless=HEADLESS, block=BLOCK_RESOURCES):
+        self.n_browsers = browsers
+        self.contexts_per_browser = contexts_per_browser
+        self.concurrency = concurrency
+        self.headless = headless
+        self.block = set(block or ())
+        self._pw = None
+        self._browsers = []
+        self._contexts = []
+        self._next_context = None
+        self._sem = None
+        self._relaunch = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def start(self):
+        self._pw = await async_playwright().start()
+        self._sem = asyncio.Semaphore(self.concurrency)
+        self._relaunch = asyncio.Lock()
+        for _ in range(self.n_browsers):
+            browser = await self._launch()
+            self._browsers.append(browser)
+            for _ in range(self.contexts_per_browser):
+                self._contexts.append(await self._new_context(browser))
+        self._next_context = itertools.cycle(range(len(self._contexts)))
+
+    async def _launch(self):
+        return await self._pw.chromium.launch(
+            headless=self.headless,
+            args=["--disable-dev-shm-usage", "--no-sandbox"],
+        )
+
+    async def _new_context(self, browser):
+        ctx = await browser.new_context(viewport={"width": 1920, "height": 1080})
+        ctx.set_default_timeout(WAIT_TIMEOUT_MS)
+        ctx.set_default_navigation_timeout(NAV_TIMEOUT_MS)
+        if self.block:
+            await ctx.route("**/*", self._route)
+        return ctx
+
+    async def _route(self, route):
+        if route.request.resource_type in self.block:
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def close(self):
+        for ctx in self._contexts:
+            await ctx.close()
+        for browser in self._browsers:
+            await browser.close()
+        if self._pw is not None:
+            await self._pw.stop()
+        self._contexts, self._browsers, self._pw = [], [], None
+
+    async def scrape(self, url, extract):
+        """Open `url` in a fresh page, run `extract(page, url)`, always close the page."""
+        async with self._sem:
+            i = next(self._next_context)
+            ctx = self._contexts[i]
+            try:
+                page = await ctx.new_page()
+            except Exception:
+                # context went away with its browser process; replace both and carry on
+                b = i // self.contexts_per_browser
+                async with self._relaunch:
+                    if not self._browsers[b].is_connected():
+                        print(f"⚠️ browser {b} died, relaunching")
+                        self._browsers[b] = await self._launch()
+                    if self._contexts[i] is ctx:
+                        self._contexts[i] = await self._new_context(self._browsers[b])
+                page = await self._contexts[i].new_page()
+            try:
+                return await extract(page, url)
+            finally:
+                await page.close()
+
+    async def map(self, urls, extract):
+        """
+        Scrape every URL concurrently; yields (url, row, error) as pages finish,
+        so callers can write rows without waiting for the slowest page.
+        Only `concurrency` coroutines exist at a time, however long `urls` is.
+        """
+        urls = iter(urls)
+        results = asyncio.Queue()
+
+        async def worker():
+            for url in urls:
+                try:
+                    await results.put((url, await self.scrape(url, extract), None))
+                except Exception as e:
+                    await results.put((url, None, e))
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        finished = asyncio.gather(*workers)
+        while not (finished.done() and results.empty()):
+            try:
+                yield await asyncio.wait_for(results.get(), timeout=0.5)
+            except asyncio.TimeoutError:
+                continue
+        await finished
+
+
+class ThreadedEngine:
+    """
+    Blocking front-end for thread-based callers (ff7's worker pool): the
+    engine runs on its own event-loop thread and scrape(url) waits for
+    the result, like TabPool.scrape().
+    """
+
+    def __init__(self, extract, **engine_kwargs):
+        self.extract = extract
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True,
+                                        name="async-engine")
+        self._thread.start()
+        self.engine = AsyncEngine(**engine_kwargs)
+        self._call(self.engine.start())
+
+    @property
+    def slots(self):
+        return self.engine.concurrency
+
+    def _call(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def scrape(self, url):
+        return self._call(self.engine.scrape(url, self.extract))
+
+    def close(self):
+        self._call(self.engine.close())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+
+
+# ─── EXTRACTORS ────────────────────────────────────────────────────────────────
+# Async ports of the Selenium extractors: same (page, url) → row shape as
+# ff7.extract_product_data and na-kd6.scrape_product.
+async def goto(page, url, settle):
+    await page.goto(url, wait_until="load")
+    await asyncio.sleep(settle)
+
+
+async def text_or_blank(page, selector):
+    loc = page.locator(selector).first
+    try:
+        return (await loc.inner_text(timeout=WAIT_TIMEOUT_MS)).strip()
+    except PlaywrightTimeout:
+        return ""
+
+
+async def ff_product_data(page, url):
+    """Farfetch product page → ff7's FIELDNAMES row."""
+    await goto(page, url, PAGE_LOAD_PAUSE)
+
+    popup = page.locator(
+        "xpath=//button[normalize-space(text())='×' or contains(@aria-label,'Close')]"
+    ).first
+    if await popup.count():
+        try:
+            await popup.click(timeout=2000)
+            await asyncio.sleep(POPUP_PAUSE)
+        except PlaywrightTimeout:
+            pass
+
+    out = {"Product URL": url, "Title": "", "Price": "", "Description": "", "Image URLs": ""}
+    out["Title"] = (await text_or_blank(
+        page, "h1[data-component='ProductName'], h1"
+    )).replace("\n", " ")
+    out["Price"] = await text_or_blank(
+        page, "p[data-component='PriceFinalLarge'], p[data-component='PriceCallout']"
+    )
+
+    # one round trip for every image src instead of one per element
+    srcs = await page.eval_on_selector_all(
+        "img[data-component='Img'], div[data-component='Container'] img",
+        "els => els.map(e => e.src)",
+    )
+    out["Image URLs"] = ";".join(dict.fromkeys(s for s in srcs if s))
+
+    try:
+        btn = page.locator(
+            "xpath=//p[@data-component='ButtonText' and normalize-space()='The Details']"
+            "/ancestor::button"
+        ).first
+        if await btn.get_attribute("data-expanded") == "false":
+            await btn.click()
+        await page.wait_for_function(
+            "el => el.getAttribute('data-expanded') === 'true'",
+            arg=await btn.element_handle(), timeout=5000,
+        )
+        await asyncio.sleep(DETAILS_PAUSE)
+        texts = await page.eval_on_selector_all(
+            "xpath=//div[@data-component='InnerPanel']/div/div[position()<=2]//p"
+            " | //div[@data-component='InnerPanel']/div/div[position()<=2]//li",
+            "els => els.map(e => e.innerText.trim()).filter(Boolean)",
+        )
+        out["Description"] = "\n\n".join(texts)
+    except PlaywrightTimeout:
+        pass
+
+    out["Description"] = " | ".join(
+        line for line in out["Description"].splitlines() if line.strip()
+    )
+    return out
+
+
+def parse_panel_text(text):
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    data, key = {}, None
+    for line in lines:
+        if line.endswith(":"):
+            key = line[:-1]
+            data[key] = []
+        elif key:
+            data[key].append(line)
+    return {header: "\n".join(items) for header, items in data.items()}
+
+
+async def nakd_accordion_section(page, identifier):
+    btn = page.locator(
+        f"button[data-id='{identifier}'], button[id='{identifier}'], "
+        f"button[data-identifier='{identifier}']"
+    ).first
+    await btn.click()
+    await asyncio.sleep(CLICK_PAUSE)
+    texts = await btn.locator("xpath=./parent::*/following-sibling::div").evaluate_all(
+        "els => els.filter(e => e.offsetParent !== null).map(e => e.innerText.trim()).filter(Boolean)"
+    )
+    sections = {}
+    for text in texts:
+        lines = [line.strip() for line in text.splitlines() if line.strip()]
+        if any(line.endswith(":") for line in lines):
+            sections.update(parse_panel_text(text))
+        else:
+            sections[lines[0]] = "\n".join(lines[1:])
+    return sections
+
+
+async def nakd_product(page, url):
+    """NA-KD product page → na-kd6.scrape_product's record."""
+    record = {"product_url": url, "price_with_usd": None, "color": None,
+              "materials_and_care": {}, "origin": {}}
+    await goto(page, url, 2.0)
+    try:
+        await page.locator("button[aria-label='Close']").first.click(timeout=WAIT_TIMEOUT_MS)
+        await asyncio.sleep(CLICK_PAUSE)
+    except PlaywrightTimeout:
+        pass
+
+    try:
+        price = await page.locator("span[itemprop='price']").first.get_attribute("content")
+        record["price_with_usd"] = f"USD {price}"
+    except PlaywrightTimeout:
+        print("  ! price error")
+    try:
+        record["color"] = (await page.locator(
+            "xpath=//span[contains(text(),'Color')]/following-sibling::span"
+        ).first.inner_text()).strip()
+    except PlaywrightTimeout:
+        print("  ! color error")
+    for key, ident in (("materials_and_care", "materials-care"), ("origin", "origin")):
+        try:
+            record[key] = await nakd_accordion_section(page, ident)
+        except Exception as e:
+            print(f"  ! {ident} error:", e)
+    return record
+
+
+EXTRACTORS = {
+    "ff": ff_product_data,
+    "nakd": nakd_product,
+}
+
+
+# ─── CLI ───────────────────────────────────────────────────────────────────────
+async def run_csv(site, in_csv, out_csv, url_column, **engine_kwargs):
+    extract = EXTRACTORS[site]
+    with open(in_csv, newline="", encoding="utf-8") as f:
+        urls = list(dict.fromkeys(
+            (r.get(url_column) or "").strip() for r in csv.DictReader(f)
+        ))
+    urls = [u for u in urls if u]
+
+    t0 = time.time()
+    done = failed = 0
+    with open(out_csv, "w", newline="", encoding="utf-8") as f:
+        writer = None
+        async with AsyncEngine(**engine_kwargs) as engine:
+            async for url, row, error in engine.map(urls, extract):
+                if error is not None:
+                    failed += 1
+                    print(f"  ❌ {url}: {error}")
+                    continue
+                if writer is None:
+                    writer = csv.DictWriter(f, fieldnames=list(row), extrasaction="ignore")
+                    writer.writeheader()
+                writer.writerow({k: (str(v) if isinstance(v, dict) else v) for k, v in row.items()})
+                done += 1
+                if done % 50 == 0:
+                    rate = done / (time.time() - t0) * 60
+                    print(f"🔍 {done}/{len(urls)} pages — {rate:.0f} pages/min")
+    print(f"✅ {done} scraped, {failed} failed — output in {out_csv}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scrape product pages with the async browser engine")
+    parser.add_argument("site", choices=sorted(EXTRACTORS))
+    parser.add_argument("input_csv")
+    parser.add_argument("output_csv")
+    parser.add_argument("--url-column", default="product_url")
+    parser.add_argument("--browsers", type=int, default=BROWSERS)
+    parser.add_argument("--contexts", type=int, default=CONTEXTS_PER_BROWSER,
+                        help="contexts per browser")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY)
+    parser.add_argument("--no-headless", dest="headless", action="store_false")
+    args = parser.parse_args()
+
+    asyncio.run(run_csv(
+        args.site, args.input_csv, args.output_csv, args.url_column,
+        browsers=args.browsers, contexts_per_browser=args.contexts,
+        concurrency=args.concurrency, headless=args.headless,
+    ))
+
+
+if __name__ == "__main__":
+    main()
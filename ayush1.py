@@ -1,22 +1,27 @@
 import os
 import time
+import shutil
 import csv
 import concurrent.futures
 from selenium import webdriver
 from selenium.webdriver.firefox.options import Options as FirefoxOptions
-from selenium.webdriver.firefox.firefox_profile import FirefoxProfile
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import NoSuchElementException
 
+from profile_templates import clone_template
+
+FARFETCH = "https://www.farfetch.com"
+
 def init_driver(headless=True, profile_dir=None, geckodriver_path=None):
     opts = FirefoxOptions()
     if headless:
         opts.headless = True
 
-    profile = FirefoxProfile(profile_dir) if profile_dir else None
+    if profile_dir:
+        # use the folder in place so a warm-up run can fill it
+        opts.add_argument("-profile")
+        opts.add_argument(profile_dir)
     driver_args = {"options": opts}
-    if profile:
-        driver_args["firefox_profile"] = profile
     if geckodriver_path:
         driver_args["executable_path"] = geckodriver_path
 
@@ -44,17 +49,26 @@ def sanitize_slug(url):
     slug = url.rstrip('/').split('/')[-2]
     return ''.join(ch if ch.isalnum() else '_' for ch in slug.lower()).strip('_')
 
+def farfetch_profile(profile_dir, geckodriver_path):
+    """
+    Profile for a new driver: the caller's own if given, else a fresh clone
+    of the warmed-up Farfetch template (newsletter popup already dismissed).
+    Returns (profile_dir, clone_to_delete_or_None).
+    """
+    if profile_dir:
+        return profile_dir, None
+    launch = lambda d: init_driver(headless=True, profile_dir=d,
+                                   geckodriver_path=geckodriver_path)
+    clone = clone_template(FARFETCH, launch)
+    return clone, clone
+
 def scrape_subcategory(section, url, visuals, profile_dir, geckodriver_path):
     """Worker: launch its own driver, scrape one sub-category, save URLs, then quit."""
+    profile, clone = farfetch_profile(profile_dir, geckodriver_path)
     driver = init_driver(headless=not visuals,
-                         profile_dir=profile_dir,
+                         profile_dir=profile,
                          geckodriver_path=geckodriver_path)
     try:
-        # suppress newsletter popup
-        driver.get("https://www.farfetch.com")
-        driver.execute_script("window.localStorage.setItem('newsletter_popup_shown','true');")
-        time.sleep(1)
-
         driver.get(url)
         time.sleep(2)
         close_signup_popup(driver)
@@ -104,6 +118,8 @@ def scrape_subcategory(section, url, visuals, profile_dir, geckodriver_path):
         print(f"✔ [{section}] {slug}: {len(all_urls)} URLs saved")
     finally:
         driver.quit()
+        if clone:
+            shutil.rmtree(clone, ignore_errors=True)
 
 def scrape_farfetch_clothing(visuals=False,
                             profile_dir=None,
@@ -114,13 +130,11 @@ def scrape_farfetch_clothing(visuals=False,
     sections = ["women", "men", "kids"]
     tasks = []
 
-    # one driver is enough to collect sub-cats
+    # one driver is enough to collect sub-cats (this also warms the profile template)
+    profile, clone = farfetch_profile(profile_dir, geckodriver_path)
     driver = init_driver(headless=True,
-                         profile_dir=profile_dir,
+                         profile_dir=profile,
                          geckodriver_path=geckodriver_path)
-    driver.get("https://www.farfetch.com")
-    driver.execute_script("window.localStorage.setItem('newsletter_popup_shown','true');")
-    time.sleep(1)
 
     for section in sections:
         driver.get(base.format(section=section))
@@ -141,6 +155,8 @@ def scrape_farfetch_clothing(visuals=False,
                 tasks.append((section, href))
 
     driver.quit()
+    if clone:
+        shutil.rmtree(clone, ignore_errors=True)
     print(f"→ Collected {len(tasks)} sub-categories; launching pool of {num_workers} workers…")
 
     # 2) dispatch workers
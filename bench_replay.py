@@ -0,0 +1,360 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import resource
+import tempfile
+import threading
+import contextlib
+import importlib.util
+import http.server
+import concurrent.futures
+
+try:
+    import psutil  # optional: browser-side CPU/RSS
+except ImportError:
+    psutil = None
+
+# ─── CONFIG ────────────────────────────────────────────────────────────────────
+FIXTURE_DIR  = "bench_fixtures"      # <site>/<kind>/<name>.html captured pages
+RESULTS_FILE = "bench_results.jsonl" # one JSON line per extractor per run
+HOST         = "127.0.0.1"
+WORKERS      = 2
+REPEAT       = 1                     # passes over the fixture set per worker pool
+
+# Block every host except the fixture server so a run never touches the network
+OFFLINE_RULES = f"MAP * ~NOTFOUND , EXCLUDE {HOST}"
+
+# name → (script, function, fixture folder, call style)
+#   "driver": fn(driver, url) with a driver the harness creates via the script's init_driver
+#   "self":   fn(url, ...) creates its own driver (listing crawlers)
+EXTRACTORS = {
+    "ff7":          ("ff7.py",                 "extract_product_data",   "farfetch/product", "driver"),
+    "asosdetails":  ("asosdetails.py",         "extract_product_info",   "asos/product",     "driver"),
+    "nulti":        ("nulti.py",               "scrape_product",         "nakd/product",     "driver"),
+    "na-kd6":       ("na-kd6.py",              "scrape_product",         "nakd/product",     "driver"),
+    "asos-listing": ("asos2folderdriver.py",   "scrape_category",        "asos/listing",     "self"),
+    "nakd-listing": ("dynamic-nakd.py",        "get_fully_rendered_html", "nakd/listing",    "self"),
+    "ff-listing":   ("ayush1.py",              "scrape_subcategory",     "farfetch/listing", "self"),
+}
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+# ─── FIXTURE SERVER ────────────────────────────────────────────────────────────
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def start_server(root):
+    """Serve `root` on an ephemeral port from a daemon thread."""
+    handler = lambda *a, **kw: QuietHandler(*a, directory=root, **kw)
+    server = http.server.ThreadingHTTPServer((HOST, 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{HOST}:{server.server_address[1]}"
+
+
+def fixture_urls(base_url, root, folder):
+    path = os.path.join(root, folder)
+    if not os.path.isdir(path):
+        return []
+    return [
+        f"{base_url}/{folder}/{fn}"
+        for fn in sorted(os.listdir(path)) if fn.endswith(".html")
+    ]
+
+
+# ─── SELENIUM INSTRUMENTATION ──────────────────────────────────────────────────
+round_trips = threading.local()
+
+
+def _trips():
+    return getattr(round_trips, "n", 0)
+
+
+@contextlib.contextmanager
+def instrumented_selenium():
+    """
+    Count WebDriver commands per thread and force every Chrome/Firefox the
+    scripts start into offline mode pointed only at the fixture server.
+    """
+    from selenium import webdriver
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+    orig_execute = WebDriver.execute
+    orig_chrome, orig_firefox = webdriver.Chrome, webdriver.Firefox
+
+    def counting_execute(self, *args, **kwargs):
+        round_trips.n = _trips() + 1
+        return orig_execute(self, *args, **kwargs)
+
+    class OfflineChrome(orig_chrome):
+        def __init__(self, *args, options=None, **kwargs):
+            options = options or webdriver.ChromeOptions()
+            options.add_argument("--headless=new")
+            options.add_argument(f"--host-resolver-rules={OFFLINE_RULES}")
+            super().__init__(*args, options=options, **kwargs)
+
+    class OfflineFirefox(orig_firefox):
+        def __init__(self, *args, options=None, **kwargs):
+            options = options or webdriver.FirefoxOptions()
+            options.add_argument("-headless")
+            options.set_preference("network.proxy.type", 1)
+            options.set_preference("network.proxy.http", "0.0.0.0")
+            options.set_preference("network.proxy.http_port", 1)
+            options.set_preference("network.proxy.ssl", "0.0.0.0")
+            options.set_preference("network.proxy.ssl_port", 1)
+            options.set_preference("network.proxy.no_proxies_on", HOST)
+            super().__init__(*args, options=options, **kwargs)
+
+    WebDriver.execute = counting_execute
+    webdriver.Chrome, webdriver.Firefox = OfflineChrome, OfflineFirefox
+    try:
+        yield
+    finally:
+        WebDriver.execute = orig_execute
+        webdriver.Chrome, webdriver.Firefox = orig_chrome, orig_firefox
+
+
+def load_script(filename, zero_pauses=False):
+    """Import one of our scripts by file name (several contain '-')."""
+    path = os.path.join(HERE, filename)
+    name = "bench_" + os.path.splitext(filename)[0].replace("-", "_")
+    spec = importlib.util.spec_from_file_location(name, path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    if zero_pauses:
+        for attr in dir(mod):
+            if attr.isupper() and attr.endswith("_PAUSE"):
+                setattr(mod, attr, 0)
+    return mod
+
+
+def make_driver(mod):
+    init = getattr(mod, "init_driver")
+    try:
+        return init(headless=True)
+    except TypeError:
+        return init()
+
+
+def call_self_driven(mod, fn_name, url):
+    """Listing crawlers write their CSVs relative to cwd (the run's workdir)."""
+    fn = getattr(mod, fn_name)
+    if fn_name == "scrape_category":
+        from selenium.webdriver.chrome.options import Options
+        return fn("bench", url, "asos", Options())
+    if fn_name == "scrape_subcategory":
+        # with no profile it would clone the Farfetch template, whose warm-up loads
+        # www.farfetch.com (blocked offline); an empty profile only loads the fixture
+        profile = tempfile.mkdtemp(prefix="profile-", dir=os.getcwd())
+        return fn("farfetch", url, False, profile, None)
+    return fn(url)
+
+
+# ─── RESOURCE SAMPLING ─────────────────────────────────────────────────────────
+def browser_processes():
+    if psutil is None:
+        return []
+    me = psutil.Process()
+    return [p for p in me.children(recursive=True)]
+
+
+def sample_browsers():
+    """(cpu seconds, rss bytes) summed over driver + browser child processes."""
+    cpu = rss = 0.0
+    for p in browser_processes():
+        try:
+            t = p.cpu_times()
+            cpu += t.user + t.system
+            rss += p.memory_info().rss
+        except psutil.Error:
+            pass
+    return cpu, rss
+
+
+class PeakSampler(threading.Thread):
+    """Polls child-process RSS while a benchmark runs and keeps the peak."""
+
+    def __init__(self, interval=0.5):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak_rss = 0.0
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.is_set():
+            self.peak_rss = max(self.peak_rss, sample_browsers()[1])
+            self._done.wait(self.interval)
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+# ─── BENCHMARK ─────────────────────────────────────────────────────────────────
+def run_extractor(name, base_url, root, workers, repeat, zero_pauses):
+    script, fn_name, folder, style = EXTRACTORS[name]
+    urls = fixture_urls(base_url, root, folder) * repeat
+    if not urls:
+        print(f"  – {name}: no fixtures under {os.path.join(root, folder)}, skipped")
+        return None
+
+    mod = load_script(script, zero_pauses=zero_pauses)
+    workdir = tempfile.mkdtemp(prefix=f"bench_{name}_")
+    local = threading.local()
+    drivers = []
+    drivers_lock = threading.Lock()
+    per_page = []
+    errors = []
+
+    def task(url):
+        start_trips = _trips()
+        t0 = time.perf_counter()
+        try:
+            if style == "driver":
+                if not hasattr(local, "driver"):
+                    local.driver = make_driver(mod)
+                    with drivers_lock:
+                        drivers.append(local.driver)
+                    start_trips = _trips()
+                    t0 = time.perf_counter()
+                getattr(mod, fn_name)(local.driver, url)
+            else:
+                call_self_driven(mod, fn_name, url)
+        except Exception as e:
+            errors.append(type(e).__name__)
+        per_page.append((time.perf_counter() - t0, _trips() - start_trips))
+
+    sampler = PeakSampler()
+    sampler.start()
+    cpu0, _ = sample_browsers()
+    py_cpu0 = time.process_time()
+    wall0 = time.perf_counter()
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as ex:
+            list(ex.map(task, urls))
+    finally:
+        os.chdir(cwd)
+    wall = time.perf_counter() - wall0
+    py_cpu = time.process_time() - py_cpu0
+    cpu1, _ = sample_browsers()
+    sampler.stop()
+
+    for drv in drivers:
+        with contextlib.suppress(Exception):
+            drv.quit()
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    pages = len(per_page)
+    latencies = sorted(t for t, _ in per_page)
+    return {
+        "extractor": name,
+        "pages": pages,
+        "workers": workers,
+        "errors": len(errors),
+        "error_types": sorted(set(errors)),
+        "wall_s": round(wall, 3),
+        "pages_per_s": round(pages / wall, 3) if wall else 0.0,
+        "p50_page_s": round(latencies[pages // 2], 3) if pages else 0.0,
+        "round_trips_per_page": round(sum(n for _, n in per_page) / pages, 1) if pages else 0.0,
+        "python_cpu_s_per_worker": round(py_cpu / workers, 3),
+        "browser_cpu_s_per_worker": round((cpu1 - cpu0) / workers, 3) if psutil else None,
+        "browser_peak_rss_mb_per_worker": round(sampler.peak_rss / workers / 2**20, 1) if psutil else None,
+        "python_max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def print_result(r):
+    print(
+        f"  ✔ {r['extractor']:13s} {r['pages']:4d} pages  {r['pages_per_s']:7.2f} pages/s  "
+        f"{r['round_trips_per_page']:6.1f} RT/page  err={r['errors']}  "
+        f"py_cpu/w={r['python_cpu_s_per_worker']}s  "
+        f"browser_cpu/w={r['browser_cpu_s_per_worker']}s  "
+        f"rss/w={r['browser_peak_rss_mb_per_worker']}MB"
+    )
+
+
+def cmd_run(args):
+    root = os.path.abspath(args.fixtures)
+    server, base_url = start_server(root)
+    print(f"▶ Serving fixtures from {root} at {base_url}")
+    names = args.extractors or list(EXTRACTORS)
+    unknown = [n for n in names if n not in EXTRACTORS]
+    if unknown:
+        print(f"Unknown extractor(s): {', '.join(unknown)}")
+        return
+    results = []
+    try:
+        with instrumented_selenium():
+            for name in names:
+                r = run_extractor(name, base_url, root, args.workers, args.repeat, args.zero_pauses)
+                if r:
+                    print_result(r)
+                    results.append(r)
+    finally:
+        server.shutdown()
+
+    stamp = time.strftime("%Y-%m-%dT%H:%M:%S")
+    with open(args.out, "a", encoding="utf-8") as f:
+        for r in results:
+            f.write(json.dumps({"ts": stamp, "label": args.label, **r}) + "\n")
+    print(f"✅ {len(results)} result(s) appended to {args.out}")
+
+
+# ─── FIXTURE CAPTURE ───────────────────────────────────────────────────────────
+def cmd_capture(args):
+    """Render live pages once and save their DOM as fixtures."""
+    from selenium import webdriver
+    opts = webdriver.ChromeOptions()
+    opts.add_argument("--headless=new")
+    driver = webdriver.Chrome(options=opts)
+    out_dir = os.path.join(args.fixtures, args.folder)
+    os.makedirs(out_dir, exist_ok=True)
+    try:
+        for i, url in enumerate(args.urls, start=1):
+            driver.get(url)
+            time.sleep(args.wait)
+            path = os.path.join(out_dir, f"{args.prefix}{i:03d}.html")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(driver.page_source)
+            print(f"  • {url} → {path}")
+    finally:
+        driver.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline fixture-replay benchmarks")
+    parser.add_argument("--fixtures", default=FIXTURE_DIR)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    run = sub.add_parser("run", help="benchmark extractors against saved fixtures")
+    run.add_argument("extractors", nargs="*", help=f"subset of: {', '.join(EXTRACTORS)}")
+    run.add_argument("--workers", type=int, default=WORKERS)
+    run.add_argument("--repeat", type=int, default=REPEAT)
+    run.add_argument("--zero-pauses", action="store_true",
+                     help="set every *_PAUSE constant in the script to 0")
+    run.add_argument("--label", default="", help="tag stored with the results")
+    run.add_argument("--out", default=RESULTS_FILE)
+
+    cap = sub.add_parser("capture", help="save live pages as fixtures")
+    cap.add_argument("folder", help="e.g. farfetch/product")
+    cap.add_argument("urls", nargs="+")
+    cap.add_argument("--prefix", default="page")
+    cap.add_argument("--wait", type=float, default=3)
+    args = parser.parse_args()
+
+    sys.path.insert(0, HERE)
+    if args.cmd == "run":
+        cmd_run(args)
+    else:
+        cmd_capture(args)
+
+
+if __name__ == "__main__":
+    main()
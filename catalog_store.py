@@ -0,0 +1,255 @@
+import os
+import csv
+import glob
+import json
+import time
+import sqlite3
+import argparse
+import threading
+
+from url_parse import parse_product_url
+
+# ─── CONFIG ────────────────────────────────────────────────────────────────────
+DB_PATH        = "catalog.sqlite"
+BATCH_SIZE     = 500          # rows per transaction when importing
+BUSY_TIMEOUT   = 30_000       # ms a writer waits for the lock before failing
+IMPORT_SOURCES = [
+    "scraped_results/*.csv",
+    "csv_with_image_paths/*.csv",
+    "nakd_product_details.csv",
+    "products.csv",
+    "farfetch_products.csv",
+]
+
+# the catalogue's own columns (site + item_id is the key)
+FIELDS = ["url", "title", "price", "brand", "category",
+          "description", "image_urls", "images_path"]
+
+# every header spelling the scrapers have used → catalogue column
+COLUMN_ALIASES = {
+    "Product URL": "url", "product_url": "url", "url": "url",
+    "Title": "title", "title": "title",
+    "Price": "price", "price": "price", "price_with_usd": "price",
+    "brand": "brand", "Brand": "brand",
+    "category": "category", "Category": "category",
+    "Description": "description", "description": "description",
+    "product_details": "description",
+    "Image URLs": "image_urls", "image_urls": "image_urls", "images": "image_urls",
+    "images_path": "images_path", "Saved Image Paths": "images_path",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    site        TEXT NOT NULL,
+    item_id     TEXT NOT NULL,
+    url         TEXT NOT NULL,
+    title       TEXT NOT NULL DEFAULT '',
+    price       TEXT NOT NULL DEFAULT '',
+    brand       TEXT NOT NULL DEFAULT '',
+    category    TEXT NOT NULL DEFAULT '',
+    description TEXT NOT NULL DEFAULT '',
+    image_urls  TEXT NOT NULL DEFAULT '',
+    images_path TEXT NOT NULL DEFAULT '',
+    extra       TEXT NOT NULL DEFAULT '{}',
+    updated_at  REAL NOT NULL,
+    PRIMARY KEY (site, item_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_products_site     ON products(site);
+CREATE INDEX IF NOT EXISTS idx_products_category ON products(site, category);
+CREATE INDEX IF NOT EXISTS idx_products_brand    ON products(brand);
+CREATE INDEX IF NOT EXISTS idx_products_url      ON products(url);
+"""
+
+
+def _fill_blank(col):
+    # keep a non-empty stored value, otherwise take the new one
+    return f"{col} = CASE WHEN products.{col} = '' THEN excluded.{col} ELSE products.{col} END"
+
+
+def _overwrite(col):
+    # take the new value unless it's empty
+    return f"{col} = CASE WHEN excluded.{col} = '' THEN products.{col} ELSE excluded.{col} END"
+
+
+def _upsert_sql(overwrite):
+    cols = ["site", "item_id"] + FIELDS + ["extra", "updated_at"]
+    setter = _overwrite if overwrite else _fill_blank
+    sets = [setter(c) for c in FIELDS]
+    sets.append("extra = json_patch(products.extra, excluded.extra)")
+    sets.append("updated_at = excluded.updated_at")
+    return (
+        f"INSERT INTO products ({', '.join(cols)}) "
+        f"VALUES ({', '.join('?' for _ in cols)}) "
+        f"ON CONFLICT(site, item_id) DO UPDATE SET {', '.join(sets)}"
+    )
+
+
+def normalize_row(row, category=""):
+    """
+    Map a scraper row (any of our CSV header spellings) onto catalogue
+    columns.  Unknown columns are kept in `extra`.
+    """
+    out = {f: "" for f in FIELDS}
+    extra = {}
+    for key, value in row.items():
+        if key is None:
+            continue
+        value = "" if value is None else str(value).strip()
+        col = COLUMN_ALIASES.get(key)
+        if col in out:
+            if value and not out[col]:
+                out[col] = value
+        elif value:
+            extra[key] = value
+    if category and not out["category"]:
+        out["category"] = category
+    return out, extra
+
+
+# ─── STORE ─────────────────────────────────────────────────────────────────────
+class CatalogStore:
+    """
+    SQLite product catalogue keyed by (site, item_id).
+
+    Each thread gets its own connection and the database runs in WAL mode,
+    so several scraper threads/processes can write while others read.
+    """
+
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT / 1000)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT}")
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # ── writes ──
+    def _params(self, row, category, now):
+        data, extra = normalize_row(row, category)
+        site, item_id = parse_product_url(data["url"])
+        return [site, item_id] + [data[f] for f in FIELDS] + [json.dumps(extra), now]
+
+    def upsert(self, row, category="", overwrite=False):
+        self.upsert_many([row], category=category, overwrite=overwrite)
+
+    def upsert_many(self, rows, category="", overwrite=False):
+        """
+        Insert or merge rows in one transaction.  By default a stored field
+        is only replaced when it is blank (what ff7's update_row_inplace did);
+        `overwrite=True` lets any non-empty new value win.
+        """
+        now = time.time()
+        params = [
+            self._params(r, category, now) for r in rows
+            if (r.get("Product URL") or r.get("product_url") or r.get("url") or "").strip()
+        ]
+        if not params:
+            return 0
+        conn = self._conn()
+        with conn:
+            conn.executemany(_upsert_sql(overwrite), params)
+        return len(params)
+
+    # ── reads ──
+    def get(self, url):
+        site, item_id = parse_product_url(url)
+        cur = self._conn().execute(
+            "SELECT * FROM products WHERE site = ? AND item_id = ?", (site, item_id)
+        )
+        rec = cur.fetchone()
+        if rec is None:
+            return None
+        return dict(zip([d[0] for d in cur.description], rec))
+
+    def is_complete(self, url, fields=("title", "price", "description", "image_urls")):
+        site, item_id = parse_product_url(url)
+        blanks = " OR ".join(f"{f} = ''" for f in fields)
+        rec = self._conn().execute(
+            f"SELECT ({blanks}) FROM products WHERE site = ? AND item_id = ?",
+            (site, item_id),
+        ).fetchone()
+        return rec is not None and not rec[0]
+
+    def pending(self, urls, fields=("title", "price", "description", "image_urls")):
+        """URLs (in input order) that are missing or have a blank field."""
+        return [u for u in urls if not self.is_complete(u, fields)]
+
+    def count(self, site=None, category=None, brand=None):
+        where, args = [], []
+        for col, val in (("site", site), ("category", category), ("brand", brand)):
+            if val is not None:
+                where.append(f"{col} = ?")
+                args.append(val)
+        sql = "SELECT COUNT(*) FROM products"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return self._conn().execute(sql, args).fetchone()[0]
+
+
+# ─── CSV IMPORT ────────────────────────────────────────────────────────────────
+def import_csv(store, csv_path, overwrite=False):
+    """Stream one CSV into the store in BATCH_SIZE transactions."""
+    category = os.path.splitext(os.path.basename(csv_path))[0]
+    total = 0
+    batch = []
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            batch.append(row)
+            if len(batch) >= BATCH_SIZE:
+                total += store.upsert_many(batch, category=category, overwrite=overwrite)
+                batch = []
+    if batch:
+        total += store.upsert_many(batch, category=category, overwrite=overwrite)
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Product catalogue (SQLite)")
+    parser.add_argument("--db", default=DB_PATH)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    imp = sub.add_parser("import", help="merge scraper CSVs into the catalogue")
+    imp.add_argument("paths", nargs="*", default=IMPORT_SOURCES,
+                     help="CSV files or glob patterns")
+    imp.add_argument("--overwrite", action="store_true",
+                     help="let new non-empty values replace stored ones")
+
+    stats = sub.add_parser("stats", help="row counts per site")
+    stats.add_argument("--site")
+    args = parser.parse_args()
+
+    store = CatalogStore(args.db)
+    if args.cmd == "import":
+        for pattern in args.paths:
+            for csv_path in sorted(glob.glob(pattern)):
+                n = import_csv(store, csv_path, overwrite=args.overwrite)
+                print(f"✔ {csv_path}: {n} rows merged")
+        print(f"✅ Catalogue now holds {store.count()} products → {args.db}")
+    elif args.cmd == "stats":
+        conn = store._conn()
+        sql = "SELECT site, COUNT(*) FROM products"
+        params = ()
+        if args.site:
+            sql += " WHERE site = ?"
+            params = (args.site,)
+        for site, n in conn.execute(sql + " GROUP BY site", params):
+            print(f"{site or '?':10s} {n}")
+    store.close()
+
+
+if __name__ == "__main__":
+    main()
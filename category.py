@@ -1,39 +1,95 @@
 import os
-import pandas as pd
+import csv
+from collections import deque
 
 # Fallback category for uncategorized URLs
 tFallback = 'others'
 
+# URLs buffered in memory before the links.txt files are appended to
+FLUSH_EVERY = 50_000
+
 
 def load_parent_categories(filepath='category_candidate.csv'):
     """
     Read parent categories from a CSV file (first column).
     Returns a list of category strings sorted by descending length.
     """
-    df = pd.read_csv(filepath, header=None)
-    categories = df.iloc[:, 0].dropna().astype(str).tolist()
+    # plain csv rather than pandas, so `scrape.py categorise` starts instantly
+    categories = list(iter_first_column(filepath))
     # sort by length to match longer tokens first
     categories.sort(key=len, reverse=True)
     return categories
 
 
+class CategoryMatcher:
+    """
+    Aho-Corasick automaton over the lower-cased categories, built once.
+
+    match() returns the same category the old nested loop picked: the
+    earliest entry in `categories` (longest first) that occurs anywhere
+    in the URL, found in a single pass over the URL's characters.
+    """
+
+    def __init__(self, categories):
+        self.categories = list(categories)
+        self.goto = [{}]
+        self.fail = [0]
+        none = len(self.categories)
+        self.best = [none]  # lowest category index ending at each state
+
+        for idx, cat in enumerate(self.categories):
+            state = 0
+            for ch in cat.lower():
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.best.append(none)
+                state = nxt
+            self.best[state] = min(self.best[state], idx)
+
+        # breadth-first: fail links, then fold each fail chain's best into the state
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            self.best[state] = min(self.best[state], self.best[self.fail[state]])
+            for ch, nxt in self.goto[state].items():
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                queue.append(nxt)
+
+    def match(self, url):
+        """Return the winning category for `url`, or tFallback."""
+        goto, fail, best = self.goto, self.fail, self.best
+        found = best[0]
+        state = 0
+        for ch in url.lower():
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if best[state] < found:
+                found = best[state]
+                if found == 0:
+                    break
+        if found < len(self.categories):
+            return self.categories[found]
+        return tFallback
+
+
 def categorize_urls(urls, categories):
     """
     Assign each URL to the first matching category (by substring).
     URLs with no match go into the fallback category.
     """
+    matcher = CategoryMatcher(categories)
     categorized = {cat: [] for cat in categories}
     categorized[tFallback] = []
     for url in urls:
-        url_lower = url.lower()
-        matched = False
-        for cat in categories:
-            if cat.lower() in url_lower:
-                categorized[cat].append(url)
-                matched = True
-                break
-        if not matched:
-            categorized[tFallback].append(url)
+        categorized[matcher.match(url)].append(url)
     return categorized
 
 
@@ -53,6 +109,56 @@ def write_categories(categorized, base_dir=None):
     print(f"Created {len(categorized)} categories under {base_dir}.")
 
 
+def categorize_and_write_stream(urls, categories, base_dir=None, flush_every=FLUSH_EVERY):
+    """
+    Streaming version of categorize_urls + write_categories: URLs are
+    bucketed as they are read and appended to each links.txt every
+    `flush_every` URLs, so memory stays flat however big the input is.
+    Returns {category: url_count}.
+    """
+    if base_dir is None:
+        base_dir = os.getcwd()
+    matcher = CategoryMatcher(categories)
+    counts = {cat: 0 for cat in categories}
+    counts[tFallback] = 0
+
+    # start every bucket empty, like write_categories did
+    for cat in counts:
+        dir_path = os.path.join(base_dir, cat)
+        os.makedirs(dir_path, exist_ok=True)
+        open(os.path.join(dir_path, 'links.txt'), 'w', encoding='utf-8').close()
+
+    buffers = {}
+    pending = 0
+
+    def flush():
+        for cat, lines in buffers.items():
+            with open(os.path.join(base_dir, cat, 'links.txt'), 'a', encoding='utf-8') as f:
+                f.write('\n'.join(lines) + '\n')
+        buffers.clear()
+
+    for url in urls:
+        cat = matcher.match(url)
+        buffers.setdefault(cat, []).append(url)
+        counts[cat] += 1
+        pending += 1
+        if pending >= flush_every:
+            flush()
+            pending = 0
+    flush()
+
+    print(f"Created {len(counts)} categories under {base_dir}.")
+    return counts
+
+
+def iter_first_column(csv_path):
+    """Yield the non-empty first-column values of a CSV without loading it."""
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        for row in csv.reader(f):
+            if row and row[0].strip():
+                yield row[0]
+
+
 def main():
     # 1) load parent categories
     parent_file = 'category_candidates.csv'
@@ -66,12 +172,9 @@ def main():
     if not os.path.exists(input_csv):
         print(f"Product URLs file '{input_csv}' not found.")
         return
-    df = pd.read_csv(input_csv, header=None)
-    urls = df.iloc[:, 0].dropna().astype(str).tolist()
 
-    # 3) categorize and write
-    categorized = categorize_urls(urls, categories)
-    write_categories(categorized)
+    # 3) categorize and write in one streaming pass
+    categorize_and_write_stream(iter_first_column(input_csv), categories)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,135 @@
+import os
+import csv
+import tempfile
+
+import pandas as pd
+
+from row_writer import repair_tail
+
+# ─── CONFIG ────────────────────────────────────────────────────────────────────
+STREAM_BYTES     = 256 << 20   # CSVs bigger than this are never loaded whole
+CHUNK_ROWS       = 50_000      # rows per chunk when streaming
+RESULTS_SUFFIX   = ".results"   # streamed results are appended here ("row,paths") until save()
+
+
+def is_blank(series):
+    """Vectorised "cell is empty": NaN, "" and whitespace-only all count."""
+    return series.fillna("").astype(str).str.strip().eq("")
+
+
+def _read_column(csv_path, column, chunksize=CHUNK_ROWS):
+    """Yield (first_row_index, list of cell strings) for one column, chunk by chunk."""
+    offset = 0
+    reader = pd.read_csv(csv_path, usecols=lambda c: c == column, dtype=str,
+                         keep_default_na=False, chunksize=chunksize)
+    for chunk in reader:
+        values = chunk[column].tolist() if column in chunk.columns else [""] * len(chunk)
+        yield offset, values
+        offset += len(chunk)
+
+
+class TaskTable:
+    """
+    The rows of one input CSV and the `path_col` results being filled in
+    for them, for the images8/images9 download loops.
+
+    Small CSVs are held as a DataFrame and checkpointed after every
+    result, as before.  CSVs over STREAM_BYTES are never loaded: planning
+    reads only the URL and path columns chunk by chunk, results are kept
+    in a {row: paths} dict and checkpointed as one appended line each in
+    <out_csv>.results; save() streams the input through once, fills in
+    `path_col` and drops the sidecar.  Either way the output has the
+    input's columns plus `path_col`.
+    """
+
+    def __init__(self, csv_path, out_csv, url_col, path_col, stream=None):
+        self.csv_path = csv_path
+        self.out_csv = out_csv
+        self.url_col = url_col
+        self.path_col = path_col
+        self.stream = os.path.getsize(csv_path) > STREAM_BYTES if stream is None else stream
+        self.results_path = out_csv + RESULTS_SUFFIX
+        self.resumed = os.path.exists(out_csv)
+        self._results = None
+
+        if not self.stream:
+            df = pd.read_csv(out_csv if self.resumed else csv_path)
+            # NaN (blank cell on reload) → "" so results can be assigned as strings
+            df[path_col] = df[path_col].fillna("").astype(str) if path_col in df.columns else ""
+            self.df = df
+            self.rows = len(df)
+            return
+
+        self.paths = {}
+        if self.resumed:
+            for offset, values in _read_column(out_csv, path_col):
+                self.paths.update((offset + i, p) for i, p in enumerate(values) if p.strip())
+        if os.path.exists(self.results_path):
+            # results checkpointed after the last save(); a crash may have cut the last line
+            self.resumed = True
+            repair_tail(self.results_path)
+            with open(self.results_path, newline="", encoding="utf-8") as f:
+                for row, paths in csv.reader(f):
+                    if paths.strip():
+                        self.paths[int(row)] = paths
+        self.rows = sum(len(values) for _, values in _read_column(csv_path, url_col))
+
+    def __len__(self):
+        return self.rows
+
+    @property
+    def done(self):
+        if self.stream:
+            return len(self.paths)
+        return int((~is_blank(self.df[self.path_col])).sum())
+
+    def pending(self):
+        """(row index, raw image-URL cell) for every row whose path_col is still empty."""
+        if not self.stream:
+            df = self.df
+            mask = is_blank(df[self.path_col])
+            if self.url_col in df.columns:
+                urls = df.loc[mask, self.url_col].fillna("").astype(str).tolist()
+            else:
+                urls = [""] * int(mask.sum())
+            return list(zip(df.index[mask].tolist(), urls))
+
+        out = []
+        for offset, values in _read_column(self.csv_path, self.url_col):
+            out.extend((offset + i, raw) for i, raw in enumerate(values) if offset + i not in self.paths)
+        return out
+
+    def set(self, row, paths):
+        if not self.stream:
+            self.df.at[row, self.path_col] = paths
+            self.df.to_csv(self.out_csv, index=False)
+            return
+        if not paths.strip():
+            return
+        self.paths[row] = paths
+        # O(1) checkpoint: the big output is only rewritten by save()
+        if self._results is None:
+            self._results = open(self.results_path, "a", newline="", encoding="utf-8")
+        csv.writer(self._results).writerow([row, paths])
+        self._results.flush()
+
+    def save(self):
+        if not self.stream:
+            self.df.to_csv(self.out_csv, index=False)
+            return
+        folder = os.path.dirname(os.path.abspath(self.out_csv))
+        fd, tmp = tempfile.mkstemp(dir=folder, prefix=".", suffix=".tmp")
+        os.close(fd)
+        offset = 0
+        for n, chunk in enumerate(pd.read_csv(self.csv_path, dtype=str, keep_default_na=False,
+                                              chunksize=CHUNK_ROWS)):
+            chunk[self.path_col] = [self.paths.get(offset + i, "") for i in range(len(chunk))]
+            chunk.to_csv(tmp, mode="w" if n == 0 else "a", header=n == 0, index=False)
+            offset += len(chunk)
+        os.replace(tmp, self.out_csv)
+        # everything in the sidecar is in the output now
+        if self._results is not None:
+            self._results.close()
+            self._results = None
+        if os.path.exists(self.results_path):
+            os.remove(self.results_path)
@@ -0,0 +1,118 @@
+import os
+import json
+import time
+
+from image_engine import is_complete_image, PART_SUFFIX
+
+# ─── CONFIG ────────────────────────────────────────────────────────────────────
+CACHE_NAME = ".disk_index.json"   # kept at the top of the tree it describes
+RACY_NS    = 2_000_000_000        # coarse-mtime filesystems: don't trust a folder touched this close to its scan
+
+
+class DiskIndex:
+    """
+    What's already on disk, from one os.scandir per folder.
+
+    Each folder maps file name → [size, mtime_ns, complete], where
+    `complete` (image_engine.is_complete_image) is only worked out when
+    someone asks and is then remembered.  With a cache_path the index is
+    saved between runs: a folder whose own mtime hasn't changed is not
+    listed again, and a file whose size + mtime haven't changed is not
+    re-read.  Downloads land via os.replace, which always bumps the
+    folder's mtime, so a stale folder can't look current.
+    """
+
+    def __init__(self, cache_path=None):
+        self.cache_path = cache_path
+        self._cache = {}
+        self._folders = {}   # abs folder → (dir_mtime_ns, scanned_ns, {name: [size, mtime_ns, complete]})
+        if cache_path:
+            try:
+                with open(cache_path, encoding="utf-8") as f:
+                    self._cache = json.load(f)
+            except (OSError, ValueError):
+                self._cache = {}
+
+    def _load(self, folder, dir_mtime):
+        cached = self._cache.get(folder)
+        if cached and cached[0] == dir_mtime and dir_mtime < cached[1] - RACY_NS:
+            self._folders[folder] = tuple(cached)
+            return cached[2]
+
+        old = cached[2] if cached else {}
+        files = {}
+        try:
+            with os.scandir(folder) as it:
+                for entry in it:
+                    if entry.name.endswith(PART_SUFFIX) or not entry.is_file():
+                        continue
+                    st = entry.stat()
+                    prev = old.get(entry.name)
+                    known = prev[2] if prev and prev[:2] == [st.st_size, st.st_mtime_ns] else None
+                    files[entry.name] = [st.st_size, st.st_mtime_ns, known]
+        except FileNotFoundError:
+            pass
+        self._folders[folder] = (dir_mtime, time.time_ns(), files)
+        return files
+
+    def scan_tree(self, root):
+        """Index every sub-folder of root (e.g. one CSV's row folders) with one extra scandir for root itself."""
+        root = os.path.abspath(root)
+        try:
+            with os.scandir(root) as it:
+                subdirs = [(e.path, e.stat().st_mtime_ns) for e in it if e.is_dir()]
+        except FileNotFoundError:
+            return 0
+        for path, mtime in subdirs:
+            if path not in self._folders:
+                self._load(path, mtime)
+        return len(subdirs)
+
+    def folder(self, path):
+        """{name: [size, mtime_ns, complete]} for one folder; {} if it doesn't exist."""
+        path = os.path.abspath(path)
+        hit = self._folders.get(path)
+        if hit is not None:
+            return hit[2]
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            self._folders[path] = (None, 0, {})
+            return {}
+        return self._load(path, mtime)
+
+    def _complete(self, folder, name, info):
+        if info[2] is None:
+            info[2] = is_complete_image(os.path.join(folder, name))
+        return info[2]
+
+    def complete_files(self, folder):
+        """Absolute paths of the complete images directly in `folder`."""
+        folder = os.path.abspath(folder)
+        return [os.path.join(folder, name) for name, info in self.folder(folder).items()
+                if self._complete(folder, name, info)]
+
+    def has_complete(self, path):
+        folder, name = os.path.split(os.path.abspath(path))
+        info = self.folder(folder).get(name)
+        return info is not None and self._complete(folder, name, info)
+
+    def size(self, path):
+        folder, name = os.path.split(os.path.abspath(path))
+        info = self.folder(folder).get(name)
+        return info[0] if info else None
+
+    def save(self):
+        if not self.cache_path:
+            return
+        cache = dict(self._cache)
+        for folder, (mtime, scanned, files) in self._folders.items():
+            if mtime is None:
+                cache.pop(folder, None)
+            else:
+                cache[folder] = [mtime, scanned, files]
+        os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+        tmp = self.cache_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(cache, f, separators=(",", ":"))
+        os.replace(tmp, self.cache_path)
@@ -1,13 +1,16 @@
-import requests
+import os
+import sys
+
+# http_pool lives in the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from http_pool import get_client
+from image_engine import fetch_sized
 
 # Image URL
 img_url = 'https://images.asos-media.com/products/adidas-football-bayern-munich-t-shirt-in-grey-marl/207197260-3?$n_1920w$&wid=1926&fit=constrain.jpeg'
 
-# Send GET request to fetch image
-response = requests.get(img_url)
-
-# Save image to a file
-with open('bayern_tshirt.jpg', 'wb') as f:
-    f.write(response.content)
+# Fetch the image (shared pooled client): the resized CDN variant first, the
+# original URL if that variant doesn't exist; raises on HTTP errors
+status, fetched = fetch_sized(img_url, 'bayern_tshirt.jpg', client=get_client())
 
-print("Image downloaded successfully as 'bayern_tshirt.jpg'.")
\ No newline at end of file
+print(f"Image {status} as 'bayern_tshirt.jpg' from {fetched}.")
@@ -0,0 +1,172 @@
+import os
+import re
+import json
+import shutil
+import argparse
+import threading
+import subprocess
+
+# ─── CONFIG ────────────────────────────────────────────────────────────────────
+CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "webscraping", "drivers.json")
+
+# first hit wins; absolute paths are checked as-is, names are looked up on PATH
+BROWSER_BINARIES = {
+    "chrome": [
+        "google-chrome", "google-chrome-stable", "chromium", "chromium-browser",
+        "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+    ],
+    "firefox": [
+        "firefox",
+        "/Applications/Firefox.app/Contents/MacOS/firefox",
+    ],
+}
+DRIVER_BINARIES = {
+    "chrome":  ["chromedriver", "/opt/homebrew/bin/chromedriver", "/usr/local/bin/chromedriver"],
+    "firefox": ["geckodriver", "/opt/homebrew/bin/geckodriver", "/usr/local/bin/geckodriver"],
+}
+ENV_OVERRIDES = {"chrome": "CHROMEDRIVER", "firefox": "GECKODRIVER"}
+
+_lock = threading.Lock()
+_resolved = {}   # per-process memo, so threads starting drivers don't even stat the cache
+
+
+# ─── HELPERS ───────────────────────────────────────────────────────────────────
+def _which(candidates):
+    for name in candidates:
+        if os.path.isabs(name):
+            if os.access(name, os.X_OK):
+                return name
+        else:
+            path = shutil.which(name)
+            if path:
+                return path
+    return None
+
+
+def _stamp(path):
+    """(size, mtime) of a binary: changes whenever the browser or driver is updated."""
+    try:
+        st = os.stat(path)
+    except (OSError, TypeError):
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def binary_version(path):
+    """'126.0.6478.61' from `<binary> --version`, or '' if it can't be run."""
+    try:
+        out = subprocess.run([path, "--version"], capture_output=True, text=True, timeout=15).stdout
+    except (OSError, subprocess.SubprocessError):
+        return ""
+    m = re.search(r"(\d+(?:\.\d+)+)", out)
+    return m.group(1) if m else ""
+
+
+def _major(version):
+    return version.split(".", 1)[0] if version else ""
+
+
+def _load_cache():
+    try:
+        with open(CACHE_PATH, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(cache):
+    os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+    tmp = CACHE_PATH + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(cache, f, indent=2)
+    os.replace(tmp, CACHE_PATH)
+
+
+# ─── RESOLUTION ────────────────────────────────────────────────────────────────
+def _download(browser):
+    """webdriver_manager as the last resort; imported only when we actually need it."""
+    try:
+        if browser == "chrome":
+            from webdriver_manager.chrome import ChromeDriverManager
+            return ChromeDriverManager().install()
+        from webdriver_manager.firefox import GeckoDriverManager
+        return GeckoDriverManager().install()
+    except ImportError:
+        return None
+
+
+def _find_driver(browser, browser_bin):
+    local = _which(DRIVER_BINARIES[browser])
+    if local is None:
+        return _download(browser)
+    # chromedriver only drives the Chrome major it was built for
+    if browser == "chrome" and browser_bin:
+        if _major(binary_version(local)) != _major(binary_version(browser_bin)):
+            return _download(browser) or local
+    return local
+
+
+def resolve_driver(browser, refresh=False):
+    """
+    Path of the driver binary for "chrome" or "firefox" (None → let Selenium
+    Manager decide).  $CHROMEDRIVER / $GECKODRIVER win; otherwise the answer
+    is cached in CACHE_PATH and reused until the browser or the driver
+    binary changes on disk, so a normal start costs two stat() calls.
+    """
+    env = os.environ.get(ENV_OVERRIDES[browser])
+    if env:
+        return env
+    with _lock:
+        if not refresh and browser in _resolved:
+            return _resolved[browser]
+
+        cache = _load_cache()
+        browser_bin = _which(BROWSER_BINARIES[browser])
+        entry = cache.get(browser) or {}
+        if (not refresh and "driver" in entry
+                and entry.get("browser") == browser_bin
+                and entry.get("browser_stamp") == _stamp(browser_bin)
+                and entry.get("driver_stamp") == _stamp(entry["driver"])):
+            _resolved[browser] = entry["driver"]
+            return entry["driver"]
+
+        driver = _find_driver(browser, browser_bin)
+        cache[browser] = {
+            "driver": driver,
+            "driver_stamp": _stamp(driver),
+            "driver_version": binary_version(driver) if driver else "",
+            "browser": browser_bin,
+            "browser_stamp": _stamp(browser_bin),
+            "browser_version": binary_version(browser_bin) if browser_bin else "",
+        }
+        _save_cache(cache)
+        _resolved[browser] = driver
+        return driver
+
+
+def chrome_service():
+    from selenium.webdriver.chrome.service import Service
+    path = resolve_driver("chrome")
+    return Service(path) if path else Service()
+
+
+def firefox_service():
+    from selenium.webdriver.firefox.service import Service
+    path = resolve_driver("firefox")
+    return Service(path) if path else Service()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show or refresh the cached driver binaries")
+    parser.add_argument("--refresh", action="store_true", help="re-resolve even if the cache is valid")
+    args = parser.parse_args()
+
+    for browser in ("chrome", "firefox"):
+        path = resolve_driver(browser, refresh=args.refresh)
+        entry = _load_cache().get(browser, {})
+        print(f"{browser:8s} driver {path or '(Selenium Manager)'} "
+              f"{entry.get('driver_version', '')} for browser {entry.get('browser_version') or '?'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import os
+import csv
+import time
+import tempfile
+import threading
+import contextlib
+
+try:
+    import fcntl  # POSIX: advisory lock shared with other processes
+except ImportError:
+    fcntl = None
+
+# ─── CONFIG ────────────────────────────────────────────────────────────────────
+FAILURES_CSV = "image_failures.csv"   # one log for every downloader + the validator
+FIELDS       = ["logged_at", "stage", "source", "row", "idx", "url", "path", "reason"]
+
+# what the downloaders used to write before this log existed
+LEGACY_LOGS  = ["output_csv_with_paths/failures_log.csv", "download/failed_downloads.csv"]
+
+_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def _locked(path):
+    """
+    Hold the log for one append/rewrite: the thread lock, plus flock on
+    <path>.lock so other processes (pool workers, a concurrent
+    `image_validate.py retry`) wait too.  Without fcntl (Windows) only
+    threads of this process are serialised.
+    """
+    with _lock:
+        if fcntl is None:
+            yield
+            return
+        with open(path + ".lock", "a") as lf:
+            fcntl.flock(lf, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lf, fcntl.LOCK_UN)
+
+
+def log_failures(records, path=FAILURES_CSV):
+    """
+    Append failure dicts (any subset of FIELDS) to the shared log.
+    Safe across threads, and across processes where fcntl exists.
+    """
+    records = list(records)
+    if not records:
+        return 0
+    now = time.strftime("%Y-%m-%d %H:%M:%S")
+    with _locked(path):
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        with open(path, "a", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS, extrasaction="ignore")
+            if new:
+                writer.writeheader()
+            for r in records:
+                writer.writerow({"logged_at": now, **r})
+    return len(records)
+
+
+def load_failures(path=FAILURES_CSV):
+    try:
+        with open(path, newline="", encoding="utf-8") as f:
+            return list(csv.DictReader(f))
+    except OSError:
+        return []
+
+
+def rewrite_failures(records, path=FAILURES_CSV, loaded=None):
+    """
+    Atomically replace the log, e.g. with what's left after a retry pass.
+    `loaded` is how many records the caller read with load_failures():
+    anything appended since then is kept after `records`, not dropped.
+    """
+    folder = os.path.dirname(os.path.abspath(path))
+    with _locked(path):
+        if loaded is not None:
+            records = list(records) + load_failures(path)[loaded:]
+        fd, tmp = tempfile.mkstemp(dir=folder, prefix=".", suffix=".tmp")
+        with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(records)
+        os.replace(tmp, path)
+
+
+def import_legacy(paths=LEGACY_LOGS):
+    """
+    Records from the old per-script logs: images9's failures_log.csv
+    (csv_name, row_number, raw_urls — one record per URL) and
+    download/failed_downloads.csv (Filename, Image_URL).
+    """
+    records = []
+    for path in paths:
+        for row in load_failures(path):
+            if "raw_urls" in row:
+                source = os.path.splitext(row.get("csv_name") or "")[0]
+                urls = [u.strip() for u in (row.get("raw_urls") or "").split(";") if u.strip()]
+                for idx, url in enumerate(urls, start=1):
+                    records.append({"stage": "images9", "source": source, "row": row.get("row_number", ""),
+                                    "idx": idx, "url": url, "reason": "no images downloaded"})
+            elif "Image_URL" in row:
+                folder = os.path.dirname(path)
+                records.append({"stage": "download", "source": os.path.basename(folder),
+                                "url": row["Image_URL"],
+                                "path": os.path.join(folder, row["Filename"]) if row.get("Filename") else "",
+                                "reason": "download failed"})
+    return records
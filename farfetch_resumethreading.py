@@ -6,12 +6,13 @@ import argparse
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.firefox.options import Options as FFOptions
-from selenium.webdriver.firefox.service import Service
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 import threading
 import concurrent.futures
 
+from driver_cache import firefox_service
+
 
 def init_driver(headless=True, profile_dir=None):
     """
@@ -28,7 +29,7 @@ def init_driver(headless=True, profile_dir=None):
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
         "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.5735.110 Safari/537.36"
     )
-    service = Service("/opt/homebrew/bin/geckodriver")
+    service = firefox_service()   # resolved once, cached until geckodriver/Firefox change
     driver = webdriver.Firefox(service=service, options=opts)
     driver.set_window_size(1920, 1080)
     driver.implicitly_wait(5)
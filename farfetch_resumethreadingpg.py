@@ -1,30 +1,36 @@
 import os
 import time
+import shutil
 import csv
 import random
 import argparse
 import threading
 import concurrent.futures
+from urllib.parse import urlsplit
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.firefox.options import Options as FFOptions
-from selenium.webdriver.firefox.service import Service
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from driver_cache import firefox_service
+from profile_templates import clone_template
+
 
 def init_driver(headless=True, profile_dir=None):
     opts = FFOptions()
     if headless:
         opts.headless = True
     if profile_dir:
-        opts.set_preference("profile", profile_dir)
+        # run in the folder itself, so a warm-up's cookies/localStorage stay there
+        opts.add_argument("-profile")
+        opts.add_argument(profile_dir)
     opts.set_preference(
         "general.useragent.override",
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
         "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/114.0.5735.110 Safari/537.36"
     )
-    service = Service("/opt/homebrew/bin/geckodriver")
+    service = firefox_service()   # resolved once, cached until geckodriver/Firefox change
     driver = webdriver.Firefox(service=service, options=opts)
     driver.set_window_size(1920, 1080)
     driver.implicitly_wait(5)
@@ -58,9 +64,14 @@ def process_batch(batch_pages, base_url, writer, csv_lock, failed_pages, failed_
     """
     Scrape a batch of pages using one driver instance, then quit.
     """
-    driver = init_driver(headless=headless, profile_dir=profile_dir)
-    driver.get("https://www.farfetch.com")
-    driver.execute_script("window.localStorage.setItem('newsletter_popup_shown','true');")
+    # newsletter_popup_shown & co. come from a profile warmed once per origin,
+    # not from a homepage load on every new driver
+    clone = None
+    if not profile_dir:
+        origin = urlsplit(base_url)
+        launch = lambda d: init_driver(headless=headless, profile_dir=d)
+        clone = clone_template(f"{origin.scheme}://{origin.netloc}", launch, site="farfetch")
+    driver = init_driver(headless=headless, profile_dir=profile_dir or clone)
 
     for page in batch_pages:
         page_url = f"{base_url}?page={page}"
@@ -99,6 +110,8 @@ def process_batch(batch_pages, base_url, writer, csv_lock, failed_pages, failed_
                 failed_pages.append(page)
         time.sleep(random.uniform(1, 3))
     driver.quit()
+    if clone:
+        shutil.rmtree(clone, ignore_errors=True)
 
 
 def scrape_women_clothing(
@@ -107,12 +120,12 @@ def scrape_women_clothing(
     headless: bool = True,
     profile_dir: str = None,
     workers: int = 4,
-    batch_size: int = 10
-):
+    batch_size: int = 10,
     # base_url = "https://www.farfetch.com/in/shopping/women/clothing-1/items.aspx"
     # out_file = "women.csv"1654
-    base_url = "https://www.farfetch.com/in/shopping/men/clothing-2/items.aspx"
-    out_file = "men.csv"
+    base_url: str = "https://www.farfetch.com/in/shopping/men/clothing-2/items.aspx",
+    out_file: str = "men.csv"
+):
     write_header = not os.path.exists(out_file) or start_page == 1
     mode = "w" if write_header else "a"
 
@@ -163,6 +176,10 @@ if __name__ == "__main__":
                         help="Number of parallel workers (drivers)")
     parser.add_argument("--batch-size", type=int, default=10,
                         help="Pages per driver session before restart")
+    parser.add_argument("--base-url",
+                        default="https://www.farfetch.com/in/shopping/men/clothing-2/items.aspx",
+                        help="Listing URL to paginate (e.g. a synthetic_shop.py instance)")
+    parser.add_argument("--out", default="men.csv")
     args = parser.parse_args()
 
     scrape_women_clothing(
@@ -170,7 +187,9 @@ if __name__ == "__main__":
         start_page=args.start_page,
         headless=not args.no_headless,
         workers=args.workers,
-        batch_size=args.batch_size
+        batch_size=args.batch_size,
+        base_url=args.base_url,
+        out_file=args.out
     )
 
 
@@ -1,12 +1,13 @@
 import os
 import glob
 import csv
-import time
-import tempfile
-import shutil
 import threading
-import concurrent.futures
 
+from stage_timing import StageTimer, stage, sleep, record_retry
+from resume_index import ResumeIndex, url_key
+from row_writer import CSVRowWriter
+from work_queue import CrossFileScheduler, FileJob
+from tab_pool import TabPool, BACKGROUND_TAB_ARGS
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
@@ -22,6 +23,12 @@ PAGE_LOAD_PAUSE = 3
 POPUP_PAUSE     = 1
 DETAILS_PAUSE    = 1
 WORKERS         = 4
+TABS_PER_BROWSER = 1                 # >1: each of the WORKERS browsers scrapes this many tabs at once
+BROWSER_ENGINE  = "selenium"         # "playwright": async engine, WORKERS browsers × ASYNC_PAGES open pages
+ASYNC_PAGES     = 64
+PARQUET_DIR     = None               # e.g. "parquet/scraped_results" to also stream rows to Parquet
+CATALOG_DB      = None               # e.g. "catalog.sqlite" to also upsert rows into the catalogue
+TIMINGS_LOG     = os.path.join(OUTPUT_DIR, "timings.jsonl")  # per-URL stage timings
 
 FIELDNAMES = ["Product URL", "Title", "Price", "Description", "Image URLs"]
 
@@ -30,13 +37,17 @@ drivers_list = []
 thread_local = threading.local()
 lock = threading.Lock()
 
-def init_driver(headless=True):
+def init_driver(headless=True, background_tabs=False):
     opts = Options()
     if headless:
         opts.add_argument("--headless")
         opts.add_argument("--disable-gpu")
     opts.add_argument("--no-sandbox")
     opts.add_argument("--disable-dev-shm-usage")
+    if background_tabs:
+        # keep tabs loading at full speed while another tab is in front
+        for arg in BACKGROUND_TAB_ARGS:
+            opts.add_argument(arg)
     drv = webdriver.Chrome(options=opts)
     drv.implicitly_wait(10)
     return drv
@@ -55,68 +66,79 @@ def close_signup_popup(driver):
             "//button[normalize-space(text())='×' or contains(@aria-label,'Close')]"
         )
         btn.click()
-        time.sleep(POPUP_PAUSE)
+        sleep("popup", POPUP_PAUSE)
     except NoSuchElementException:
         pass
 
 def extract_product_data(driver, url):
-    driver.get(url)
-    time.sleep(PAGE_LOAD_PAUSE)
-    close_signup_popup(driver)
+    with stage("navigate"):
+        driver.get(url)
+    sleep("page_load", PAGE_LOAD_PAUSE)
+    return parse_product_page(driver, url)
+
+def parse_product_page(driver, url):
+    """Scrape the product page already loaded in the driver's current tab."""
+    with stage("popup"):
+        close_signup_popup(driver)
 
     out = {"Product URL": url, "Title": "", "Price": "", "Description": "", "Image URLs": ""}
 
     # 1) Title
     try:
-        raw_title = driver.find_element(
-            By.CSS_SELECTOR, "h1[data-component='ProductName'], h1"
-        ).text.strip()
+        with stage("title"):
+            raw_title = driver.find_element(
+                By.CSS_SELECTOR, "h1[data-component='ProductName'], h1"
+            ).text.strip()
         out["Title"] = raw_title.replace("\n", " ")
     except:
         pass
 
     # 2) Price
     try:
-        out["Price"] = driver.find_element(
-            By.CSS_SELECTOR,
-            "p[data-component='PriceFinalLarge'], p[data-component='PriceCallout']"
-        ).text.strip()
+        with stage("price"):
+            out["Price"] = driver.find_element(
+                By.CSS_SELECTOR,
+                "p[data-component='PriceFinalLarge'], p[data-component='PriceCallout']"
+            ).text.strip()
     except:
         pass
 
     # 3) Images
     seen = set()
     urls = []
-    for img in driver.find_elements(
-        By.CSS_SELECTOR,
-        "img[data-component='Img'], div[data-component='Container'] img"
-    ):
-        src = img.get_attribute("src")
-        if src and src not in seen:
-            seen.add(src)
-            urls.append(src)
+    with stage("images"):
+        for img in driver.find_elements(
+            By.CSS_SELECTOR,
+            "img[data-component='Img'], div[data-component='Container'] img"
+        ):
+            src = img.get_attribute("src")
+            if src and src not in seen:
+                seen.add(src)
+                urls.append(src)
     out["Image URLs"] = ";".join(urls)
 
     # 4) Description
     try:
-        btn = driver.find_element(
-            By.XPATH,
-            "//p[@data-component='ButtonText' and normalize-space()='The Details']"
-            "/ancestor::button"
-        )
-        if btn.get_attribute("data-expanded") == "false":
-            btn.click()
-        WebDriverWait(driver, 5).until(
-            lambda d: btn.get_attribute("data-expanded") == "true"
-        )
-        time.sleep(DETAILS_PAUSE)
+        with stage("accordion"):
+            btn = driver.find_element(
+                By.XPATH,
+                "//p[@data-component='ButtonText' and normalize-space()='The Details']"
+                "/ancestor::button"
+            )
+            if btn.get_attribute("data-expanded") == "false":
+                btn.click()
+            WebDriverWait(driver, 5).until(
+                lambda d: btn.get_attribute("data-expanded") == "true"
+            )
+        sleep("details", DETAILS_PAUSE)
 
-        xpath = (
-            "//div[@data-component='InnerPanel']/div/div[position()<=2]//p"
-            " | //div[@data-component='InnerPanel']/div/div[position()<=2]//li"
-        )
-        elems = driver.find_elements(By.XPATH, xpath)
-        texts = [e.text.strip() for e in elems if e.text.strip()]
+        with stage("description"):
+            xpath = (
+                "//div[@data-component='InnerPanel']/div/div[position()<=2]//p"
+                " | //div[@data-component='InnerPanel']/div/div[position()<=2]//li"
+            )
+            elems = driver.find_elements(By.XPATH, xpath)
+            texts = [e.text.strip() for e in elems if e.text.strip()]
         out["Description"] = "\n\n".join(texts)
     except:
         pass
@@ -127,89 +149,161 @@ def extract_product_data(driver, url):
 
     return out
 
-# ─── FILE I/O & RESUME LOGIC ────────────────────────────────────────────────────
-def load_existing(output_path):
-    data = {}
-    if not os.path.isfile(output_path):
-        return data
-    with open(output_path, newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            data[row["Product URL"]] = row
-    return data
-
-def write_row_append(output_path, row):
-    is_new = not os.path.isfile(output_path)
-    with open(output_path, "a", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
-        if is_new:
-            writer.writeheader()
-        writer.writerow(row)
-
-def update_row_inplace(output_path, url, new_row):
-    temp_fd, temp_path = tempfile.mkstemp(text=True)
-    os.close(temp_fd)
-    with open(output_path, newline="", encoding="utf-8") as rf, \
-         open(temp_path, "w", newline="", encoding="utf-8") as wf:
-        reader = csv.DictReader(rf)
-        writer = csv.DictWriter(wf, fieldnames=FIELDNAMES)
-        writer.writeheader()
-        for row in reader:
-            if row["Product URL"] == url:
-                for key in FIELDNAMES[1:]:
-                    if not row[key].strip() and new_row[key].strip():
-                        row[key] = new_row[key]
-            writer.writerow(row)
-    shutil.move(temp_path, output_path)
+# ─── PER-FILE STATE & TASK ──────────────────────────────────────────────────────
+class OutputFile:
+    """Everything one input CSV's results are routed into."""
+
+    def __init__(self, in_path, catalog):
+        self.base     = os.path.basename(in_path)
+        self.out_path = os.path.join(OUTPUT_DIR, self.base)
+        self.category = os.path.splitext(self.base)[0]
+        self.catalog  = catalog
+        # compact per-field completeness bitmasks, cached in <out_path>.idx
+        self.index    = ResumeIndex.open(self.out_path, FIELDNAMES[1:])
+        self.writer   = None
+        self.pq_writer = None
+
+    def open_writers(self):
+        # one writer thread per output: batched appends, atomic rewrites for retries
+        # (matching rows by item key, so a different query string still updates it)
+        self.writer = CSVRowWriter(self.out_path, FIELDNAMES, key_fn=url_key)
+        # optional Parquet mirror (retries append a newer row for the same URL)
+        if PARQUET_DIR:
+            from parquet_export import ParquetRowWriter
+            self.pq_writer = ParquetRowWriter(
+                os.path.join(PARQUET_DIR, self.category), FIELDNAMES
+            )
+
+    def close(self):
+        """
+        Close every writer even if one of them fails: a write error is
+        logged and returned, never raised into the scheduler.
+        """
+        errors = []
+
+        def attempt(name, step):
+            try:
+                step()
+            except Exception as e:
+                print(f"⚠️ {self.base}: {name} failed: {e}")
+                errors.append(e)
+                return False
+            return True
+
+        csv_ok = self.writer is None or (attempt("csv writer", self.writer.close) and not self.writer.errors)
+        if csv_ok:
+            attempt("resume index", self.index.save)
+        else:
+            # URLs enter the index when queued, so rows the writer dropped would
+            # look done; without the .idx the next run rebuilds it from the CSV
+            attempt("resume index", self.index.discard)
+        if self.pq_writer is not None:
+            attempt("parquet writer", self.pq_writer.close)
+        return errors
+
+
+def process_url(timer, out, url, tabs=None):
+    with timer.scrape(url, file=out.base):
+        if tabs is not None:
+            scraped = tabs.scrape(url)
+        else:
+            scraped = extract_product_data(get_driver(), url)
+
+        # the lock only guards the in-memory index; disk I/O is on the writer thread
+        with stage("enqueue"), lock:
+            if url not in out.index:
+                print("🔍 scraping (new)  ", url)
+                out.writer.append(scraped)
+            else:
+                print("🔄 retry scraping ", url)
+                record_retry()
+                out.writer.update(scraped)
+            out.index.add(url, scraped)
+            if out.pq_writer is not None:
+                out.pq_writer.append(scraped)
+
+        # per-thread connection, so this doesn't need the file lock; the CSV is the
+        # primary output, so a locked/broken catalog only costs the catalog row
+        if out.catalog is not None:
+            with stage("catalog"):
+                try:
+                    out.catalog.upsert(scraped, category=out.category)
+                except Exception as e:
+                    print(f"⚠️ catalog upsert failed for {url}: {e}")
 
 # ─── MAIN ──────────────────────────────────────────────────────────────────────
 def main():
     os.makedirs(OUTPUT_DIR, exist_ok=True)
+    timer = StageTimer(TIMINGS_LOG)
 
-    for in_path in glob.glob(os.path.join(INPUT_DIR, "*.csv")):
-        base     = os.path.basename(in_path)
-        out_path = os.path.join(OUTPUT_DIR, base)
+    catalog = None
+    if CATALOG_DB:
+        from catalog_store import CatalogStore
+        catalog = CatalogStore(CATALOG_DB)
 
-        existing = load_existing(out_path)
+    # one stream of (file, URL) tasks across every input CSV
+    jobs = []
+    write_errors = {}   # file → errors from closing its writers
+    for in_path in glob.glob(os.path.join(INPUT_DIR, "*.csv")):
+        out = OutputFile(in_path, catalog)
         with open(in_path, newline="", encoding="utf-8") as rf:
             reader = csv.DictReader(rf)
             urls = [r["product_url"].strip() for r in reader if r.get("product_url")]
 
         # build list of URLs needing work
-        pending = [
-            u for u in urls
-            if (u not in existing)
-               or any(not existing[u][f].strip() for f in FIELDNAMES[1:])
-        ]
+        pending = out.index.pending(urls)
         if not pending:
-            print(f"✅ {base} already complete.")
+            print(f"✅ {out.base} already complete.")
+            write_errors[out.base] = out.close()
             continue
 
         first_idx = urls.index(pending[0]) + 1
-        print(f"▶ {base}: resuming at row {first_idx}/{len(urls)} — {len(pending)} to do")
-
-        # define per-URL task
-        def process_url(url):
-            driver = get_driver()
-            scraped = extract_product_data(driver, url)
-
-            with lock:
-                if url not in existing:
-                    print("🔍 scraping (new)  ", url)
-                    write_row_append(out_path, scraped)
-                else:
-                    print("🔄 retry scraping ", url)
-                    update_row_inplace(out_path, url, scraped)
-                existing[url] = scraped
-
-        # parallelize
-        with concurrent.futures.ThreadPoolExecutor(max_workers=WORKERS) as ex:
-            ex.map(process_url, pending)
+        print(f"▶ {out.base}: resuming at row {first_idx}/{len(urls)} — {len(pending)} to do")
+        out.open_writers()
+        jobs.append(FileJob(out.base, pending, out))
+
+    def file_done(job):
+        # runs inside the scheduler: a bad file must not stop the other files
+        write_errors[job.name] = job.ctx.close()
+        note = f" ({job.failed} failed)" if job.failed else ""
+        if write_errors[job.name]:
+            print(f"⚠️ {job.name} finished{note}, but its output may be incomplete")
+        else:
+            print(f"✅ {job.name} finished{note}")
+
+    # several tabs per browser: one scheduler worker per tab, each blocking on its page
+    tabs = None
+    workers = WORKERS
+    if BROWSER_ENGINE == "playwright":
+        from async_engine import ThreadedEngine, ff_product_data
+        tabs = ThreadedEngine(ff_product_data, browsers=WORKERS,
+                              concurrency=ASYNC_PAGES, headless=HEADLESS)
+        workers = tabs.slots
+    elif TABS_PER_BROWSER > 1:
+        tabs = TabPool(
+            lambda: init_driver(headless=HEADLESS, background_tabs=True),
+            parse_product_page, WORKERS, TABS_PER_BROWSER, settle=PAGE_LOAD_PAUSE,
+        )
+        workers = tabs.slots
+
+    # parallelize: workers move straight on to the next file's URLs
+    CrossFileScheduler(workers).run(
+        jobs,
+        lambda job, url: process_url(timer, job.ctx, url, tabs),
+        on_file_done=file_done,
+    )
 
     # clean up all browser instances
+    if tabs is not None:
+        tabs.close()
     for drv in drivers_list:
         drv.quit()
 
+    timer.close()
+    failed = {name: errors for name, errors in write_errors.items() if errors}
+    if failed:
+        raise RuntimeError("output writers failed for " + "; ".join(
+            f"{name}: {', '.join(map(str, errors))}" for name, errors in failed.items()))
     print("✅ All done — output in", OUTPUT_DIR)
 
 if __name__ == "__main__":
@@ -0,0 +1,185 @@
+import time
+import socket
+import threading
+import contextlib
+
+# ─── CONFIG ────────────────────────────────────────────────────────────────────
+CONCURRENCY  = 16          # connections kept per host; match the downloader's worker count
+TIMEOUT      = 15
+RETRIES      = 5
+BACKOFF      = 1.0         # seconds, doubled per attempt unless the server sends Retry-After
+RETRY_STATUS = {429, 500, 502, 503, 504}
+DNS_TTL      = 300         # seconds a resolved CDN hostname is reused
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
+        " AppleWebKit/537.36 (KHTML, like Gecko)"
+        " Chrome/114.0.0.0 Safari/537.36"
+    ),
+    "Referer": "https://www.farfetch.com/",
+}
+
+
+# ─── DNS CACHE ─────────────────────────────────────────────────────────────────
+_dns = {}
+_dns_lock = threading.Lock()
+_real_getaddrinfo = socket.getaddrinfo
+
+
+def _cached_getaddrinfo(host, port, *args, **kwargs):
+    key = (host, port, args, tuple(sorted(kwargs.items())))
+    now = time.monotonic()
+    with _dns_lock:
+        hit = _dns.get(key)
+    if hit and hit[0] > now:
+        return hit[1]
+    result = _real_getaddrinfo(host, port, *args, **kwargs)
+    with _dns_lock:
+        _dns[key] = (now + DNS_TTL, result)
+    return result
+
+
+def install_dns_cache():
+    """Route socket.getaddrinfo through a TTL cache (process-wide, idempotent)."""
+    socket.getaddrinfo = _cached_getaddrinfo
+
+
+# ─── BACKENDS ──────────────────────────────────────────────────────────────────
+def _accept_encoding():
+    # br only if a decoder is installed, otherwise the body would arrive undecodable
+    for mod in ("brotli", "brotlicffi"):
+        try:
+            __import__(mod)
+            return "gzip, deflate, br"
+        except ImportError:
+            pass
+    return "gzip, deflate"
+
+
+def _has_http2():
+    try:
+        import httpx  # noqa: F401
+        import h2     # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class Response:
+    """The few response bits the downloaders use, same for httpx and requests."""
+
+    def __init__(self, raw, backend):
+        self.raw = raw
+        self.backend = backend
+        self.status_code = raw.status_code
+        self.headers = raw.headers
+        self.url = str(raw.url)
+
+    def raise_for_status(self):
+        self.raw.raise_for_status()
+
+    def iter_bytes(self, chunk_size=64 * 1024):
+        if self.backend == "httpx":
+            return self.raw.iter_bytes(chunk_size)
+        return self.raw.iter_content(chunk_size)
+
+    @property
+    def content(self):
+        return self.raw.content if self.backend == "requests" else self.raw.read()
+
+
+class HttpClient:
+    """
+    One pooled, keep-alive HTTP client for every downloader in the process.
+
+    httpx with HTTP/2 when httpx+h2 are installed (one multiplexed
+    connection per CDN host), otherwise a requests.Session whose pool
+    holds `concurrency` connections per host.  Retries on RETRY_STATUS
+    and connection errors, honouring Retry-After.  Thread-safe.
+    """
+
+    def __init__(self, concurrency=CONCURRENCY, http2=True, headers=None, timeout=TIMEOUT):
+        install_dns_cache()
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.headers = {**DEFAULT_HEADERS, "Accept-Encoding": _accept_encoding(), **(headers or {})}
+        self.backend = "httpx" if http2 and _has_http2() else "requests"
+
+        if self.backend == "httpx":
+            import httpx
+            self._client = httpx.Client(
+                http2=True,
+                headers=self.headers,
+                timeout=timeout,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=concurrency * 4,
+                                    max_keepalive_connections=concurrency * 4),
+            )
+            self.transient_errors = (httpx.TransportError,)
+        else:
+            import requests
+            from requests.adapters import HTTPAdapter
+            self._client = requests.Session()
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=concurrency, pool_block=True)
+            self._client.mount("https://", adapter)
+            self._client.mount("http://", adapter)
+            self._client.headers.update(self.headers)
+            # ChunkedEncodingError is what a connection dropped mid-body looks like
+            self.transient_errors = (requests.ConnectionError, requests.Timeout,
+                                     requests.exceptions.ChunkedEncodingError)
+
+    def _open(self, url, headers, timeout):
+        if self.backend == "httpx":
+            req = self._client.build_request("GET", url, headers=headers, timeout=timeout)
+            return self._client.send(req, stream=True)
+        return self._client.get(url, headers=headers, timeout=timeout, stream=True)
+
+    @contextlib.contextmanager
+    def stream(self, url, headers=None, timeout=None):
+        """with client.stream(url) as resp: for chunk in resp.iter_bytes(): …"""
+        timeout = timeout or self.timeout
+        raw = None
+        for attempt in range(RETRIES + 1):
+            try:
+                raw = self._open(url, headers, timeout)
+            except self.transient_errors:
+                if attempt == RETRIES:
+                    raise
+                time.sleep(BACKOFF * 2 ** attempt)
+                continue
+            if raw.status_code not in RETRY_STATUS or attempt == RETRIES:
+                break
+            wait = raw.headers.get("Retry-After")
+            raw.close()
+            time.sleep(float(wait) if wait and wait.isdigit() else BACKOFF * 2 ** attempt)
+        try:
+            yield Response(raw, self.backend)
+        finally:
+            raw.close()
+
+    def get(self, url, headers=None, timeout=None):
+        """Whole body as bytes; raises on an HTTP error status."""
+        with self.stream(url, headers, timeout) as resp:
+            resp.raise_for_status()
+            return resp.content
+
+    def close(self):
+        self._client.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client(concurrency=CONCURRENCY):
+    """
+    The process-wide client.  The first caller sizes the pool, so
+    downloaders should call this with their worker count before
+    starting threads.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient(concurrency=concurrency)
+        return _client
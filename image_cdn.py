@@ -0,0 +1,64 @@
+import re
+from urllib.parse import urlsplit
+
+# ─── CONFIG ────────────────────────────────────────────────────────────────────
+TARGET_PX = 512   # longest side our models train on; ask the CDN for the smallest variant ≥ this
+# every downloader saves under a .jpg name, so don't invite WebP/AVIF: JPEG first,
+# PNG next, anything else only if the CDN has nothing better
+ACCEPT    = "image/jpeg,image/png;q=0.9,image/*;q=0.1"
+
+# Farfetch serves fixed renditions named by a trailing size token: ..._1000.jpg
+FARFETCH_SIZES = (50, 70, 120, 240, 255, 300, 480, 787, 1000)
+FARFETCH_TOKEN = re.compile(r"_(\d+)(\.(?:jpe?g|png|webp))$", re.I)
+
+# ASOS (Scene7) takes a preset ($n_<w>w$) plus an arbitrary wid=
+ASOS_PRESETS = (240, 320, 480, 640, 750, 960, 1280, 1920)
+ASOS_PRESET  = re.compile(r"\$n_(\d+)w\$")
+ASOS_WID     = re.compile(r"([?&])wid=(\d+)")
+
+
+def _smallest_at_least(sizes, target):
+    for s in sizes:
+        if s >= target:
+            return s
+    return sizes[-1]
+
+
+def _farfetch(url, target):
+    m = FARFETCH_TOKEN.search(urlsplit(url).path)
+    if not m:
+        return url
+    size = _smallest_at_least(FARFETCH_SIZES, target)
+    if size >= int(m.group(1)):
+        return url   # never ask for more than the listing gave us
+    return FARFETCH_TOKEN.sub(f"_{size}\\2", url, count=1)
+
+
+def _asos(url, target):
+    m = ASOS_PRESET.search(url)
+    if m:
+        preset = _smallest_at_least(ASOS_PRESETS, target)
+        if preset < int(m.group(1)):
+            url = ASOS_PRESET.sub(f"$n_{preset}w$", url, count=1)
+    m = ASOS_WID.search(url)
+    if m and int(m.group(2)) > target:
+        url = ASOS_WID.sub(f"\\1wid={target}", url, count=1)
+    return url
+
+
+REWRITERS = {
+    "cdn-images.farfetch-contents.com": _farfetch,
+    "images.asos-media.com": _asos,
+}
+
+
+def sized_url(url, target=TARGET_PX):
+    """The CDN variant of `url` closest to (but not below) `target` px; unknown CDNs unchanged."""
+    rewrite = REWRITERS.get(urlsplit(url).netloc.lower())
+    return rewrite(url, target) if rewrite else url
+
+
+def candidate_urls(url, target=TARGET_PX):
+    """URLs to try in order: the sized variant, then the original as a fallback."""
+    small = sized_url(url, target)
+    return [small, url] if small != url else [url]
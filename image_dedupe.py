@@ -0,0 +1,249 @@
+import os
+import csv
+import argparse
+import tempfile
+import concurrent.futures
+
+import numpy as np
+
+from image_engine import PART_SUFFIX
+
+# ─── CONFIG ────────────────────────────────────────────────────────────────────
+IMAGE_ROOT    = "downloaded_images"
+HASH_CACHE    = os.path.join(IMAGE_ROOT, "image_hashes.csv")   # reused while size + mtime match
+CLUSTERS_CSV  = "duplicate_clusters.csv"
+EXTENSIONS    = (".jpg", ".jpeg", ".png", ".webp", ".gif")
+HASH          = "phash"      # which of ahash / dhash / phash drives the search
+MAX_DISTANCE  = 6            # Hamming bits (of 64) still counted as the same shot
+BRUTE_MAX     = 20_000       # up to this many images: blockwise all-pairs; above: multi-index table
+BLOCK         = 256          # rows per all-pairs block (BLOCK × N uint64 in memory)
+WORKERS       = os.cpu_count() or 4
+CHUNKSIZE     = 64
+
+HASHES = ("ahash", "dhash", "phash")
+
+
+# ─── HASHING (worker processes) ────────────────────────────────────────────────
+def _bits_to_int(bits):
+    return int.from_bytes(np.packbits(bits.ravel()).tobytes(), "big")
+
+
+def _dct_matrix(n):
+    k = np.arange(n)
+    d = np.cos(np.pi * (2 * k[None, :] + 1) * k[:, None] / (2 * n))
+    d[0] /= np.sqrt(2)
+    return d
+
+
+def image_hashes(path):
+    """(ahash, dhash, phash) of one file as 64-bit ints."""
+    from PIL import Image
+
+    with Image.open(path) as img:
+        # only a 32×32 thumbnail is needed: let JPEG decode at reduced scale
+        img.draft("L", (64, 64))
+        gray = img.convert("L")
+        a = np.asarray(gray.resize((8, 8), Image.BILINEAR), dtype=np.float32)
+        d = np.asarray(gray.resize((9, 8), Image.BILINEAR), dtype=np.float32)
+        p = np.asarray(gray.resize((32, 32), Image.BILINEAR), dtype=np.float32)
+
+    dct = _dct_matrix(32)
+    low = (dct @ p @ dct.T)[:8, :8]
+    return (
+        _bits_to_int(a > a.mean()),
+        _bits_to_int(d[:, 1:] > d[:, :-1]),
+        _bits_to_int(low > np.median(low)),
+    )
+
+
+def _hash_one(path):
+    try:
+        return path, image_hashes(path)
+    except Exception:
+        return path, None
+
+
+# ─── SCAN + CACHE ──────────────────────────────────────────────────────────────
+def scan_images(root):
+    """{path: (size, mtime_ns)} for every image under root, one scandir per folder."""
+    found, stack = {}, [root]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.lower().endswith(EXTENSIONS) and not entry.name.endswith(PART_SUFFIX):
+                    st = entry.stat()
+                    found[entry.path] = (st.st_size, st.st_mtime_ns)
+    return found
+
+
+def load_cache(path=HASH_CACHE):
+    cache = {}
+    try:
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                cache[row["path"]] = (
+                    (int(row["size"]), int(row["mtime_ns"])),
+                    tuple(int(row[h], 16) for h in HASHES),
+                )
+    except (OSError, KeyError, ValueError):
+        return {}
+    return cache
+
+
+def save_cache(hashes, stamps, path=HASH_CACHE):
+    folder = os.path.dirname(os.path.abspath(path))
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=folder, prefix=".", suffix=".tmp")
+    with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["path", "size", "mtime_ns", *HASHES])
+        for p, hs in hashes.items():
+            writer.writerow([p, *stamps[p], *(f"{h:016x}" for h in hs)])
+    os.replace(tmp, path)
+
+
+def compute_hashes(root=IMAGE_ROOT, cache_path=HASH_CACHE, workers=WORKERS):
+    """{path: (ahash, dhash, phash)}; only new or changed files are decoded."""
+    stamps = scan_images(root)
+    cache = load_cache(cache_path)
+    hashes = {p: cache[p][1] for p, st in stamps.items() if p in cache and cache[p][0] == st}
+    todo = [p for p in stamps if p not in hashes]
+    failed = 0
+    if todo:
+        print(f"🔎 hashing {len(todo)} new/changed image(s) ({len(hashes)} cached)")
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+            for path, hs in pool.map(_hash_one, todo, chunksize=CHUNKSIZE):
+                if hs is None:
+                    failed += 1
+                else:
+                    hashes[path] = hs
+        save_cache(hashes, stamps, cache_path)
+    if failed:
+        print(f"⚠️ {failed} image(s) could not be decoded")
+    return hashes
+
+
+# ─── SEARCH ────────────────────────────────────────────────────────────────────
+def _popcount(x):
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(x)
+    table = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint8)
+    return table[x.view(np.uint8)].reshape(x.shape + (8,)).sum(axis=-1)
+
+
+def pairs_bruteforce(h, max_distance=MAX_DISTANCE):
+    """All i < j with hamming(h[i], h[j]) ≤ max_distance, BLOCK rows against everything at a time."""
+    out = []
+    for start in range(0, len(h), BLOCK):
+        block = h[start:start + BLOCK]
+        rest = h[start:]
+        dist = _popcount(block[:, None] ^ rest[None, :])
+        i, j = np.nonzero(dist <= max_distance)
+        keep = j > i   # rest begins at start, so j > i is exactly "later image"
+        out.extend(zip((i[keep] + start).tolist(), (j[keep] + start).tolist()))
+    return out
+
+
+def pairs_multi_index(h, max_distance=MAX_DISTANCE):
+    """
+    Pigeonhole multi-index search: split the 64 bits into max_distance+1
+    chunks.  Two hashes within max_distance agree exactly on at least one
+    chunk, so only images sharing a bucket in some chunk are compared,
+    and each bucket is checked with the same blockwise distance matrix.
+    """
+    m = max_distance + 1
+    widths = [64 // m + (1 if k < 64 % m else 0) for k in range(m)]
+    out, shift = set(), 0
+    for width in widths:
+        keys = (h >> np.uint64(shift)) & np.uint64((1 << width) - 1)
+        shift += width
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+        bounds = np.flatnonzero(np.diff(sorted_keys)) + 1
+        for members in np.split(order, bounds):
+            if len(members) < 2:
+                continue
+            # a bucket of near-blank images can be large: same BLOCK bound as the all-pairs search
+            for i, j in pairs_bruteforce(h[members], max_distance):
+                a, b = int(members[i]), int(members[j])
+                out.add((min(a, b), max(a, b)))
+    return sorted(out)
+
+
+def clusters(n, pairs):
+    """Union-find over the matched pairs; returns only groups of two or more."""
+    parent = list(range(n))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for a, b in pairs:
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)
+    groups = {}
+    for i in range(n):
+        groups.setdefault(find(i), []).append(i)
+    return [g for g in groups.values() if len(g) > 1]
+
+
+# ─── MANIFEST ──────────────────────────────────────────────────────────────────
+def write_clusters(groups, paths, h, root, out_path=CLUSTERS_CSV):
+    """
+    One line per image in a duplicate cluster.  The largest file (usually
+    the least compressed rendition) is marked keep=1; `distance` is to it.
+    `source` is the CSV folder under root, so cross-listed products show up.
+    """
+    with open(out_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["cluster", "size", "keep", "distance", "source", "bytes", "hash", "path"])
+        groups = sorted(groups, key=len, reverse=True)
+        for cid, members in enumerate(groups, start=1):
+            sizes = {i: os.path.getsize(paths[i]) for i in members}
+            best = max(members, key=lambda i: sizes[i])
+            dist = dict(zip(members, _popcount(h[members] ^ h[best]).tolist()))
+            for i in sorted(members, key=lambda i: (i != best, paths[i])):
+                rel = os.path.relpath(paths[i], root)
+                writer.writerow([cid, len(members), int(i == best), dist[i],
+                                 rel.split(os.sep, 1)[0], sizes[i], f"{int(h[i]):016x}", paths[i]])
+    return len(groups)
+
+
+# ─── MAIN ──────────────────────────────────────────────────────────────────────
+def main():
+    parser = argparse.ArgumentParser(description="Find near-duplicate images by perceptual hash")
+    parser.add_argument("--root", default=IMAGE_ROOT)
+    parser.add_argument("--cache", default=None, help=f"hash cache (default: <root>/{os.path.basename(HASH_CACHE)})")
+    parser.add_argument("--out", default=CLUSTERS_CSV)
+    parser.add_argument("--hash", choices=HASHES, default=HASH)
+    parser.add_argument("--distance", type=int, default=MAX_DISTANCE)
+    parser.add_argument("--method", choices=("auto", "brute", "mih"), default="auto")
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    args = parser.parse_args()
+
+    cache = args.cache or os.path.join(args.root, os.path.basename(HASH_CACHE))
+    hashes = compute_hashes(args.root, cache, args.workers)
+    paths = sorted(hashes)
+    col = HASHES.index(args.hash)
+    h = np.array([hashes[p][col] for p in paths], dtype=np.uint64)
+
+    method = args.method
+    if method == "auto":
+        method = "brute" if len(paths) <= BRUTE_MAX else "mih"
+    find_pairs = pairs_bruteforce if method == "brute" else pairs_multi_index
+    pairs = find_pairs(h, args.distance)
+    groups = clusters(len(paths), pairs)
+
+    n = write_clusters(groups, paths, h, args.root, args.out)
+    dupes = sum(len(g) - 1 for g in groups)
+    print(f"✅ {len(paths)} images, {len(pairs)} near-duplicate pairs ({method}, ≤{args.distance} bits) "
+          f"→ {n} cluster(s), {dupes} redundant image(s) → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
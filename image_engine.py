@@ -0,0 +1,240 @@
+import os
+import re
+import shutil
+import threading
+import concurrent.futures
+
+from http_pool import get_client
+from image_cdn import ACCEPT, TARGET_PX, candidate_urls, sized_url
+
+# ─── CONFIG ────────────────────────────────────────────────────────────────────
+PART_SUFFIX     = ".part"   # bytes land here until the file is verified
+CHUNK_SIZE      = 64 * 1024
+RESUME_ATTEMPTS = 3         # reconnect-and-continue tries after a dropped stream
+TAIL_BYTES      = 64        # how much of a file's end we read to find the end marker
+
+PNG_IEND = b"IEND\xaeB`\x82"
+
+
+class HTTPError(IOError):
+    """Non-2xx answer, with the status kept so callers can fall back on 403/404."""
+
+    def __init__(self, status, url):
+        super().__init__(f"HTTP {status} for {url}")
+        self.status = status
+
+
+class IncompleteDownload(IOError):
+    """Fewer bytes arrived than the server announced; the .part file is kept for resume."""
+
+
+class CorruptImage(IOError):
+    """The bytes are all there but don't form a complete image."""
+
+
+# ─── INTEGRITY ─────────────────────────────────────────────────────────────────
+def check_image(path):
+    """
+    Cheap completeness check from the first and last bytes only:
+    JPEG must end in FFD9 (trailing padding allowed), PNG in its IEND
+    chunk, GIF in 0x3B, WebP's RIFF size must match the file size.
+    Returns (ok, reason); formats we don't recognise pass.
+    """
+    try:
+        size = os.path.getsize(path)
+        if size == 0:
+            return False, "empty"
+        with open(path, "rb") as f:
+            head = f.read(16)
+            f.seek(max(0, size - TAIL_BYTES))
+            tail = f.read()
+    except OSError as e:
+        return False, f"unreadable: {e}"
+
+    if head[:3] == b"\xff\xd8\xff":
+        # some encoders pad after EOI with zeros or a newline
+        if tail.rstrip(b"\x00\r\n").endswith(b"\xff\xd9"):
+            return True, "jpeg"
+        return False, "jpeg missing end marker"
+    if head[:8] == b"\x89PNG\r\n\x1a\n":
+        return (True, "png") if tail.endswith(PNG_IEND) else (False, "png missing IEND")
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        riff = int.from_bytes(head[4:8], "little") + 8
+        return (True, "webp") if riff <= size else (False, "webp truncated")
+    if head[:4] == b"GIF8":
+        return (True, "gif") if tail.endswith(b"\x3b") else (False, "gif truncated")
+    return True, "unknown format"
+
+
+def is_complete_image(path):
+    return check_image(path)[0]
+
+
+# ─── FETCH ─────────────────────────────────────────────────────────────────────
+_CONTENT_RANGE = re.compile(r"bytes (\d+)-\d+/(\d+|\*)")
+
+
+def _stream_to_part(client, url, part, headers):
+    """One request: append to `part` from where it stops. Returns the expected total size or None."""
+    have = os.path.getsize(part) if os.path.exists(part) else 0
+    # identity: byte ranges are only meaningful on the unencoded body
+    req_headers = {**(headers or {}), "Accept-Encoding": "identity"}
+    if have:
+        req_headers["Range"] = f"bytes={have}-"
+
+    with client.stream(url, headers=req_headers) as resp:
+        if resp.status_code == 416:
+            # nothing past `have`: the part is already whole (or junk — check_image decides)
+            return have
+        if resp.status_code >= 400:
+            raise HTTPError(resp.status_code, url)
+
+        total = None
+        m = _CONTENT_RANGE.match(resp.headers.get("Content-Range", ""))
+        if have and resp.status_code == 206 and m and int(m.group(1)) == have:
+            mode = "ab"
+            if m.group(2) != "*":
+                total = int(m.group(2))
+        else:
+            # server ignored the range (or no part yet): start over
+            mode = "wb"
+            if resp.headers.get("Content-Length", "").isdigit():
+                total = int(resp.headers["Content-Length"])
+
+        with open(part, mode) as f:
+            for chunk in resp.iter_bytes(CHUNK_SIZE):
+                f.write(chunk)
+    return total
+
+
+def fetch(url, out_path, headers=None, client=None):
+    """
+    Download `url` to `out_path` safely.
+
+    Bytes go to <out_path>.part; a dropped connection resumes with a
+    Range request instead of starting over, the size is checked against
+    Content-Length / Content-Range, and the image's end marker is checked
+    before the .part is renamed into place.  An existing out_path that
+    passes check_image() is left alone.  Returns "cached" or "downloaded".
+    """
+    if os.path.exists(out_path):
+        if is_complete_image(out_path):
+            return "cached"
+        # truncated file from before .part downloads existed: fetch again
+        os.remove(out_path)
+
+    client = client or get_client()
+    part = out_path + PART_SUFFIX
+    for attempt in range(RESUME_ATTEMPTS + 1):
+        try:
+            total = _stream_to_part(client, url, part, headers)
+        except client.transient_errors:
+            if attempt == RESUME_ATTEMPTS:
+                raise
+            continue
+        size = os.path.getsize(part) if os.path.exists(part) else 0
+        if total is not None and size < total:
+            if attempt == RESUME_ATTEMPTS:
+                raise IncompleteDownload(f"{size}/{total} bytes from {url}")
+            continue
+        break
+
+    ok, reason = check_image(part)
+    if not ok or (total is not None and size > total):
+        # don't resume from bytes we can't trust
+        if os.path.exists(part):
+            os.remove(part)
+        raise CorruptImage(f"{url}: {reason if not ok else f'{size} bytes, expected {total}'}")
+    os.replace(part, out_path)
+    return "downloaded"
+
+
+def fetch_sized(url, out_path, target=TARGET_PX, client=None):
+    """
+    fetch() the CDN's smallest variant ≥ `target` px, falling back to
+    the original URL if the variant doesn't exist.  Returns (status, url_fetched); keep `url` itself as
+    the source of record.
+    """
+    candidates = candidate_urls(url, target)
+    for i, candidate in enumerate(candidates):
+        try:
+            return fetch(candidate, out_path, headers={"Accept": ACCEPT}, client=client), candidate
+        except HTTPError as e:
+            if e.status not in (400, 403, 404, 410) or i == len(candidates) - 1:
+                raise
+            # a half-written variant must not be resumed with the original's bytes
+            if os.path.exists(out_path + PART_SUFFIX):
+                os.remove(out_path + PART_SUFFIX)
+
+
+# ─── COALESCING ────────────────────────────────────────────────────────────────
+def canonical_url(url, target=TARGET_PX):
+    """Key under which two image URLs are the same download: the sized variant, minus any fragment."""
+    return sized_url(url.strip(), target).split("#", 1)[0]
+
+
+def link_or_copy(src, dst):
+    """Give `dst` the same bytes as `src`: a hard link where possible, a copy otherwise."""
+    if os.path.exists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        # other filesystem / no hard-link support
+        shutil.copyfile(src, dst)
+
+
+class CoalescingFetcher:
+    """
+    fetch_sized() with one network transfer per canonical URL per process.
+
+    The first row that asks for a URL downloads it; rows asking while
+    that download is running wait for it, and rows asking afterwards
+    reuse the finished file.  Every row still gets its own file (a hard
+    link to the first copy), so images_path stays per-row.  Thread-safe.
+    """
+
+    def __init__(self, client=None, target=TARGET_PX):
+        self.client = client
+        self.target = target
+        self._lock = threading.Lock()
+        self._futures = {}   # canonical URL → Future((path, fetched_url))
+        self.shared = 0
+
+    def fetch(self, url, out_path):
+        """Returns (status, fetched_url); status is cached / downloaded / shared."""
+        key = canonical_url(url, self.target)
+        with self._lock:
+            fut = self._futures.get(key)
+            owner = fut is None
+            if owner:
+                fut = self._futures[key] = concurrent.futures.Future()
+
+        if owner:
+            try:
+                status, fetched = fetch_sized(url, out_path, self.target, self.client)
+            except BaseException as e:
+                # let the next row try again instead of inheriting the failure forever
+                with self._lock:
+                    del self._futures[key]
+                fut.set_exception(e)
+                raise
+            fut.set_result((out_path, fetched))
+            return status, fetched
+
+        try:
+            src, fetched = fut.result()
+        except Exception:
+            # the owner's transfer failed (maybe only for its row): make our own attempt
+            return fetch_sized(url, out_path, self.target, self.client)
+        if os.path.abspath(src) == os.path.abspath(out_path):
+            return "cached", fetched
+        if not os.path.exists(src):
+            # first copy was moved or deleted since; fall back to a real fetch
+            return fetch_sized(url, out_path, self.target, self.client)
+        if os.path.exists(out_path) and is_complete_image(out_path):
+            return "cached", fetched
+        link_or_copy(src, out_path)
+        with self._lock:
+            self.shared += 1
+        return "shared", fetched
@@ -0,0 +1,280 @@
+import os
+import re
+import csv
+import glob
+import time
+import shutil
+import filecmp
+import sqlite3
+import hashlib
+import argparse
+import tempfile
+import threading
+
+from url_parse import parse_product_url
+
+# ─── CONFIG ────────────────────────────────────────────────────────────────────
+IMAGE_ROOT    = "images"                                   # sharded tree lives here
+FANOUT        = (2, 2)     # hex chars per directory level: 256 × 256 leaf folders
+MANIFEST_PATH = os.path.join(IMAGE_ROOT, "manifest.sqlite")
+BUSY_TIMEOUT  = 30_000     # ms
+URL_COLUMNS   = ("Product URL", "product_url", "url")
+IMAGE_COLUMNS = ("Image URLs", "image_urls", "images")
+PATH_COLUMN   = "images_path"
+IDX_IN_NAME   = re.compile(r"(\d+)\.\w+$")   # <title>_row3_2.jpg, row_3/2.jpg, farfetch_123_2.jpg
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    source      TEXT    NOT NULL,
+    row         INTEGER NOT NULL,
+    idx         INTEGER NOT NULL,
+    site        TEXT    NOT NULL,
+    item_id     TEXT    NOT NULL,
+    url         TEXT    NOT NULL DEFAULT '',
+    fetched_url TEXT    NOT NULL DEFAULT '',
+    path        TEXT    NOT NULL,
+    updated_at  REAL    NOT NULL,
+    PRIMARY KEY (source, row, idx)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_images_item ON images(site, item_id);
+CREATE INDEX IF NOT EXISTS idx_images_path ON images(path);
+"""
+
+
+# ─── LAYOUT ────────────────────────────────────────────────────────────────────
+def product_key(product_url, image_url=""):
+    """(site, item_id) that owns an image; rows without a product URL key on the image URL."""
+    if (product_url or "").strip():
+        return parse_product_url(product_url)
+    digest = hashlib.blake2b((image_url or "").encode("utf-8"), digest_size=8).hexdigest()
+    return "img", digest
+
+
+def _safe_id(item_id):
+    # unknown URL shapes fall back to a path as item_id; keep file names short and flat
+    safe = re.sub(r"[^\w.-]", "_", item_id).strip("_")
+    if len(safe) > 64:
+        safe = hashlib.blake2b(item_id.encode("utf-8"), digest_size=8).hexdigest()
+    return safe or "_"
+
+
+def shard_dir(site, item_id, root=IMAGE_ROOT):
+    """images/ab/cd: a hash prefix of (site, item_id), so no folder grows past a few hundred entries."""
+    h = hashlib.blake2b(f"{site}:{item_id}".encode("utf-8"), digest_size=8).hexdigest()
+    parts, pos = [], 0
+    for n in FANOUT:
+        parts.append(h[pos:pos + n])
+        pos += n
+    return os.path.join(root, *parts)
+
+
+def image_path(site, item_id, idx, ext=".jpg", root=IMAGE_ROOT):
+    return os.path.join(shard_dir(site, item_id, root), f"{site}_{_safe_id(item_id)}_{idx}{ext}")
+
+
+_made = set()
+_made_lock = threading.Lock()
+
+
+def ensure_dir(path):
+    """os.makedirs once per leaf folder per process instead of once per row."""
+    if path in _made:
+        return
+    os.makedirs(path, exist_ok=True)
+    with _made_lock:
+        _made.add(path)
+
+
+# ─── MANIFEST ──────────────────────────────────────────────────────────────────
+class ImageManifest:
+    """
+    SQLite map from (source CSV, row, image index) to the file on disk,
+    with the product it belongs to, the original image URL and the URL
+    actually fetched.  Per-thread connections in WAL mode, like CatalogStore.
+    """
+
+    def __init__(self, path=MANIFEST_PATH):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._conn() as conn:
+            conn.executescript(SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT / 1000)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT}")
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def record_many(self, records):
+        """records: (source, row, idx, site, item_id, url, fetched_url, path) tuples."""
+        now = time.time()
+        conn = self._conn()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO images "
+                "(source, row, idx, site, item_id, url, fetched_url, path, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [tuple(r) + (now,) for r in records],
+            )
+        return len(records)
+
+    def row_paths(self, source, row):
+        cur = self._conn().execute(
+            "SELECT path FROM images WHERE source = ? AND row = ? ORDER BY idx", (source, row)
+        )
+        return [p for (p,) in cur]
+
+    def item_paths(self, site, item_id):
+        cur = self._conn().execute(
+            "SELECT DISTINCT path FROM images WHERE site = ? AND item_id = ? ORDER BY idx",
+            (site, item_id),
+        )
+        return [p for (p,) in cur]
+
+    def count(self):
+        return self._conn().execute("SELECT COUNT(*) FROM images").fetchone()[0]
+
+
+# ─── MIGRATION ─────────────────────────────────────────────────────────────────
+def _first_column(fields, candidates):
+    return next((c for c in candidates if c in (fields or [])), None)
+
+
+def _rewrite_csv(csv_path, fieldnames, rows):
+    folder = os.path.dirname(os.path.abspath(csv_path))
+    fd, tmp = tempfile.mkstemp(dir=folder, prefix=".", suffix=".tmp")
+    os.chmod(tmp, os.stat(csv_path).st_mode & 0o777)
+    with os.fdopen(fd, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(tmp, csv_path)
+
+
+def migrate_csv(csv_path, manifest, root=IMAGE_ROOT, dry_run=False):
+    """
+    Move every file a CSV's images_path points at into the sharded tree,
+    record it in the manifest and rewrite images_path.  A file whose target
+    already holds different bytes (another CSV's copy of the product, maybe
+    a different shot after a gallery reorder) stays where it is.
+    Returns (moved, missing, kept).
+    """
+    source = os.path.splitext(os.path.basename(csv_path))[0]
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        fields = reader.fieldnames
+        rows = list(reader)
+    if PATH_COLUMN not in (fields or []):
+        return 0, 0
+    url_col = _first_column(fields, URL_COLUMNS)
+    img_col = _first_column(fields, IMAGE_COLUMNS)
+
+    moved = missing = kept = 0
+    records = []
+    for rn, row in enumerate(rows, start=1):
+        old_paths = [p for p in (row.get(PATH_COLUMN) or "").split(";") if p.strip()]
+        if not old_paths:
+            continue
+        image_urls = [u.strip() for u in (row.get(img_col) or "").split(";") if u.strip()] if img_col else []
+        site, item_id = product_key(row.get(url_col) if url_col else "", image_urls[0] if image_urls else "")
+        new_paths = []
+        for pos, old in enumerate(old_paths, start=1):
+            # images_path is string-sorted and skips failed images: the real index is in the file name
+            m = IDX_IN_NAME.search(os.path.basename(old))
+            idx = int(m.group(1)) if m else pos
+            ext = os.path.splitext(old)[1] or ".jpg"
+            new = os.path.abspath(image_path(site, item_id, idx, ext, root))
+            url = image_urls[idx - 1] if 0 < idx <= len(image_urls) else ""
+            if os.path.abspath(old) == new or (not os.path.exists(old) and os.path.exists(new)):
+                # already in place, e.g. moved by an earlier, interrupted run
+                new_paths.append(new)
+                records.append((source, rn, idx, site, item_id, url, "", new))
+                continue
+            if not os.path.exists(old):
+                missing += 1
+                continue
+            if os.path.exists(new) and not filecmp.cmp(old, new, shallow=False):
+                # the slot is taken by a different image: never delete either one
+                kept += 1
+                new_paths.append(os.path.abspath(old))
+                records.append((source, rn, idx, site, item_id, url, "", os.path.abspath(old)))
+                continue
+            if not dry_run:
+                ensure_dir(os.path.dirname(new))
+                if os.path.exists(new):
+                    # identical copy already migrated from another CSV
+                    os.remove(old)
+                else:
+                    shutil.move(old, new)
+            moved += 1
+            new_paths.append(new)
+            records.append((source, rn, idx, site, item_id, url, "", new))
+        row[PATH_COLUMN] = ";".join(new_paths)
+
+    if not dry_run:
+        manifest.record_many(records)
+        _rewrite_csv(csv_path, fields, rows)
+    return moved, missing, kept
+
+
+def prune_empty_dirs(root):
+    """Remove the per-row folders the migration emptied (bottom-up)."""
+    removed = 0
+    for dirpath, dirnames, filenames in os.walk(root, topdown=False):
+        if dirpath != root and not os.listdir(dirpath):
+            os.rmdir(dirpath)
+            removed += 1
+    return removed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sharded image layout + manifest")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    mig = sub.add_parser("migrate", help="move per-row image folders into the sharded tree")
+    mig.add_argument("csvs", nargs="*", default=["csv_with_image_paths/*.csv", "output_csv_with_paths/*.csv"],
+                     help="CSVs with an images_path column (files or globs)")
+    mig.add_argument("--old-root", default="downloaded_images", help="pruned of empty folders afterwards")
+    mig.add_argument("--root", default=IMAGE_ROOT)
+    mig.add_argument("--manifest", default=MANIFEST_PATH)
+    mig.add_argument("--dry-run", action="store_true")
+
+    where = sub.add_parser("where", help="files recorded for a product URL")
+    where.add_argument("url")
+    where.add_argument("--manifest", default=MANIFEST_PATH)
+    args = parser.parse_args()
+
+    manifest = ImageManifest(args.manifest)
+    if args.cmd == "migrate":
+        total = 0
+        for pattern in args.csvs:
+            for csv_path in sorted(glob.glob(pattern)):
+                moved, missing, kept = migrate_csv(csv_path, manifest, args.root, args.dry_run)
+                total += moved
+                note = f", {missing} missing on disk" if missing else ""
+                if kept:
+                    note += f", {kept} left in place (a different image already has that name)"
+                print(f"✔ {csv_path}: {moved} file(s) {'would move' if args.dry_run else 'moved'}{note}")
+        if not args.dry_run and os.path.isdir(args.old_root):
+            print(f"🧹 removed {prune_empty_dirs(args.old_root)} empty folder(s) under {args.old_root}")
+        print(f"✅ {total} file(s) → {args.root}; manifest holds {manifest.count()} entries")
+    elif args.cmd == "where":
+        site, item_id = parse_product_url(args.url)
+        for p in manifest.item_paths(site, item_id):
+            print(p)
+    manifest.close()
+
+
+if __name__ == "__main__":
+    main()
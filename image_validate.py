@@ -0,0 +1,191 @@
+import os
+import csv
+import glob
+import argparse
+import collections
+import concurrent.futures
+
+from image_engine import check_image, fetch_sized, PART_SUFFIX
+from image_store import IDX_IN_NAME, IMAGE_COLUMNS, PATH_COLUMN
+from failure_log import FAILURES_CSV, log_failures, load_failures, rewrite_failures, import_legacy
+
+# ─── CONFIG ────────────────────────────────────────────────────────────────────
+INPUT_DIRS  = ["csv_with_image_paths", "output_csv_with_paths"]  # CSVs with an images_path column
+REPORT_CSV  = "validation_report.csv"
+MIN_SIDE    = 64              # smaller than this is a placeholder/tracking pixel, not a product shot
+WORKERS     = os.cpu_count() or 4
+CHUNKSIZE   = 64
+RETRY_WORKERS = 8             # threads for the re-download pass (network-bound)
+
+REPORT_FIELDS = ["source", "row", "idx", "path", "status", "format", "width", "height", "bytes", "reason", "url"]
+
+
+# ─── CHECK (worker processes) ──────────────────────────────────────────────────
+def validate_file(path):
+    """
+    (status, format, width, height, bytes, reason) for one file.
+    status: ok, missing, truncated (end marker / size check failed),
+    undecodable (Pillow can't decode it) or too_small.
+    """
+    if not os.path.isfile(path):
+        return "missing", "", 0, 0, 0, "file not on disk"
+    size = os.path.getsize(path)
+    ok, fmt = check_image(path)
+    if not ok:
+        return "truncated", "", 0, 0, size, fmt
+
+    from PIL import Image
+    try:
+        with Image.open(path) as img:
+            fmt, (width, height) = (img.format or "").lower(), img.size
+            # a reduced-scale decode still walks the whole entropy-coded stream
+            img.draft("RGB", (MIN_SIDE, MIN_SIDE))
+            img.load()
+    except Exception as e:
+        return "undecodable", fmt, 0, 0, size, str(e)
+    if min(width, height) < MIN_SIDE:
+        return "too_small", fmt, width, height, size, f"{width}x{height}"
+    return "ok", fmt, width, height, size, ""
+
+
+# ─── PLAN ──────────────────────────────────────────────────────────────────────
+def referenced_files(csv_paths):
+    """One dict per file listed in an images_path column, with the image URL it came from."""
+    entries = []
+    for csv_path in csv_paths:
+        source = os.path.splitext(os.path.basename(csv_path))[0]
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            fields = reader.fieldnames or []
+            if PATH_COLUMN not in fields:
+                continue
+            img_col = next((c for c in IMAGE_COLUMNS if c in fields), None)
+            for rn, row in enumerate(reader, start=1):
+                urls = [u.strip() for u in (row.get(img_col) or "").split(";") if u.strip()] if img_col else []
+                paths = [p.strip() for p in (row.get(PATH_COLUMN) or "").split(";") if p.strip()]
+                for pos, path in enumerate(paths, start=1):
+                    # file names end in the image's position in the URL list; fall back to list order
+                    m = IDX_IN_NAME.search(os.path.basename(path))
+                    idx = int(m.group(1)) if m else pos
+                    url = urls[idx - 1] if 0 < idx <= len(urls) else ""
+                    entries.append({"source": source, "row": rn, "idx": idx, "path": path, "url": url})
+    return entries
+
+
+def validate(csv_paths, report_path=REPORT_CSV, workers=WORKERS, delete_invalid=False):
+    """
+    Check every referenced file in a process pool, write one report line
+    per file and queue everything not "ok" in the shared failure log.
+    Invalid files are removed with delete_invalid=True so the next
+    downloader run (or `retry`) fetches them again.  Returns Counter of statuses.
+    """
+    entries = referenced_files(csv_paths)
+    counts = collections.Counter()
+    bad = []
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool, \
+         open(report_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_FIELDS)
+        writer.writeheader()
+        results = pool.map(validate_file, [e["path"] for e in entries], chunksize=CHUNKSIZE)
+        for n, (entry, result) in enumerate(zip(entries, results), start=1):
+            status, fmt, width, height, size, reason = result
+            writer.writerow({**entry, "status": status, "format": fmt, "width": width,
+                             "height": height, "bytes": size, "reason": reason})
+            counts[status] += 1
+            if status != "ok":
+                bad.append({**entry, "stage": "validate", "reason": f"{status}: {reason}" if reason else status})
+            if n % 10_000 == 0:
+                print(f"  • {n}/{len(entries)} files checked")
+
+    if delete_invalid:
+        for b in bad:
+            for p in (b["path"], b["path"] + PART_SUFFIX):
+                if os.path.exists(p):
+                    os.remove(p)
+    log_failures(bad)
+    return counts
+
+
+# ─── RE-DOWNLOAD ───────────────────────────────────────────────────────────────
+def retry(path=FAILURES_CSV, workers=RETRY_WORKERS):
+    """
+    Fetch every queued failure that has both a URL and a target path.
+    Fixed entries leave the log; the rest stay with their reason updated.
+    Returns (fixed, still failing).
+    """
+    queued = load_failures(path)
+    todo, keep = [], []
+    seen = set()
+    for r in queued:
+        key = (r.get("path"), r.get("url"))
+        if key in seen:
+            continue   # the same file logged by several passes
+        seen.add(key)
+        (todo if r.get("url") and r.get("path") else keep).append(r)
+
+    def one(r):
+        os.makedirs(os.path.dirname(os.path.abspath(r["path"])), exist_ok=True)
+        if validate_file(r["path"])[0] == "ok":
+            return r, None
+        if os.path.exists(r["path"]):
+            os.remove(r["path"])   # fetch() would keep a complete-but-undecodable file
+        try:
+            fetch_sized(r["url"], r["path"])
+        except Exception as e:
+            return r, str(e)
+        status, *_, reason = validate_file(r["path"])
+        return r, None if status == "ok" else f"{status}: {reason}"
+
+    fixed = 0
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        for r, error in pool.map(one, todo):
+            if error is None:
+                fixed += 1
+            else:
+                keep.append({**r, "stage": "retry", "reason": error})
+    rewrite_failures(keep, path, loaded=len(queued))
+    return fixed, len(keep)
+
+
+# ─── MAIN ──────────────────────────────────────────────────────────────────────
+def main():
+    parser = argparse.ArgumentParser(description="Validate downloaded images and queue bad ones for re-download")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    chk = sub.add_parser("check", help="decode every file referenced by images_path")
+    chk.add_argument("inputs", nargs="*", default=INPUT_DIRS, help="annotated CSV files or folders of CSVs")
+    chk.add_argument("--report", default=REPORT_CSV)
+    chk.add_argument("--workers", type=int, default=WORKERS)
+    chk.add_argument("--delete-invalid", action="store_true", help="remove files that failed so they get re-fetched")
+
+    rt = sub.add_parser("retry", help=f"re-download what {FAILURES_CSV} has queued")
+    rt.add_argument("--workers", type=int, default=RETRY_WORKERS)
+
+    sub.add_parser("import-legacy", help="copy the old failures_log.csv / failed_downloads.csv into the shared log")
+    args = parser.parse_args()
+
+    if args.cmd == "check":
+        csv_paths = []
+        for inp in args.inputs:
+            if os.path.isdir(inp):
+                csv_paths.extend(sorted(glob.glob(os.path.join(inp, "*.csv"))))
+            elif os.path.isfile(inp):
+                csv_paths.append(inp)
+        if not csv_paths:
+            print("Nothing to validate.")
+            return
+        counts = validate(csv_paths, args.report, args.workers, args.delete_invalid)
+        summary = ", ".join(f"{status} {n}" for status, n in counts.most_common())
+        queued = sum(n for status, n in counts.items() if status != "ok")
+        print(f"✅ {sum(counts.values())} files: {summary} → {args.report}")
+        if queued:
+            print(f"⚠️ {queued} file(s) queued in {FAILURES_CSV}; `python image_validate.py retry` re-fetches them")
+    elif args.cmd == "retry":
+        fixed, left = retry(workers=args.workers)
+        print(f"✅ {fixed} re-downloaded, {left} still in {FAILURES_CSV}")
+    elif args.cmd == "import-legacy":
+        print(f"✅ {log_failures(import_legacy())} record(s) added to {FAILURES_CSV}")
+
+
+if __name__ == "__main__":
+    main()
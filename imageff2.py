@@ -1,7 +1,8 @@
 import os
 import glob
-import requests
 import pandas as pd
+from http_pool import get_client
+from image_engine import CoalescingFetcher
 
 # ——— CONFIG ———
 CSV_DIR         = "csv_folder"            # ← folder containing your original .csv files
@@ -9,14 +10,10 @@ URL_COLUMN      = "Image URLs"            # ← the column header with semicolon
 DOWNLOAD_ROOT   = "downloaded_images"     # ← where images get saved
 OUTPUT_CSV_DIR  = "csv_with_image_paths"  # ← where the new CSVs will go
 
-HEADERS = {
-    "User-Agent": (
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
-        " AppleWebKit/537.36 (KHTML, like Gecko)"
-        " Chrome/114.0.0.0 Safari/537.36"
-    ),
-    "Referer": "https://www.farfetch.com/"
-}
+# pooled keep-alive connections instead of a new one per image
+# (browser User-Agent + Farfetch Referer are http_pool's defaults)
+client = get_client(1)
+fetcher = CoalescingFetcher(client)   # repeated URLs are linked, not downloaded again
 
 # ensure output dirs exist
 os.makedirs(DOWNLOAD_ROOT,   exist_ok=True)
@@ -49,13 +46,10 @@ for csv_path in glob.glob(os.path.join(CSV_DIR, "*.csv")):
         saved_paths = []
         for img_idx, url in enumerate(urls, start=1):
             try:
-                resp = requests.get(url, headers=HEADERS, timeout=15, stream=True)
-                resp.raise_for_status()
                 fname = f"{img_idx}.jpg"
                 out_path = os.path.join(row_folder, fname)
-                with open(out_path, "wb") as f:
-                    for chunk in resp.iter_content(1024):
-                        f.write(chunk)
+                # asks the CDN for the ≤TARGET_PX variant, verified and renamed into place
+                fetcher.fetch(url, out_path)
                 abs_path = os.path.abspath(out_path)
                 saved_paths.append(abs_path)
                 print(f"    ✅ [{img_idx}] saved")
@@ -2,131 +2,170 @@ import os
 import glob
 import re
 import pandas as pd
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from http_pool import get_client
+from image_engine import CoalescingFetcher
+from disk_index import DiskIndex, CACHE_NAME
+from failure_log import log_failures
+from image_store import IMAGE_ROOT, ImageManifest, ensure_dir, image_path, product_key
+from stage_timing import StageTimer, stage
+from work_queue import CrossFileScheduler, FileJob
 
 # ——— CONFIG ———
 CSV_DIR         = "csv_folder"             # your folder of CSVs
 TITLE_COLUMN    = "Title"                  # product title column
 URL_COLUMN      = "Image URLs"             # semicolon-separated URLs
+PRODUCT_COLUMN  = "Product URL"            # keys the sharded layout
 DOWNLOAD_ROOT   = "downloaded_images"      # where to save images
 OUTPUT_CSV_DIR  = "csv_with_image_paths"   # where to write annotated CSVs
 MAX_WORKERS     = 4                        # tune to your RAM/CPU
-REINIT_EVERY    = 50                       # restart session every N rows
+LAYOUT          = "rows"                   # "rows": <csv>/<title>_row<N>/ folders
+                                           # "sharded": image_store's images/ab/cd/ tree + manifest
+CACHE_DISK_INDEX = True                    # remember folder listings between runs (big win on network mounts)
 
 os.makedirs(DOWNLOAD_ROOT,  exist_ok=True)
 os.makedirs(OUTPUT_CSV_DIR, exist_ok=True)
 
-def create_session():
-    s = requests.Session()
-    retry = Retry(total=5, backoff_factor=1,
-                  status_forcelist=[429,500,502,503,504],
-                  allowed_methods=["GET"])
-    adapter = HTTPAdapter(max_retries=retry)
-    s.mount("https://", adapter)
-    s.mount("http://", adapter)
-    s.headers.update({
-        "User-Agent": (
-           "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"
-           " AppleWebKit/537.36 (KHTML, like Gecko)"
-           " Chrome/114.0.0.0 Safari/537.36"
-        ),
-        "Referer": "https://www.farfetch.com/"
-    })
-    return s
+timer = StageTimer(os.path.join(OUTPUT_CSV_DIR, "timings.jsonl"))
+
+# one pooled keep-alive client (HTTP/2 if available) shared by every worker;
+# retries on 429/5xx and the browser-like headers live in http_pool
+client = get_client(MAX_WORKERS)
+# a URL repeated across rows/CSVs is fetched once and hard-linked into every row folder
+fetcher = CoalescingFetcher(client)
+# which row owns which file; written from the scheduler's main thread only
+manifest = ImageManifest() if LAYOUT == "sharded" else None
 
 def sanitize_filename(name: str) -> str:
     cleaned = re.sub(r'[\\/*?:"<>|]', "", name)
     return cleaned.strip().replace(" ", "_")
 
-def download_row(session, csv_name, row_num, title, raw_urls):
-    """Download missing images for one row; return full images_path."""
-    safe = sanitize_filename(title) or f"row{row_num}"
+def column_values(df, name, blank=True):
+    """One column as a list of str; NaN → "" unless blank=False. Missing column → all ""."""
+    if name not in df.columns:
+        return [""] * len(df)
+    col = df[name].fillna("") if blank else df[name]
+    return col.astype(str).tolist()
+
+def row_paths(csv_name, row_num, title, urls, product_url):
+    """Where each of a row's images lives under the configured LAYOUT."""
+    if LAYOUT == "sharded":
+        site, item_id = product_key(product_url, urls[0] if urls else "")
+        return [image_path(site, item_id, idx) for idx in range(1, len(urls) + 1)]
+    safe = sanitize_filename(str(title)) or f"row{row_num}"
     folder_name = f"{safe}_row{row_num}"
     row_folder = os.path.join(DOWNLOAD_ROOT, csv_name, folder_name)
-    os.makedirs(row_folder, exist_ok=True)
+    return [os.path.join(row_folder, f"{folder_name}_{idx}.jpg") for idx in range(1, len(urls) + 1)]
 
+def download_row(csv_name, row_num, title, raw_urls, product_url=""):
+    """Download missing images for one row; return (row_num, saved paths, manifest records)."""
     urls = [u.strip() for u in raw_urls.split(";") if u.strip()]
-    saved = []
-
-    for idx, url in enumerate(urls, start=1):
-        fname = f"{folder_name}_{idx}.jpg"
-        out_path = os.path.join(row_folder, fname)
-
-        if os.path.exists(out_path):
-            saved.append(os.path.abspath(out_path))
-            continue
+    paths = row_paths(csv_name, row_num, title, urls, product_url)
+    if paths:
+        ensure_dir(os.path.dirname(paths[0]))
+    saved, records = [], []
 
+    for idx, (url, out_path) in enumerate(zip(urls, paths), start=1):
         try:
-            resp = session.get(url, timeout=15, stream=True)
-            resp.raise_for_status()
-            with open(out_path, "wb") as f:
-                for chunk in resp.iter_content(1024):
-                    f.write(chunk)
+            # verified existing files are skipped; truncated ones resume from their .part
+            # the CSV keeps the original URL; the resized variant actually fetched goes in the timings log
+            with timer.scrape(url, csv=csv_name, row=row_num, img=idx) as trace:
+                with stage("download"):
+                    status, trace.meta["fetched"] = fetcher.fetch(url, out_path)
+                trace.meta["status"] = status
             saved.append(os.path.abspath(out_path))
-            print(f"    ✅ Row{row_num} img{idx} saved")
+            records.append((idx, url, trace.meta["fetched"], os.path.abspath(out_path)))
+            if status == "downloaded":
+                print(f"    ✅ Row{row_num} img{idx} saved")
+            elif status == "shared":
+                print(f"    🔗 Row{row_num} img{idx} reused an earlier download")
         except Exception as e:
             print(f"    ⚠️ Row{row_num} img{idx} failed: {e}")
+            log_failures([{"stage": "imageff6", "source": csv_name, "row": row_num, "idx": idx,
+                           "url": url, "path": os.path.abspath(out_path), "reason": str(e)}])
 
-    return row_num, saved
+    return row_num, saved, records
 
-# ——— MAIN LOOP ———
+# ——— PLAN EVERY CSV ———
+# resume decisions are lookups in one scandir-built index instead of listdir/isfile per row
+index_root = IMAGE_ROOT if LAYOUT == "sharded" else DOWNLOAD_ROOT
+disk = DiskIndex(os.path.join(index_root, CACHE_NAME) if CACHE_DISK_INDEX else None)
+jobs = []
 for csv_path in glob.glob(os.path.join(CSV_DIR, "*.csv")):
     csv_name = os.path.splitext(os.path.basename(csv_path))[0]
     print(f"\n🔄 Processing `{csv_name}.csv`…")
 
     df = pd.read_csv(csv_path)
     out_csv = os.path.join(OUTPUT_CSV_DIR, f"{csv_name}.csv")
-    df["images_path"] = ""  # we’ll rebuild it from disk
+
+    if LAYOUT != "sharded":
+        disk.scan_tree(os.path.join(DOWNLOAD_ROOT, csv_name))
+
+    # plain per-column lists instead of a Series per row; titles keep str(NaN) so folder names don't move
+    raws     = column_values(df, URL_COLUMN)
+    titles   = column_values(df, TITLE_COLUMN, blank=False)
+    products = column_values(df, PRODUCT_COLUMN)
+    images_path = [""] * len(df)  # we’ll rebuild it from disk
 
     # build list of rows needing work
     to_do = []
-    for idx, row in df.iterrows():
-        rn = idx + 1
-        raw = str(row.get(URL_COLUMN, "") or "")
-        urls = [u for u in raw.split(";") if u.strip()]
-        safe = sanitize_filename(str(row.get(TITLE_COLUMN, ""))) or f"row{rn}"
-        folder_name = f"{safe}_row{rn}"
-        row_folder = os.path.join(DOWNLOAD_ROOT, csv_name, folder_name)
-
-        # gather whatever's already on disk
-        existing_files = []
-        if os.path.isdir(row_folder):
-            for fn in os.listdir(row_folder):
-                path = os.path.join(row_folder, fn)
-                if os.path.isfile(path):
-                    existing_files.append(os.path.abspath(path))
+    for rn, (raw, title, product_url) in enumerate(zip(raws, titles, products), start=1):
+        urls = [u.strip() for u in raw.split(";") if u.strip()]
+
+        # gather whatever's already on disk; .part and truncated images don't count as done
+        if LAYOUT == "sharded":
+            # file names are known up front; each shard folder is listed once, whichever row hits it first
+            existing_files = [os.path.abspath(p)
+                              for p in row_paths(csv_name, rn, "", urls, product_url)
+                              if disk.has_complete(p)]
+        else:
+            safe = sanitize_filename(title) or f"row{rn}"
+            existing_files = disk.complete_files(os.path.join(DOWNLOAD_ROOT, csv_name, f"{safe}_row{rn}"))
 
         if len(existing_files) >= len(urls):
             # done or no URLs
-            df.at[idx, "images_path"] = ";".join(sorted(existing_files))
+            images_path[rn - 1] = ";".join(sorted(existing_files))
             print(f"  • Row {rn}: already {len(existing_files)}/{len(urls)} images")
         else:
             # needs (re)download
-            to_do.append((csv_name, rn, row.get(TITLE_COLUMN, ""), raw))
-
-    # process in batches to re-init session
-    for start in range(0, len(to_do), REINIT_EVERY):
-        batch = to_do[start:start+REINIT_EVERY]
-        session = create_session()
-        print(f"→ Rows {start+1}–{start+len(batch)}…")
-
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as exe:
-            futures = {
-                exe.submit(download_row, session, name, rn, title, urls): (rn, urls)
-                for name, rn, title, urls in batch
-            }
-            for fut in as_completed(futures):
-                rn, saved = fut.result()
-                df.at[rn-1, "images_path"] = ";".join(sorted(saved))
-                print(f"  • Row {rn}: now {len(saved)} image(s)")
-                # checkpoint
-                df.to_csv(out_csv, index=False)
-
-    # final write (in case no batches ran)
+            to_do.append((csv_name, rn, title, raw, product_url))
+    df["images_path"] = images_path
+
+    print(f"→ {len(to_do)} row(s) queued from `{csv_name}.csv`")
+    jobs.append(FileJob(csv_name, to_do, {"df": df, "out_csv": out_csv}))
+
+disk.save()
+
+# ——— ONE QUEUE ACROSS ALL CSVs ———
+def row_done(job, task, result, error):
+    if error is not None:
+        print(f"  ⚠️ {job.name} row {task[1]} failed: {error}")
+        return
+    rn, saved, records = result
+    df, out_csv = job.ctx["df"], job.ctx["out_csv"]
+    if manifest is not None and records:
+        site, item_id = product_key(task[4], records[0][1])
+        manifest.record_many((job.name, rn, idx, site, item_id, url, fetched, path)
+                             for idx, url, fetched, path in records)
+    df.at[rn-1, "images_path"] = ";".join(sorted(saved))
+    print(f"  • {job.name} row {rn}: now {len(saved)} image(s)")
+    # checkpoint
     df.to_csv(out_csv, index=False)
-    print(f"✅ Finished `{csv_name}` → {out_csv}")
 
+def file_done(job):
+    # final write (also covers files with nothing to download)
+    job.ctx["df"].to_csv(job.ctx["out_csv"], index=False)
+    print(f"✅ Finished `{job.name}` → {job.ctx['out_csv']}")
+
+CrossFileScheduler(MAX_WORKERS).run(
+    jobs,
+    lambda job, task: download_row(*task),
+    on_result=row_done,
+    on_file_done=file_done,
+)
+
+timer.close()
+if manifest is not None:
+    manifest.close()
+if fetcher.shared:
+    print(f"\n🔗 {fetcher.shared} image(s) reused instead of downloaded again")
 print("\n🎉 All done!")
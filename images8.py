@@ -1,9 +1,11 @@
 import os
 import base64
-import pandas as pd
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from multiprocessing import Pool, current_process
+from csv_tasks import CHUNK_ROWS, TaskTable
+from image_cdn import candidate_urls
+from failure_log import FAILURES_CSV, log_failures
 
 # ——— CONFIG ———
 CSV_FOLDER        = "csv_folder"        # folder containing your .csv files
@@ -57,7 +59,8 @@ def init_worker():
 
 def process_row(args):
     """
-    Worker function: downloads all images for one row, returns (csv_name, row_idx, images_path_str).
+    Worker function: downloads all images for one row,
+    returns (csv_name, row_idx, images_path_str, failed images as failure_log records).
     args = (csv_name, row_idx, raw_urls, OUTPUT_IMG_ROOT)
     """
     global driver, process_count
@@ -78,33 +81,43 @@ def process_row(args):
         print(f"[{current_process().name}] Restarted ChromeDriver after {process_count} rows")
 
     urls = str(raw_urls).split(";")
-    saved = []
+    saved, failed = [], []
     for img_i, raw in enumerate(urls, start=1):
         url = raw.strip()
         if not url:
             continue
 
-        try:
-            driver.get("about:blank")
-            b64 = driver.execute_async_script(JS_FETCH_BASE64, url)
-        except Exception as e:
-            print(f"[{current_process().name}] ⚠️ fetch exception row{row_idx+1} img{img_i}: {e}")
-            continue
+        b64, reason = None, "empty response"
+        # smallest CDN variant ≥ TARGET_PX first, the original if that one doesn't exist
+        for candidate in candidate_urls(url):
+            try:
+                driver.get("about:blank")
+                b64 = driver.execute_async_script(JS_FETCH_BASE64, candidate)
+            except Exception as e:
+                # script timeout / JS error on one variant: still try the next
+                print(f"[{current_process().name}] ⚠️ fetch exception row{row_idx+1} img{img_i}: {e}")
+                reason = str(e)
+                continue
+            if b64:
+                break
 
+        out_file = os.path.join(images_dir, f"{img_i}.jpg")
         if not b64:
-            # empty response; will be retried later
+            # kept for the log even if the row's other images arrive (then it isn't retried)
+            failed.append({"stage": "images8", "source": base_name, "row": row_idx+1, "idx": img_i,
+                           "url": url, "path": os.path.abspath(out_file), "reason": reason})
             continue
 
         data = base64.b64decode(b64)
-        out_file = os.path.join(images_dir, f"{img_i}.jpg")
         with open(out_file, "wb") as f:
             f.write(data)
         saved.append(os.path.abspath(out_file))
 
-    return (csv_name, row_idx, ";".join(saved))
+    return (csv_name, row_idx, ";".join(saved), failed)
 
 if __name__ == "__main__":
     pool = Pool(processes=N_WORKERS, initializer=init_worker)
+    failures = []  # every image still missing after the retry pass
 
     for fname in os.listdir(CSV_FOLDER):
         if not fname.lower().endswith(".csv"):
@@ -114,40 +127,39 @@ if __name__ == "__main__":
         out_csv_path = os.path.join(OUTPUT_CSV_FOLDER, fname)
         print(f"\n▶ Processing '{fname}'")
 
-        df_orig = pd.read_csv(csv_path)
-        if os.path.exists(out_csv_path):
-            df = pd.read_csv(out_csv_path)
-            done = df[NEW_COL].str.strip().astype(bool).sum()
-            print(f"  ↻ Resuming: {done}/{len(df)} rows done")
+        table = TaskTable(csv_path, out_csv_path, URL_COL, NEW_COL)
+        if table.resumed:
+            print(f"  ↻ Resuming: {table.done}/{len(table)} rows done")
         else:
-            df = df_orig.copy()
-            df[NEW_COL] = ""
-            print(f"  ▶ Starting fresh: {len(df)} rows")
+            print(f"  ▶ Starting fresh: {len(table)} rows")
+        if table.stream:
+            print(f"  ⏬ Large CSV: planning and writing in {CHUNK_ROWS}-row chunks")
 
         # **First pass**: dispatch all incomplete rows
-        tasks = [
-            (fname, idx, row.get(URL_COL, ""), OUTPUT_IMG_ROOT)
-            for idx, row in df.iterrows()
-            if not (isinstance(row[NEW_COL], str) and row[NEW_COL].strip())
-        ]
-        for csv_name, row_idx, img_paths in pool.imap_unordered(process_row, tasks):
-            df.at[row_idx, NEW_COL] = img_paths
-            df.to_csv(out_csv_path, index=False)
+        row_failures = {}   # row → images its last attempt missed
+        tasks = [(fname, idx, raw, OUTPUT_IMG_ROOT) for idx, raw in table.pending()]
+        for csv_name, row_idx, img_paths, failed in pool.imap_unordered(process_row, tasks):
+            table.set(row_idx, img_paths)
+            row_failures[row_idx] = failed
 
         # **Retry pass**: pick up any rows still empty
-        remaining = [
-            (fname, idx, row.get(URL_COL, ""), OUTPUT_IMG_ROOT)
-            for idx, row in df.iterrows()
-            if not row[NEW_COL].strip()
-        ]
+        remaining = [(fname, idx, raw, OUTPUT_IMG_ROOT) for idx, raw in table.pending()]
         if remaining:
             print(f"  🔁 Retrying {len(remaining)} failed rows...")
-            for csv_name, row_idx, img_paths in pool.imap_unordered(process_row, remaining):
-                df.at[row_idx, NEW_COL] = img_paths
-                df.to_csv(out_csv_path, index=False)
+            for csv_name, row_idx, img_paths, failed in pool.imap_unordered(process_row, remaining):
+                table.set(row_idx, img_paths)
+                row_failures[row_idx] = failed
+        table.save()
+        for failed in row_failures.values():
+            failures.extend(failed)
 
         print(f"  ✔ Finished '{fname}', wrote '{out_csv_path}'")
 
     pool.close()
     pool.join()
+
+    # one record per missing image, so `image_validate.py retry` can refetch them
+    if failures:
+        log_failures(failures)
+        print(f"\n⚠️  Logged {len(failures)} failed images to {FAILURES_CSV}")
     print("\n🏁 All done! Images →", OUTPUT_IMG_ROOT, " CSVs →", OUTPUT_CSV_FOLDER)
@@ -7,26 +7,29 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from profile_templates import cloned_profile
+
 # === CONFIG ===
 INPUT_CSV = "product_urls.csv"
 OUTPUT_CSV = "nakd_product_details.csv"
 PAGE_LOAD_PAUSE = 2.0
 CLICK_PAUSE = 1.0
 WAIT_TIMEOUT = 10
+ORIGIN = "https://www.na-kd.com"   # profile template (consent, region) is warmed here once
 
 
-def init_driver():
+def init_driver(profile_dir=None):
     """Initialize Selenium WebDriver with Chrome options."""
     options = Options()
     options.add_argument("--start-maximized")
+    # keeps navigator.webdriver false from the first script on, no per-driver CDP call
+    options.add_argument("--disable-blink-features=AutomationControlled")
     options.add_experimental_option("excludeSwitches", ["enable-automation"])
     options.add_experimental_option("useAutomationExtension", False)
+    if profile_dir:
+        options.add_argument(f"--user-data-dir={profile_dir}")
     driver = webdriver.Chrome(options=options)
     driver.implicitly_wait(5)
-    driver.execute_cdp_cmd(
-        "Page.addScriptToEvaluateOnNewDocument",
-        {"source": "Object.defineProperty(navigator, 'webdriver', {get:() => undefined});"},
-    )
     return driver
 
 
@@ -159,15 +162,16 @@ def main():
     df = pd.read_csv(INPUT_CSV)
     urls = df["product_url"].dropna().unique().tolist()
 
-    driver = init_driver()
     results = []
-    for url in urls:
-        print("🔍", url)
-        try:
-            results.append(scrape_product(driver, url))
-        except Exception as e:
-            print("  ❌ failed:", e)
-    driver.quit()
+    with cloned_profile(ORIGIN, init_driver) as profile_dir:
+        driver = init_driver(profile_dir)
+        for url in urls:
+            print("🔍", url)
+            try:
+                results.append(scrape_product(driver, url))
+            except Exception as e:
+                print("  ❌ failed:", e)
+        driver.quit()
 
     # save results
     out = pd.DataFrame(results)
@@ -1,16 +1,36 @@
+import sys
+import glob
+
 import pandas as pd
 
+from url_parse import parse_url_column
+
+CHUNK_ROWS = 200_000   # URLs parsed per vectorised batch
+
+
+def iter_url_chunks(paths):
+    """Yield the first column of every CSV, CHUNK_ROWS URLs at a time."""
+    for path in paths:
+        for chunk in pd.read_csv(path, usecols=[0], chunksize=CHUNK_ROWS, dtype=str):
+            yield chunk.iloc[:, 0].dropna()
+
+
 def main():
-    # 1) read your CSV (assumes URLs in the first column)
-    df = pd.read_csv('product_urls.csv')
-    urls = df.iloc[:, 0].dropna().astype(str).tolist()
+    # 1) read your CSV(s) (assumes URLs in the first column); pass files or globs to
+    #    recount across every crawled URL file, e.g. python parentcategory.py 'kidswear/**/*.csv'
+    patterns = sys.argv[1:] or ['product_urls.csv']
+    paths = sorted({p for pat in patterns for p in glob.glob(pat, recursive=True)})
 
-    # 2) pull the slug before “-item” and take its last token as a candidate
-    slugs = [u.split('/')[-1].split('-item')[0] for u in urls]
-    candidates = [s.split('-')[-1] for s in slugs]
+    # 2) parse site / item id / slug / brand / category token for each batch in one pass,
+    #    and take the category token (last slug token) as the candidate
+    counts = pd.Series(dtype='int64')
+    for urls in iter_url_chunks(paths):
+        parsed = parse_url_column(urls)
+        batch = parsed['category_token'].dropna().value_counts()
+        counts = counts.add(batch, fill_value=0)
 
     # 3) count frequencies
-    freq = pd.Series(candidates).value_counts().reset_index()
+    freq = counts.astype('int64').sort_values(ascending=False, kind='stable').reset_index()
     freq.columns = ['category_candidate', 'count']
 
     # 4) show top 20
@@ -0,0 +1,228 @@
+import os
+import csv
+import glob
+import time
+import shutil
+import argparse
+import tempfile
+
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+# ─── CONFIG ────────────────────────────────────────────────────────────────────
+INPUT_DIRS     = ["scraped_results", "csv_with_image_paths"]  # CSV stages to convert
+OUTPUT_DIR     = "parquet"            # one dataset folder per CSV goes here
+ROW_GROUP_SIZE = 5000                 # rows buffered before a row group is written
+CSV_BLOCK_SIZE = 16 << 20             # bytes per streamed CSV batch
+COMPRESSION    = "zstd"
+
+# column name → separator the scrapers used to flatten it into one string
+LIST_COLUMNS = {
+    "Image URLs":  r"\s*;\s*",
+    "image_urls":  r"\s*;\s*",
+    "images_path": r"\s*;\s*",
+    "Description": r"\s*\|\s*",
+}
+
+STR_LIST = pa.list_(pa.string())
+
+
+# ─── SCHEMA & COLUMN CONVERSION ────────────────────────────────────────────────
+def build_schema(fieldnames):
+    """
+    Arrow schema for a scraper CSV header: every column is a string,
+    except the flattened ones in LIST_COLUMNS which become list<string>.
+    """
+    return pa.schema([
+        (name, STR_LIST if name in LIST_COLUMNS else pa.string())
+        for name in fieldnames
+    ])
+
+
+def split_list_column(arr, pattern):
+    """
+    Vectorised split of a joined string column into list<string>.
+    Blank / null cells become empty lists instead of [""].
+    """
+    arr = pc.utf8_trim_whitespace(pc.fill_null(arr, ""))
+    parts = pc.split_pattern_regex(arr, pattern=pattern)
+    empty = pa.scalar([], type=STR_LIST)
+    return pc.if_else(pc.equal(arr, ""), empty, parts)
+
+
+def convert_batch(batch, schema):
+    """Turn a string-only RecordBatch into one matching `schema`."""
+    cols = []
+    for field in schema:
+        col = batch.column(batch.schema.get_field_index(field.name))
+        if field.name in LIST_COLUMNS:
+            col = split_list_column(col, LIST_COLUMNS[field.name])
+        cols.append(col)
+    return pa.RecordBatch.from_arrays(cols, schema=schema)
+
+
+def join_list_value(name, value):
+    """Python-side equivalent of split_list_column for a single cell."""
+    if isinstance(value, (list, tuple)):
+        return [v for v in value if v]
+    text = (value or "").strip()
+    if not text:
+        return []
+    sep = "|" if name == "Description" else ";"
+    return [part.strip() for part in text.split(sep) if part.strip()]
+
+
+# ─── STREAMING ROW-GROUP WRITER ────────────────────────────────────────────────
+class ParquetRowWriter:
+    """
+    Append-only writer the scrapers can push rows into one at a time.
+
+    Rows are buffered and flushed as one row group every `row_group_size`
+    rows.  Parquet files can't be reopened for append, so each writer opens
+    a new part file inside `dataset_dir`; readers load the whole folder.
+    """
+
+    def __init__(self, dataset_dir, fieldnames, row_group_size=ROW_GROUP_SIZE):
+        os.makedirs(dataset_dir, exist_ok=True)
+        self.schema = build_schema(fieldnames)
+        self.row_group_size = row_group_size
+        self.path = os.path.join(
+            dataset_dir, f"part-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.parquet"
+        )
+        self._buffer = {name: [] for name in self.schema.names}
+        self._rows = 0
+        self._writer = None
+
+    def append(self, row):
+        for name in self.schema.names:
+            value = row.get(name)
+            if name in LIST_COLUMNS:
+                value = join_list_value(name, value)
+            elif value is not None:
+                value = str(value)
+            self._buffer[name].append(value)
+        self._rows += 1
+        if self._rows >= self.row_group_size:
+            self.flush()
+
+    def write_batch(self, batch):
+        """Write an already-converted RecordBatch as its own row group."""
+        self.flush()
+        self._open().write_batch(batch)
+
+    def flush(self):
+        if not self._rows:
+            return
+        table = pa.table(self._buffer, schema=self.schema)
+        self._open().write_table(table)
+        self._buffer = {name: [] for name in self.schema.names}
+        self._rows = 0
+
+    def close(self):
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def _open(self):
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, self.schema, compression=COMPRESSION)
+        return self._writer
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ─── CSV → PARQUET ─────────────────────────────────────────────────────────────
+def read_header(csv_path):
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        return next(csv.reader(f), [])
+
+
+def convert_csv(csv_path, dataset_dir):
+    """
+    Stream one scraper CSV into a Parquet dataset folder without ever
+    holding the whole file in memory.  Returns the number of rows written.
+    """
+    fieldnames = read_header(csv_path)
+    if not fieldnames:
+        return 0
+
+    reader = pacsv.open_csv(
+        csv_path,
+        read_options=pacsv.ReadOptions(block_size=CSV_BLOCK_SIZE),
+        # scraped descriptions contain line breaks inside quoted fields
+        parse_options=pacsv.ParseOptions(newlines_in_values=True),
+        convert_options=pacsv.ConvertOptions(
+            column_types={name: pa.string() for name in fieldnames},
+            strings_can_be_null=False,
+        ),
+    )
+    # write next to the dataset and swap in at the end: a parse error halfway
+    # through must not cost the previous export of this CSV
+    parent = os.path.dirname(os.path.abspath(dataset_dir))
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(dir=parent, prefix=f".{os.path.basename(dataset_dir)}-")
+    try:
+        rows = 0
+        with ParquetRowWriter(staging, fieldnames) as writer:
+            for batch in reader:
+                writer.write_batch(convert_batch(batch, writer.schema))
+                rows += batch.num_rows
+
+        os.makedirs(dataset_dir, exist_ok=True)
+        for old in glob.glob(os.path.join(dataset_dir, "*.parquet")):
+            os.remove(old)
+        for name in os.listdir(staging):
+            os.replace(os.path.join(staging, name), os.path.join(dataset_dir, name))
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return rows
+
+
+def load_catalogue(path=OUTPUT_DIR, columns=None):
+    """
+    Load one dataset folder (or the whole OUTPUT_DIR) as a DataFrame.
+    Pass `columns` to read only what the analysis needs.
+    """
+    import pyarrow.dataset as ds
+    dataset = ds.dataset(path, format="parquet")
+    return dataset.to_table(columns=columns).to_pandas()
+
+
+# ─── MAIN ──────────────────────────────────────────────────────────────────────
+def main():
+    parser = argparse.ArgumentParser(description="Convert scraper CSVs to Parquet")
+    parser.add_argument("inputs", nargs="*", default=INPUT_DIRS,
+                        help="CSV files or folders of CSVs")
+    parser.add_argument("--out", default=OUTPUT_DIR)
+    args = parser.parse_args()
+
+    csv_paths = []
+    for inp in args.inputs:
+        if os.path.isdir(inp):
+            csv_paths.extend(sorted(glob.glob(os.path.join(inp, "*.csv"))))
+        elif os.path.isfile(inp):
+            csv_paths.append(inp)
+
+    if not csv_paths:
+        print("Nothing to convert.")
+        return
+
+    for csv_path in csv_paths:
+        stage = os.path.basename(os.path.dirname(os.path.abspath(csv_path)))
+        name = os.path.splitext(os.path.basename(csv_path))[0]
+        dataset_dir = os.path.join(args.out, stage, name)
+        rows = convert_csv(csv_path, dataset_dir)
+        print(f"✔ {csv_path} → {dataset_dir} ({rows} rows)")
+
+    print("✅ All done — Parquet datasets in", args.out)
+
+
+if __name__ == "__main__":
+    main()
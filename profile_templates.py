@@ -0,0 +1,138 @@
+import os
+import json
+import time
+import shutil
+import tempfile
+import threading
+import contextlib
+from urllib.parse import urlsplit
+
+from url_parse import site_of
+
+# ─── CONFIG ────────────────────────────────────────────────────────────────────
+TEMPLATE_DIR = "browser_profiles"   # one warmed-up profile per origin lives here
+MAX_AGE      = 24 * 3600            # re-warm templates older than this (cookies/consent expire)
+WARMUP_PAUSE = 2                    # let the homepage set its own cookies before we snapshot
+
+# what "warm" means per site: localStorage flags, cookies, and a consent button to click
+SITE_WARMUPS = {
+    "farfetch": {
+        "local_storage": {"newsletter_popup_shown": "true"},
+        "cookies": [],
+        "consent": "#onetrust-accept-btn-handler",
+    },
+    "nakd": {
+        "local_storage": {},
+        "cookies": [],
+        "consent": "button#onetrust-accept-btn-handler, button[data-testid='accept-all-cookies']",
+    },
+    "asos": {
+        "local_storage": {},
+        "cookies": [],
+        "consent": "#onetrust-accept-btn-handler",
+    },
+}
+
+# bulky or per-process files that make a clone slow or refuse to start
+SKIP_ON_CLONE = shutil.ignore_patterns(
+    # Chrome
+    "Singleton*", "Cache", "Code Cache", "GPUCache", "GrShaderCache",
+    "ShaderCache", "Crashpad", "*.log", "BrowserMetrics*",
+    # Firefox
+    "lock", ".parentlock", "parent.lock", "cache2", "startupCache",
+    "crashes", "minidumps", "saved-telemetry-pings", "datareporting",
+)
+
+_warm_lock = threading.Lock()
+
+
+def template_path(origin):
+    netloc = urlsplit(origin).netloc.replace(":", "_")
+    return os.path.join(TEMPLATE_DIR, netloc)
+
+
+def _meta_path(path):
+    return os.path.join(path, "template.json")
+
+
+def is_fresh(origin, max_age=MAX_AGE):
+    try:
+        with open(_meta_path(template_path(origin)), encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return time.time() - meta.get("created", 0) < max_age
+
+
+def warm_up(driver, origin, site=None):
+    """
+    Load the homepage once and leave behind everything later drivers would redo.
+    `site` picks the SITE_WARMUPS entry when the origin isn't the real shop
+    (e.g. a synthetic_shop.py instance standing in for Farfetch).
+    """
+    warm = SITE_WARMUPS.get(site or site_of(origin), {})
+    driver.get(origin)
+    for key, value in warm.get("local_storage", {}).items():
+        driver.execute_script("window.localStorage.setItem(arguments[0], arguments[1]);", key, value)
+    for cookie in warm.get("cookies", []):
+        driver.add_cookie(cookie)
+    if warm.get("consent"):
+        try:
+            driver.execute_script(
+                "const b = document.querySelector(arguments[0]); if (b) b.click();",
+                warm["consent"],
+            )
+        except Exception:
+            pass
+    time.sleep(WARMUP_PAUSE)
+
+
+def ensure_template(origin, launch, max_age=MAX_AGE, site=None):
+    """
+    Path of a warmed-up profile for `origin`, building it if missing or stale.
+
+    `launch(profile_dir)` must start a driver that uses profile_dir in
+    place (Chrome --user-data-dir, Firefox -profile).  The warm-up runs in
+    a staging folder that only replaces the template after the browser
+    has quit cleanly, so a crash never leaves a half-written template.
+    """
+    path = template_path(origin)
+    with _warm_lock:
+        if is_fresh(origin, max_age):
+            return path
+        print(f"🔥 warming browser profile for {origin}")
+        staging = path + ".staging"
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        driver = launch(os.path.abspath(staging))
+        try:
+            warm_up(driver, origin, site)
+        finally:
+            driver.quit()
+        with open(_meta_path(staging), "w", encoding="utf-8") as f:
+            json.dump({"origin": origin, "created": time.time()}, f)
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(staging, path)
+        return path
+
+
+def clone_template(origin, launch, max_age=MAX_AGE, site=None):
+    """Copy of the origin's template in a temp folder, for one driver to own."""
+    src = ensure_template(origin, launch, max_age, site)
+    dst = tempfile.mkdtemp(prefix="profile-")
+    shutil.copytree(src, dst, ignore=SKIP_ON_CLONE, dirs_exist_ok=True)
+    return dst
+
+
+@contextlib.contextmanager
+def cloned_profile(origin, launch, max_age=MAX_AGE, site=None):
+    """
+    with cloned_profile(origin, init) as profile_dir:
+        driver = init(profile_dir)   # already has cookies/localStorage/consent
+    The clone is deleted afterwards; quit the driver inside the block.
+    """
+    path = clone_template(origin, launch, max_age, site)
+    try:
+        yield path
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,151 @@
+import os
+import csv
+import struct
+import bisect
+import hashlib
+from array import array
+
+from url_parse import parse_product_url
+
+# ─── CONFIG ────────────────────────────────────────────────────────────────────
+INDEX_SUFFIX = ".idx"      # saved next to the output CSV: scraped_results/foo.csv.idx
+MAGIC        = b"RIX1"
+HEADER       = struct.Struct("<4sHqqq")  # magic, n_fields, csv size, csv mtime_ns, rows
+
+
+def url_key(url):
+    """64-bit key for a product URL: hash of (site, item_id), so query strings don't matter."""
+    site, item_id = parse_product_url(url)
+    digest = hashlib.blake2b(f"{site}:{item_id}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little", signed=True)
+
+
+class ResumeIndex:
+    """
+    Completeness index for one scraper output CSV.
+
+    Instead of holding every row (`load_existing`), it keeps two flat
+    arrays: sorted 64-bit URL keys and one bitmask per key with bit i set
+    when fields[i] is non-blank.  ~9 bytes per product, persisted to
+    <csv>.idx and only rebuilt when the CSV changed behind its back.
+    """
+
+    def __init__(self, csv_path, fields, url_field="Product URL"):
+        if len(fields) > 8:
+            raise ValueError("ResumeIndex tracks at most 8 fields")
+        self.csv_path = csv_path
+        self.fields = list(fields)
+        self.url_field = url_field
+        self.full = (1 << len(self.fields)) - 1
+        self.keys = array("q")
+        self.masks = array("B")
+        self._new = {}  # key → mask for rows added since the arrays were built
+
+    # ── build / persist ──
+    @classmethod
+    def open(cls, csv_path, fields, url_field="Product URL"):
+        idx = cls(csv_path, fields, url_field)
+        if not idx._load():
+            idx._rebuild()
+        return idx
+
+    @property
+    def index_path(self):
+        return self.csv_path + INDEX_SUFFIX
+
+    def _stamp(self):
+        try:
+            st = os.stat(self.csv_path)
+        except FileNotFoundError:
+            return 0, 0
+        return st.st_size, st.st_mtime_ns
+
+    def mask_of(self, row):
+        mask = 0
+        for bit, name in enumerate(self.fields):
+            if (row.get(name) or "").strip():
+                mask |= 1 << bit
+        return mask
+
+    def _rebuild(self):
+        """Stream the CSV once; row contents are dropped as soon as they're masked."""
+        merged = {}
+        if os.path.isfile(self.csv_path):
+            with open(self.csv_path, newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    url = (row.get(self.url_field) or "").strip()
+                    if url:
+                        key = url_key(url)
+                        merged[key] = merged.get(key, 0) | self.mask_of(row)
+        self._set_arrays(merged)
+
+    def _set_arrays(self, merged):
+        keys = sorted(merged)
+        self.keys = array("q", keys)
+        self.masks = array("B", (merged[k] for k in keys))
+        self._new = {}
+
+    def _load(self):
+        try:
+            with open(self.index_path, "rb") as f:
+                magic, n_fields, size, mtime, rows = HEADER.unpack(f.read(HEADER.size))
+                if magic != MAGIC or n_fields != len(self.fields) or (size, mtime) != self._stamp():
+                    return False
+                keys, masks = array("q"), array("B")
+                keys.fromfile(f, rows)
+                masks.fromfile(f, rows)
+        except (OSError, EOFError, struct.error):
+            return False
+        self.keys, self.masks, self._new = keys, masks, {}
+        return True
+
+    def save(self):
+        """Fold in new rows and write <csv>.idx stamped with the CSV's current size/mtime."""
+        if self._new:
+            merged = dict(zip(self.keys, self.masks))
+            for k, m in self._new.items():
+                merged[k] = merged.get(k, 0) | m
+            self._set_arrays(merged)
+        size, mtime = self._stamp()
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(HEADER.pack(MAGIC, len(self.fields), size, mtime, len(self.keys)))
+            self.keys.tofile(f)
+            self.masks.tofile(f)
+        os.replace(tmp, self.index_path)
+
+    def discard(self):
+        """Drop <csv>.idx (e.g. after a failed write) so the next open rebuilds it from the CSV."""
+        try:
+            os.remove(self.index_path)
+        except FileNotFoundError:
+            pass
+
+    # ── lookups ──
+    def _pos(self, key):
+        i = bisect.bisect_left(self.keys, key)
+        return i if i < len(self.keys) and self.keys[i] == key else -1
+
+    def get_mask(self, url):
+        """Field bitmask for `url`, or None if it isn't in the output yet."""
+        key = url_key(url)
+        pos = self._pos(key)
+        mask = self.masks[pos] if pos >= 0 else None
+        if key in self._new:
+            mask = (mask or 0) | self._new[key]
+        return mask
+
+    def __contains__(self, url):
+        return self.get_mask(url) is not None
+
+    def is_complete(self, url):
+        return self.get_mask(url) == self.full
+
+    def pending(self, urls):
+        """URLs (input order) that are missing or have any blank field."""
+        return [u for u in urls if not self.is_complete(u)]
+
+    def add(self, url, row):
+        """Record a written/updated row; fields only ever go from blank to filled."""
+        key = url_key(url)
+        self._new[key] = self._new.get(key, 0) | self.mask_of(row)
@@ -0,0 +1,193 @@
+import io
+import os
+import csv
+import time
+import queue
+import tempfile
+import threading
+
+# ─── CONFIG ────────────────────────────────────────────────────────────────────
+BATCH_SIZE     = 200     # commit once this many rows are queued…
+FLUSH_INTERVAL = 2.0     # …or this many seconds after the first queued row
+FSYNC          = "batch" # "batch" = fsync every commit, "interval" = at most every FSYNC_EVERY s, "never"
+FSYNC_EVERY    = 10.0
+
+_STOP = object()
+
+
+def repair_tail(path):
+    """
+    Drop a half-written last line left by a crash mid-append, so the
+    next append starts on a fresh row.  Returns bytes removed.
+    """
+    try:
+        size = os.path.getsize(path)
+    except FileNotFoundError:
+        return 0
+    if not size:
+        return 0
+    with open(path, "rb+") as f:
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) == b"\n":
+            return 0
+        # walk back to the previous newline
+        pos = size
+        while pos > 0:
+            step = min(64 * 1024, pos)
+            pos -= step
+            f.seek(pos)
+            chunk = f.read(step)
+            nl = chunk.rfind(b"\n")
+            if nl >= 0:
+                keep = pos + nl + 1
+                f.truncate(keep)
+                return size - keep
+        f.truncate(0)
+        return size
+
+
+class CSVRowWriter(threading.Thread):
+    """
+    Dedicated writer thread for one output CSV.
+
+    Scraper threads call append()/update() and return immediately; the
+    writer drains the queue and commits in batches:
+      • appends only → one buffered write + flush (+ fsync per FSYNC policy)
+      • any updates  → the file is rewritten into a temp file in the same
+        folder and os.replace()d over the original, so readers see either
+        the old or the new file, never a half-written one
+    Updates fill blank fields only, like ff7's old update_row_inplace.
+    """
+
+    def __init__(self, path, fieldnames, key_fn=None, key_field=None,
+                 batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL, fsync=FSYNC):
+        super().__init__(daemon=True, name=f"writer:{os.path.basename(path)}")
+        self.path = path
+        self.fieldnames = list(fieldnames)
+        self.key_field = key_field or self.fieldnames[0]
+        self.key_fn = key_fn or (lambda v: v)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.committed = 0
+        self.errors = []
+        self._q = queue.Queue()
+        self._last_fsync = 0.0
+        repair_tail(path)
+        self.start()
+
+    # ── producer side ──
+    def append(self, row):
+        self._q.put(("append", row))
+
+    def update(self, row):
+        self._q.put(("update", row))
+
+    def close(self):
+        """Commit everything still queued and stop the thread."""
+        self._q.put(_STOP)
+        self.join()
+        if self.errors:
+            raise self.errors[0]
+
+    # ── writer thread ──
+    def run(self):
+        stop = False
+        while not stop:
+            batch = []
+            item = self._q.get()
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self._q.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+            if batch:
+                try:
+                    self._commit(batch)
+                except Exception as e:
+                    print(f"⚠️ writer for {self.path} failed: {e}")
+                    self.errors.append(e)
+
+    def _commit(self, batch):
+        appends = [row for op, row in batch if op == "append"]
+        updates = [row for op, row in batch if op == "update"]
+        if updates:
+            self._rewrite(appends, updates)
+        else:
+            self._append(appends)
+        self.committed += len(batch)
+
+    def _rows_text(self, rows, header):
+        buf = io.StringIO()
+        writer = csv.DictWriter(buf, fieldnames=self.fieldnames, extrasaction="ignore")
+        if header:
+            writer.writeheader()
+        writer.writerows(rows)
+        return buf.getvalue()
+
+    def _maybe_fsync(self, f, force=False):
+        if self.fsync == "never":
+            return
+        now = time.monotonic()
+        if force or self.fsync == "batch" or now - self._last_fsync >= FSYNC_EVERY:
+            os.fsync(f.fileno())
+            self._last_fsync = now
+
+    def _append(self, rows):
+        is_new = not os.path.isfile(self.path) or os.path.getsize(self.path) == 0
+        with open(self.path, "a", newline="", encoding="utf-8") as f:
+            f.write(self._rows_text(rows, header=is_new))
+            f.flush()
+            self._maybe_fsync(f)
+
+    def _fill_blanks(self, row, new_row):
+        for name in self.fieldnames[1:]:
+            if not (row.get(name) or "").strip() and (new_row.get(name) or "").strip():
+                row[name] = new_row[name]
+
+    def _rewrite(self, appends, updates):
+        # updates merge into a row appended in this same batch, or into each other
+        appended = {self.key_fn(row[self.key_field]): row for row in appends}
+        pending = {}
+        for row in updates:
+            key = self.key_fn(row[self.key_field])
+            if key in appended:
+                self._fill_blanks(appended[key], row)
+            elif key in pending:
+                self._fill_blanks(pending[key], row)
+            else:
+                pending[key] = dict(row)
+
+        folder = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(dir=folder, prefix=".", suffix=".tmp")
+        try:
+            # mkstemp files are 0600; keep the output's own permissions
+            mode = os.stat(self.path).st_mode if os.path.isfile(self.path) else 0o644
+            os.chmod(tmp, mode & 0o777)
+            with os.fdopen(fd, "w", newline="", encoding="utf-8") as wf:
+                writer = csv.DictWriter(wf, fieldnames=self.fieldnames, extrasaction="ignore")
+                writer.writeheader()
+                if os.path.isfile(self.path):
+                    with open(self.path, newline="", encoding="utf-8") as rf:
+                        for row in csv.DictReader(rf):
+                            new_row = pending.pop(self.key_fn(row[self.key_field]), None)
+                            if new_row is not None:
+                                self._fill_blanks(row, new_row)
+                            writer.writerow(row)
+                # updates for rows that never reached the file become appends
+                writer.writerows(pending.values())
+                writer.writerows(appends)
+                wf.flush()
+                self._maybe_fsync(wf, force=self.fsync != "never")
+            os.replace(tmp, self.path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
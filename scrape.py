@@ -0,0 +1,143 @@
+import sys
+import argparse
+
+# Entry point for every pipeline stage.  Nothing heavy is imported up here:
+# each subcommand imports its own module when it runs, so offline steps
+# (categorise, dedupe, stats) never load selenium, pandas or bs4, and
+# browser stages only pay for what they use.
+
+BROWSER_STAGES = {
+    "ff-details":   "ff7",
+    "ff-listing":   "farfetch_resumethreadingpg",
+    "ff-sections":  "ayush1",
+    "asos-details": "asosdetails",
+    "nakd-details": "na-kd6",
+    "images":       "imageff6",
+}
+
+
+def cmd_categorise(args):
+    import category
+    category.main()
+
+
+def cmd_dedupe(args):
+    import os
+    import csv
+    import tempfile
+    from resume_index import url_key
+
+    for path in args.paths:
+        seen = set()
+        kept = dropped = 0
+        folder = os.path.dirname(os.path.abspath(path))
+        fd, tmp = tempfile.mkstemp(dir=folder, prefix=".", suffix=".tmp")
+        os.chmod(tmp, os.stat(path).st_mode & 0o777)
+        with open(path, newline="", encoding="utf-8") as rf, \
+             os.fdopen(fd, "w", newline="", encoding="utf-8") as wf:
+            reader = csv.reader(rf)
+            writer = csv.writer(wf)
+            header = next(reader, None)
+            if header is None:
+                os.remove(tmp)
+                continue
+            col = header.index(args.column) if args.column in header else 0
+            writer.writerow(header)
+            for row in reader:
+                url = row[col].strip() if len(row) > col else ""
+                # same product under another query string / colour slug counts as a dupe
+                if url:
+                    key = url_key(url)
+                    if key in seen:
+                        dropped += 1
+                        continue
+                    seen.add(key)
+                writer.writerow(row)
+                kept += 1
+        if args.dry_run:
+            os.remove(tmp)
+        else:
+            os.replace(tmp, path)
+        print(f"✔ {path}: kept {kept}, dropped {dropped} duplicate rows")
+
+
+def cmd_stats(args):
+    import csv
+    import glob
+    from collections import Counter
+    from url_parse import parse_product_url
+
+    paths = sorted({p for pat in args.paths for p in glob.glob(pat, recursive=True)})
+    for path in paths:
+        rows = 0
+        sites = Counter()
+        items = set()
+        blanks = Counter()
+        with open(path, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            fields = reader.fieldnames or []
+            url_col = next((c for c in fields if c in ("Product URL", "product_url", "url")), None)
+            for row in reader:
+                rows += 1
+                for name in fields:
+                    if not (row.get(name) or "").strip():
+                        blanks[name] += 1
+                if url_col and row.get(url_col):
+                    site, item_id = parse_product_url(row[url_col])
+                    sites[site] += 1
+                    items.add((site, item_id))
+        print(f"{path}: {rows} rows, {len(items)} unique products")
+        for site, n in sites.most_common():
+            print(f"   {site or '?':12s} {n}")
+        for name, n in blanks.most_common():
+            print(f"   blank {name:20s} {n}")
+
+
+def cmd_drivers(args):
+    from driver_cache import resolve_driver
+    for browser in ("chrome", "firefox"):
+        print(f"{browser:8s} {resolve_driver(browser, refresh=args.refresh) or '(Selenium Manager)'}")
+
+
+def cmd_run(args):
+    import runpy
+    script = BROWSER_STAGES.get(args.stage, args.stage)
+    if not script.endswith(".py"):
+        script += ".py"
+    sys.argv = [script] + args.rest
+    runpy.run_path(script, run_name="__main__")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scraping pipeline stages")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    sub.add_parser("categorise", help="split product_urls.csv into category folders (offline)")
+
+    dd = sub.add_parser("dedupe", help="drop repeated products from URL CSVs, in place (offline)")
+    dd.add_argument("paths", nargs="+")
+    dd.add_argument("--column", default="product_url")
+    dd.add_argument("--dry-run", action="store_true")
+
+    st = sub.add_parser("stats", help="rows, unique products and blank fields per CSV (offline)")
+    st.add_argument("paths", nargs="+", help="CSV files or glob patterns")
+
+    dr = sub.add_parser("drivers", help="show the cached chromedriver/geckodriver paths")
+    dr.add_argument("--refresh", action="store_true")
+
+    run = sub.add_parser("run", help=f"run a browser stage: {', '.join(BROWSER_STAGES)} or a script name")
+    run.add_argument("stage")
+    run.add_argument("rest", nargs=argparse.REMAINDER)
+
+    args = parser.parse_args()
+    {
+        "categorise": cmd_categorise,
+        "dedupe": cmd_dedupe,
+        "stats": cmd_stats,
+        "drivers": cmd_drivers,
+        "run": cmd_run,
+    }[args.cmd](args)
+
+
+if __name__ == "__main__":
+    main()
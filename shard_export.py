@@ -0,0 +1,264 @@
+import io
+import os
+import re
+import csv
+import glob
+import json
+import shutil
+import tarfile
+import argparse
+import tempfile
+import threading
+
+from image_engine import is_complete_image
+from image_store import product_key, URL_COLUMNS, IMAGE_COLUMNS, PATH_COLUMN
+
+# ─── CONFIG ────────────────────────────────────────────────────────────────────
+INPUT_DIRS   = ["csv_with_image_paths", "output_csv_with_paths"]  # CSVs with an images_path column
+OUTPUT_DIR   = "shards"
+SHARD_BYTES  = 1 << 30       # start a new shard after ~1 GiB; a sample never straddles two
+INDEX_SUFFIX = ".idx"        # per-shard "<member>\t<offset>\t<size>" lines
+BLOCK        = tarfile.BLOCKSIZE
+
+
+# ─── WRITER ────────────────────────────────────────────────────────────────────
+def sample_key(csv_path, row):
+    """
+    <folder>_<csv>-<row>: the stage folder is part of the key because the
+    same CSV name exists in several of them.  WebDataset keys may not
+    contain dots: everything after the first dot is the member's type.
+    """
+    folder = os.path.basename(os.path.dirname(os.path.abspath(csv_path)))
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    safe = re.sub(r"[^\w-]", "_", f"{folder}_{name}")
+    return f"{safe}-{row:07d}"
+
+
+class ShardWriter:
+    """
+    Packs samples into plain (uncompressed) tar shards, WebDataset style:
+    each sample is `<key>.json` plus `<key>.<n>.<ext>` per image, stored
+    next to each other.  Alongside every `<prefix>-NNNNNN.tar` goes an
+    index of member offsets, so readers can seek straight to a sample.
+    Shards are written as .part and renamed when complete.
+    """
+
+    def __init__(self, out_dir, prefix="shard", max_bytes=SHARD_BYTES):
+        os.makedirs(out_dir, exist_ok=True)
+        self.out_dir = out_dir
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.shards = []
+        self.samples = 0
+        self._keys = set()
+        self._tar = None
+        self._index = []
+
+    def _path(self, n):
+        return os.path.join(self.out_dir, f"{self.prefix}-{n:06d}.tar")
+
+    def _open(self):
+        path = self._path(len(self.shards))
+        # PAX: ustar caps member names at 100 chars, and <folder>_<csv>-<row> gets long
+        self._tar = tarfile.open(path + ".part", "w", format=tarfile.PAX_FORMAT)
+        self._index = []
+        self.shards.append(path)
+
+    def _finish(self):
+        if self._tar is None:
+            return
+        self._tar.close()
+        path = self.shards[-1]
+        with open(path + INDEX_SUFFIX + ".part", "w", encoding="utf-8") as f:
+            for name, offset, size in self._index:
+                f.write(f"{name}\t{offset}\t{size}\n")
+        os.replace(path + ".part", path)
+        os.replace(path + INDEX_SUFFIX + ".part", path + INDEX_SUFFIX)
+        self._tar = None
+
+    def _add(self, name, fileobj, size):
+        info = tarfile.TarInfo(name)
+        info.size = size
+        info.mode = 0o644
+        self._tar.addfile(info, fileobj)
+        # addfile leaves tar.offset just past the member's zero-padded data
+        data_offset = self._tar.offset - -(-size // BLOCK) * BLOCK
+        self._index.append((name, data_offset, size))
+
+    def add_sample(self, key, meta, image_paths):
+        """Append one sample: `meta` as <key>.json, then each image file in order."""
+        if key in self._keys:
+            # readers group members by key: a repeat would silently merge two samples
+            raise ValueError(f"duplicate sample key {key!r}")
+        self._keys.add(key)
+        if self._tar is None or self._tar.offset >= self.max_bytes:
+            self._finish()
+            self._open()
+        body = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+        self._add(f"{key}.json", io.BytesIO(body), len(body))
+        for n, path in enumerate(image_paths):
+            ext = os.path.splitext(path)[1].lstrip(".").lower() or "jpg"
+            with open(path, "rb") as f:
+                self._add(f"{key}.{n}.{ext}", f, os.fstat(f.fileno()).st_size)
+        self.samples += 1
+
+    def close(self):
+        self._finish()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def export_csv(csv_path, writer):
+    """
+    Stream one annotated CSV into `writer`.  Every row with at least one
+    complete image becomes a sample; the other columns (plus source, row,
+    site, item_id) go into its JSON.  Returns (samples, skipped images).
+    """
+    source = os.path.splitext(os.path.basename(csv_path))[0]
+    samples = skipped = 0
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        fields = reader.fieldnames or []
+        if PATH_COLUMN not in fields:
+            return 0, 0
+        url_col = next((c for c in URL_COLUMNS if c in fields), None)
+        img_col = next((c for c in IMAGE_COLUMNS if c in fields), None)
+        for rn, row in enumerate(reader, start=1):
+            paths = [p for p in (row.get(PATH_COLUMN) or "").split(";") if p.strip()]
+            good = [p for p in paths if os.path.isfile(p) and is_complete_image(p)]
+            skipped += len(paths) - len(good)
+            if not good:
+                continue
+            first_image = (row.get(img_col) or "").split(";")[0].strip() if img_col else ""
+            site, item_id = product_key(row.get(url_col) if url_col else "", first_image)
+            meta = {k: v for k, v in row.items() if k != PATH_COLUMN and k is not None}
+            meta.update(source=source, row=rn, site=site, item_id=item_id)
+            writer.add_sample(sample_key(csv_path, rn), meta, good)
+            samples += 1
+    return samples, skipped
+
+
+# ─── READER ────────────────────────────────────────────────────────────────────
+class ShardReader:
+    """
+    Random access into a folder of shards without extracting them.
+
+        reader = ShardReader("shards")
+        sample = reader[i]                  # {"json": {...}, "0.jpg": b"...", ...}
+        jpeg   = reader.read(key, "0.jpg")
+
+    Only the .idx files are loaded up front; each read is one seek + read
+    in an already open shard.  Use iter_shard() for fast sequential passes.
+    """
+
+    def __init__(self, folder=OUTPUT_DIR, pattern="*.tar"):
+        self.members = {}   # key → {type: (shard, offset, size)}
+        self.keys = []
+        self._files = {}
+        self._lock = threading.Lock()
+        self.shards = sorted(glob.glob(os.path.join(folder, pattern)))
+        for shard in self.shards:
+            with open(shard + INDEX_SUFFIX, encoding="utf-8") as f:
+                for line in f:
+                    name, offset, size = line.rstrip("\n").split("\t")
+                    key, kind = name.split(".", 1)
+                    if key not in self.members:
+                        self.members[key] = {}
+                        self.keys.append(key)
+                    self.members[key][kind] = (shard, int(offset), int(size))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _read(self, shard, offset, size):
+        with self._lock:
+            f = self._files.get(shard)
+            if f is None:
+                f = self._files[shard] = open(shard, "rb")
+            f.seek(offset)
+            return f.read(size)
+
+    def read(self, key, kind):
+        """Raw bytes of one member, e.g. read(key, "0.jpg")."""
+        return self._read(*self.members[key][kind])
+
+    def sample(self, key):
+        out = {}
+        for kind, loc in self.members[key].items():
+            data = self._read(*loc)
+            out[kind] = json.loads(data) if kind == "json" else data
+        return out
+
+    def __getitem__(self, i):
+        return self.sample(self.keys[i])
+
+    def iter_shard(self, shard):
+        """Yield (key, sample) in file order with one sequential pass over the shard."""
+        current, sample = None, {}
+        with tarfile.open(shard, "r|") as tar:
+            for info in tar:
+                key, kind = info.name.split(".", 1)
+                if key != current and current is not None:
+                    yield current, sample
+                    sample = {}
+                current = key
+                data = tar.extractfile(info).read()
+                sample[kind] = json.loads(data) if kind == "json" else data
+        if current is not None:
+            yield current, sample
+
+    def close(self):
+        with self._lock:
+            for f in self._files.values():
+                f.close()
+            self._files.clear()
+
+
+# ─── MAIN ──────────────────────────────────────────────────────────────────────
+def main():
+    parser = argparse.ArgumentParser(description="Pack downloaded images + CSV metadata into tar shards")
+    parser.add_argument("inputs", nargs="*", default=INPUT_DIRS,
+                        help="annotated CSV files or folders of CSVs")
+    parser.add_argument("--out", default=OUTPUT_DIR)
+    parser.add_argument("--prefix", default="shard")
+    parser.add_argument("--shard-mb", type=int, default=SHARD_BYTES >> 20)
+    args = parser.parse_args()
+
+    csv_paths = []
+    for inp in args.inputs:
+        if os.path.isdir(inp):
+            csv_paths.extend(sorted(glob.glob(os.path.join(inp, "*.csv"))))
+        elif os.path.isfile(inp):
+            csv_paths.append(inp)
+
+    if not csv_paths:
+        print("Nothing to export.")
+        return
+
+    # build in a scratch folder next to the shards; the previous export is only
+    # replaced once this one has finished, so a failed run leaves it intact
+    os.makedirs(args.out, exist_ok=True)
+    staging = tempfile.mkdtemp(dir=args.out, prefix=".export-")
+    try:
+        with ShardWriter(staging, args.prefix, args.shard_mb << 20) as writer:
+            for csv_path in csv_paths:
+                samples, skipped = export_csv(csv_path, writer)
+                note = f", {skipped} missing/incomplete image(s) left out" if skipped else ""
+                print(f"✔ {csv_path}: {samples} samples{note}")
+
+        for old in glob.glob(os.path.join(args.out, f"{args.prefix}-*.tar*")):
+            os.remove(old)
+        for name in sorted(os.listdir(staging)):
+            os.replace(os.path.join(staging, name), os.path.join(args.out, name))
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    print(f"✅ {writer.samples} samples in {len(writer.shards)} shard(s) → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
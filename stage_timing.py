@@ -0,0 +1,203 @@
+import json
+import time
+import argparse
+import threading
+import contextlib
+from collections import Counter, defaultdict, deque
+
+# ─── CONFIG ────────────────────────────────────────────────────────────────────
+WINDOW        = 500    # scrapes kept for the rolling summary
+SUMMARY_EVERY = 50     # print the rolling summary every N scrapes (0 = never)
+
+_current = threading.local()
+
+
+# ─── PER-URL TRACE ─────────────────────────────────────────────────────────────
+class ScrapeTrace:
+    """Timings for one URL: seconds per stage, retries and the final error."""
+
+    def __init__(self, url, meta):
+        self.url = url
+        self.meta = meta
+        self.started = time.time()
+        self.stages = defaultdict(float)
+        self.retries = 0
+        self.error = None
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] += time.perf_counter() - t0
+
+    def to_json(self):
+        return {
+            "ts": round(self.started, 3),
+            "url": self.url,
+            "ok": self.error is None,
+            "error": self.error,
+            "retries": self.retries,
+            "total_s": round(time.time() - self.started, 4),
+            "stages": {k: round(v, 4) for k, v in self.stages.items()},
+            **self.meta,
+        }
+
+
+def stage(name):
+    """
+    Time a block under the trace active on this thread.
+    Outside of StageTimer.scrape() it is a no-op, so helpers can be
+    instrumented without changing their signatures.
+    """
+    trace = getattr(_current, "trace", None)
+    return trace.stage(name) if trace is not None else contextlib.nullcontext()
+
+
+def sleep(name, seconds):
+    """time.sleep that shows up as its own stage ('sleep:<name>')."""
+    with stage(f"sleep:{name}"):
+        time.sleep(seconds)
+
+
+def current_trace():
+    """The trace active on this thread (None outside StageTimer.scrape())."""
+    return getattr(_current, "trace", None)
+
+
+@contextlib.contextmanager
+def use_trace(trace):
+    """
+    Make `trace` active on this thread for a block, so work done on a
+    helper thread (e.g. a tab-multiplexing browser) is timed under the
+    URL that asked for it.
+    """
+    prev = getattr(_current, "trace", None)
+    _current.trace = trace
+    try:
+        yield
+    finally:
+        _current.trace = prev
+
+
+def record_retry():
+    trace = getattr(_current, "trace", None)
+    if trace is not None:
+        trace.retries += 1
+
+
+# ─── TIMER ─────────────────────────────────────────────────────────────────────
+def percentile(sorted_vals, q):
+    if not sorted_vals:
+        return 0.0
+    idx = min(len(sorted_vals) - 1, int(round(q * (len(sorted_vals) - 1))))
+    return sorted_vals[idx]
+
+
+class StageTimer:
+    """
+    Writes one JSON line per scraped URL and keeps a rolling window of the
+    last WINDOW scrapes for p50/p95 per stage, pages/min and errors by type.
+    """
+
+    def __init__(self, log_path=None, window=WINDOW, summary_every=SUMMARY_EVERY):
+        self.log_path = log_path
+        self.summary_every = summary_every
+        self._recent = deque(maxlen=window)
+        self._errors = Counter()
+        self._done = 0
+        self._lock = threading.Lock()
+        self._fh = open(log_path, "a", encoding="utf-8") if log_path else None
+
+    @contextlib.contextmanager
+    def scrape(self, url, **meta):
+        trace = ScrapeTrace(url, meta)
+        prev = getattr(_current, "trace", None)
+        _current.trace = trace
+        try:
+            yield trace
+        except Exception as e:
+            trace.error = type(e).__name__
+            raise
+        finally:
+            _current.trace = prev
+            self._finish(trace)
+
+    def _finish(self, trace):
+        rec = trace.to_json()
+        with self._lock:
+            self._recent.append(rec)
+            if rec["error"]:
+                self._errors[rec["error"]] += 1
+            self._done += 1
+            if self._fh:
+                self._fh.write(json.dumps(rec) + "\n")
+                self._fh.flush()
+            show = self.summary_every and self._done % self.summary_every == 0
+        if show:
+            print_summary(self.summary())
+
+    def summary(self):
+        with self._lock:
+            recs = list(self._recent)
+            errors = dict(self._errors)
+        return summarize(recs, errors)
+
+    def close(self):
+        if self._fh:
+            self._fh.close()
+            self._fh = None
+
+
+def summarize(recs, errors=None):
+    per_stage = defaultdict(list)
+    for r in recs:
+        for name, secs in r["stages"].items():
+            per_stage[name].append(secs)
+        per_stage["total"].append(r["total_s"])
+    stages = {}
+    for name, vals in per_stage.items():
+        vals.sort()
+        stages[name] = {
+            "p50": round(percentile(vals, 0.50), 3),
+            "p95": round(percentile(vals, 0.95), 3),
+            "sum": round(sum(vals), 1),
+        }
+    span = 0.0
+    if len(recs) > 1:
+        span = (recs[-1]["ts"] + recs[-1]["total_s"]) - recs[0]["ts"]
+    if errors is None:
+        errors = Counter(r["error"] for r in recs if r["error"])
+    return {
+        "pages": len(recs),
+        "pages_per_min": round(len(recs) / span * 60, 1) if span > 0 else 0.0,
+        "retries": sum(r.get("retries", 0) for r in recs),
+        "errors": dict(errors),
+        "stages": stages,
+    }
+
+
+def print_summary(s):
+    print(f"⏱  last {s['pages']} pages — {s['pages_per_min']} pages/min, "
+          f"{s['retries']} retries, errors {s['errors'] or '{}'}")
+    # biggest total time first, so the dominant stage is on top
+    for name, st in sorted(s["stages"].items(), key=lambda kv: -kv[1]["sum"]):
+        print(f"   {name:24s} p50 {st['p50']:7.3f}s  p95 {st['p95']:7.3f}s  total {st['sum']:9.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarise a timings JSON-lines log")
+    parser.add_argument("log")
+    parser.add_argument("--last", type=int, default=0, help="only the last N records")
+    args = parser.parse_args()
+
+    with open(args.log, encoding="utf-8") as f:
+        recs = [json.loads(line) for line in f if line.strip()]
+    if args.last:
+        recs = recs[-args.last:]
+    print_summary(summarize(recs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,346 @@
+import time
+import random
+import argparse
+import threading
+import http.server
+from collections import deque
+from html import escape
+from urllib.parse import urlsplit, parse_qs
+
+# ─── CONFIG ────────────────────────────────────────────────────────────────────
+HOST          = "127.0.0.1"
+PORT          = 8765
+PRODUCTS      = 10_000      # products per listing
+PAGE_SIZE     = 60          # products per page / per "load more" chunk
+LATENCY_MS    = (0, 0)      # uniform (min, max) delay added to every response
+ERROR_RATE    = 0.0         # fraction of requests answered with a 500
+RATE_LIMIT    = 0           # requests/sec per client before 429s (0 = off)
+RETRY_AFTER   = 2           # seconds sent in the 429 Retry-After header
+SEED          = 7
+
+ID_BASE  = 10_000_000
+BRANDS   = ["Balmain", "Moschino Kids", "Max Mara", "Aape", "Bonpoint", "adidas", "NA-KD"]
+KINDS    = ["t-shirt", "dress", "coat", "jeans", "skirt", "jacket", "jumpsuit", "shorts"]
+COLOURS  = ["black", "white", "pink", "blue", "grey", "green"]
+
+# pagination styles mirror the three real shops:
+#   numbered  → Farfetch  /in/shopping/<section>/clothing-1/items.aspx?page=N
+#   loadmore  → ASOS      /<section>/cat/?cid=1       ("LOAD MORE" + "You've viewed X of Y products")
+#   infinite  → NA-KD     /en/category/<slug>          (scroll + infiniteScroll button + "X of Y products")
+
+
+# ─── DETERMINISTIC CATALOGUE ───────────────────────────────────────────────────
+def product(i):
+    """Synthetic product number `i`; the same index always yields the same item."""
+    if not 0 <= i < PRODUCTS:
+        raise KeyError(i)
+    rnd = random.Random(SEED * 1_000_003 + i)
+    brand = rnd.choice(BRANDS)
+    kind = rnd.choice(KINDS)
+    colour = rnd.choice(COLOURS)
+    return {
+        "id": ID_BASE + i,
+        "brand": brand,
+        "title": f"{brand} {colour} {kind}",
+        "slug": f"{brand}-{colour}-{kind}".lower().replace(" ", "-"),
+        "price": rnd.randint(20, 2500),
+        "colour": colour,
+        "images": rnd.randint(3, 7),
+    }
+
+
+def farfetch_href(p):
+    return f"/in/shopping/women/{p['slug']}-item-{p['id']}.aspx"
+
+
+def asos_href(p):
+    return f"/{p['brand'].lower().replace(' ', '-')}/{p['slug']}/prd/{p['id']}"
+
+
+def nakd_href(p):
+    return f"/en/products/{p['slug']}-{p['id']}"
+
+
+def image_url(base, p, n, width=1000):
+    return f"{base}/img/{p['id']}_{n}_{width}.jpg"
+
+
+# ─── PAGE TEMPLATES ────────────────────────────────────────────────────────────
+def page(title, body, script=""):
+    return (
+        "<!doctype html><html><head><meta charset='utf-8'>"
+        f"<title>{escape(title)}</title></head><body>{body}"
+        f"{'<script>' + script + '</script>' if script else ''}</body></html>"
+    )
+
+
+def product_tiles(start, stop, href):
+    return "".join(
+        f"<li><a href='{href(product(i))}'>{escape(product(i)['title'])}</a></li>"
+        for i in range(start, stop)
+    )
+
+
+def farfetch_listing(n_page):
+    pages = max(1, -(-PRODUCTS // PAGE_SIZE))
+    n_page = min(max(n_page, 1), pages)
+    start = (n_page - 1) * PAGE_SIZE
+    tiles = product_tiles(start, min(start + PAGE_SIZE, PRODUCTS), farfetch_href)
+    disabled = "true" if n_page >= pages else "false"
+    body = (
+        f"<ul data-component='ProductsList'>{tiles}</ul>"
+        "<div data-component='PaginationWrapper'>"
+        f"<span>Page {n_page} of {pages}</span>"
+        f"<a data-component='PaginationNextActionButton' aria-disabled='{disabled}'"
+        f" href='?page={n_page + 1}'>Next</a></div>"
+    )
+    return page(f"Clothing page {n_page}", body)
+
+
+CHUNK_JS = """
+let loaded = %(loaded)d;
+const total = %(total)d;
+async function more() {
+  if (loaded >= total) return;
+  const r = await fetch('%(api)s?offset=' + loaded);
+  if (!r.ok) return;
+  document.getElementById('grid').insertAdjacentHTML('beforeend', await r.text());
+  loaded = Math.min(loaded + %(size)d, total);
+  document.getElementById('progress').textContent = %(label)s;
+}
+"""
+
+
+def asos_listing():
+    loaded = min(PAGE_SIZE, PRODUCTS)
+    label = "`You've viewed ${loaded.toLocaleString('en')} of ${total.toLocaleString('en')} products`"
+    body = (
+        f"<ul id='grid'>{product_tiles(0, loaded, asos_href)}</ul>"
+        f"<p id='progress'>You've viewed {loaded:,} of {PRODUCTS:,} products</p>"
+        "<a href='#' onclick='more();return false;'>Load more</a>"
+    )
+    js = CHUNK_JS % {"loaded": loaded, "total": PRODUCTS, "api": "/api/asos",
+                     "size": PAGE_SIZE, "label": label}
+    return page("ASOS clothing", body, js)
+
+
+def nakd_listing():
+    loaded = min(PAGE_SIZE, PRODUCTS)
+    label = "`${loaded} of ${total} products`"
+    body = (
+        f"<ul id='grid'>{product_tiles(0, loaded, nakd_href)}</ul>"
+        f"<div id='progress'>{loaded} of {PRODUCTS} products</div>"
+        "<button data-test-id='infiniteScroll' onclick='more()'>Load more</button>"
+    )
+    js = CHUNK_JS % {"loaded": loaded, "total": PRODUCTS, "api": "/api/nakd",
+                     "size": PAGE_SIZE, "label": label}
+    js += (
+        "window.addEventListener('scroll', () => {"
+        " if (window.innerHeight + window.scrollY >= document.body.scrollHeight - 200) more(); });"
+    )
+    return page("NA-KD category", body, js)
+
+
+def farfetch_product(base, p):
+    imgs = "".join(
+        f"<img data-component='Img' src='{image_url(base, p, n)}'>" for n in range(1, p["images"] + 1)
+    )
+    body = (
+        f"<h1 data-component='ProductName'>{escape(p['title'])}</h1>"
+        f"<p data-component='PriceFinalLarge'>${p['price']}</p>"
+        f"<div data-component='Container'>{imgs}</div>"
+        "<button data-expanded='false' onclick=\"this.dataset.expanded='true';"
+        "document.getElementById('panel').style.display='block'\">"
+        "<p data-component='ButtonText'>The Details</p></button>"
+        "<div data-component='InnerPanel' id='panel' style='display:none'><div>"
+        f"<div><p>{escape(p['title'])}</p><ul><li>{p['colour']}</li><li>cotton</li></ul></div>"
+        f"<div><p>FARFETCH ID: {p['id']}</p></div></div></div>"
+    )
+    return page(p["title"], body)
+
+
+def asos_product(base, p):
+    imgs = "".join(
+        f"<img class='gallery-image' src='{image_url(base, p, n, 320)}' "
+        f"srcset='{image_url(base, p, n, 320)} 320w, {image_url(base, p, n, 1920)} 1920w'>"
+        for n in range(1, p["images"] + 1)
+    )
+    body = (
+        f"<h1>{escape(p['title'])}</h1>"
+        f"<div id='productDescriptionDetails'><ul><li>{p['colour']}</li><li>Regular fit</li></ul></div>"
+        f"{imgs}"
+    )
+    return page(p["title"], body)
+
+
+def nakd_product(base, p):
+    body = (
+        f"<h1>{escape(p['title'])}</h1>"
+        f"<span itemprop='price' content='{p['price']}.00'>${p['price']}</span>"
+        f"<div><span>Color</span><span>{p['colour']}</span></div>"
+        "<script type='application/json'>"
+        '{"materialDescription":"100% cotton","washInstructions":"Machine wash 30"}'
+        "</script>"
+    )
+    return page(p["title"], body)
+
+
+# ─── SERVER ────────────────────────────────────────────────────────────────────
+class RateLimiter:
+    """Sliding one-second window of request times per client address."""
+
+    def __init__(self, per_second):
+        self.per_second = per_second
+        self.hits = {}
+        self.lock = threading.Lock()
+
+    def allow(self, client):
+        if not self.per_second:
+            return True
+        now = time.monotonic()
+        with self.lock:
+            q = self.hits.setdefault(client, deque())
+            while q and now - q[0] > 1.0:
+                q.popleft()
+            if len(q) >= self.per_second:
+                return False
+            q.append(now)
+            return True
+
+
+class ShopHandler(http.server.BaseHTTPRequestHandler):
+    limiter = None
+    stats = None
+
+    def log_message(self, *args):
+        pass
+
+    def send_body(self, status, body, ctype="text/html; charset=utf-8", headers=()):
+        data = body if isinstance(body, bytes) else body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in headers:
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+        self.stats.count(status)
+
+    def do_GET(self):
+        lo, hi = LATENCY_MS
+        if hi:
+            time.sleep(random.uniform(lo, hi) / 1000)
+        if not self.limiter.allow(self.client_address[0]):
+            return self.send_body(429, "Too Many Requests", "text/plain",
+                                  [("Retry-After", str(RETRY_AFTER))])
+        if ERROR_RATE and random.random() < ERROR_RATE:
+            return self.send_body(500, "Internal Server Error", "text/plain")
+
+        parts = urlsplit(self.path)
+        path, query = parts.path, parse_qs(parts.query)
+        base = f"http://{self.headers.get('Host', f'{HOST}:{PORT}')}"
+        try:
+            body = self.route(base, path, query)
+        except (ValueError, IndexError, KeyError):
+            body = None
+        if body is None:
+            return self.send_body(404, "Not Found", "text/plain")
+        if isinstance(body, tuple):
+            return self.send_body(200, body[1], body[0])
+        return self.send_body(200, body)
+
+    def route(self, base, path, query):
+        if path.endswith("/items.aspx"):
+            return farfetch_listing(int(query.get("page", ["1"])[0]))
+        if "/cat/" in path:
+            return asos_listing()
+        if path.startswith("/en/category/"):
+            return nakd_listing()
+        if path in ("/api/asos", "/api/nakd"):
+            offset = int(query.get("offset", ["0"])[0])
+            href = asos_href if path.endswith("asos") else nakd_href
+            return product_tiles(offset, min(offset + PAGE_SIZE, PRODUCTS), href)
+        if "-item-" in path and path.endswith(".aspx"):
+            return farfetch_product(base, product(int(path.rsplit("-", 1)[1][:-5]) - ID_BASE))
+        if "/prd/" in path:
+            return asos_product(base, product(int(path.rsplit("/", 1)[1]) - ID_BASE))
+        if path.startswith("/en/products/"):
+            return nakd_product(base, product(int(path.rsplit("-", 1)[1]) - ID_BASE))
+        if path.startswith("/img/"):
+            # tiny valid JPEG so downloaders have something to save
+            return ("image/jpeg", TINY_JPEG)
+        if path == "/":
+            return page("Synthetic shop", "<p>synthetic shop</p>")
+        return None
+
+
+# 1×1 white baseline JPEG
+TINY_JPEG = bytes.fromhex(
+    "ffd8ffe000104a46494600010100000100010000ffdb004300080606070605080707070909080a0c140d0c0b0b0c1912130f"
+    "141d1a1f1e1d1a1c1c20242e2720222c231c1c2837292c30313434341f27393d38323c2e333432ffc0000b080001000101"
+    "011100ffc4001f0000010501010101010100000000000000000102030405060708090a0bffc400b5100002010303020403"
+    "050504040000017d01020300041105122131410613516107227114328191a1082342b1c11552d1f02433627282090a1617"
+    "18191a25262728292a3435363738393a434445464748494a535455565758595a636465666768696a737475767778797a83"
+    "8485868788898a92939495969798999aa2a3a4a5a6a7a8a9aab2b3b4b5b6b7b8b9bac2c3c4c5c6c7c8c9cad2d3d4d5d6d7"
+    "d8d9dae1e2e3e4e5e6e7e8e9eaf1f2f3f4f5f6f7f8f9faffda0008010100003f00fbd3ffd9"
+)
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.by_status = {}
+
+    def count(self, status):
+        with self.lock:
+            self.by_status[status] = self.by_status.get(status, 0) + 1
+
+
+def serve(host=HOST, port=PORT):
+    ShopHandler.limiter = RateLimiter(RATE_LIMIT)
+    ShopHandler.stats = Stats()
+    server = http.server.ThreadingHTTPServer((host, port), ShopHandler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    global PRODUCTS, PAGE_SIZE, LATENCY_MS, ERROR_RATE, RATE_LIMIT, RETRY_AFTER, SEED
+    parser = argparse.ArgumentParser(description="Local synthetic shop for crawler load tests")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--products", type=int, default=PRODUCTS)
+    parser.add_argument("--page-size", type=int, default=PAGE_SIZE)
+    parser.add_argument("--latency-ms", type=int, nargs=2, default=LATENCY_MS,
+                        metavar=("MIN", "MAX"))
+    parser.add_argument("--error-rate", type=float, default=ERROR_RATE)
+    parser.add_argument("--rate-limit", type=int, default=RATE_LIMIT,
+                        help="requests/sec per client before answering 429")
+    parser.add_argument("--retry-after", type=int, default=RETRY_AFTER)
+    parser.add_argument("--seed", type=int, default=SEED)
+    args = parser.parse_args()
+
+    PRODUCTS, PAGE_SIZE = args.products, args.page_size
+    LATENCY_MS, ERROR_RATE = tuple(args.latency_ms), args.error_rate
+    RATE_LIMIT, RETRY_AFTER, SEED = args.rate_limit, args.retry_after, args.seed
+
+    server = serve(args.host, args.port)
+    base = f"http://{args.host}:{args.port}"
+    pages = -(-PRODUCTS // PAGE_SIZE)
+    print(f"🛍  Synthetic shop on {base} — {PRODUCTS:,} products, {pages:,} pages of {PAGE_SIZE}")
+    print(f"   numbered : {base}/in/shopping/women/clothing-1/items.aspx?page=1")
+    print(f"   load-more: {base}/women/cat/?cid=1")
+    print(f"   infinite : {base}/en/category/jeans")
+    print(f"   e.g. python3 farfetch_resumethreadingpg.py --base-url "
+          f"{base}/in/shopping/women/clothing-1/items.aspx --last-page {pages} --workers 8")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print("\n📊 responses by status:", dict(sorted(ShopHandler.stats.by_status.items())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+import time
+import queue
+import threading
+import concurrent.futures
+
+from stage_timing import stage, current_trace, use_trace
+
+# ─── CONFIG ────────────────────────────────────────────────────────────────────
+READY_TIMEOUT = 30     # seconds to wait for document.readyState == "complete"
+READY_POLL    = 0.1
+LAUNCH_TRIES  = 3      # make_driver attempts before the browser gives up for a while
+LAUNCH_BACKOFF = 2.0   # seconds, doubled per failed attempt
+# Chrome throttles and deprioritises tabs that aren't in front; without these a
+# background tab barely loads while the front tab is being parsed
+BACKGROUND_TAB_ARGS = [
+    "--disable-background-timer-throttling",
+    "--disable-backgrounding-occluded-windows",
+    "--disable-renderer-backgrounding",
+]
+
+_STOP = object()
+
+
+class Tab:
+    """One browser tab and the URL it's currently loading, if any."""
+
+    def __init__(self, handle):
+        self.handle = handle
+        self.job = None        # (url, future, trace) while busy
+        self.started = 0.0
+
+
+class TabBrowser(threading.Thread):
+    """
+    One browser process driving `tabs` tabs.
+
+    WebDriver only talks to one tab at a time, but a tab keeps loading
+    after we switch away from it.  So the browser walks its tabs in a
+    ring: collect the page that finished loading in this tab, parse it,
+    start the next URL with a non-blocking location change, move on.
+    Each page gets the parse time of every other tab to load for free.
+
+    A parse error only fails that URL; the tab is closed and replaced so
+    a wedged page can't poison the next one.  If the browser itself dies,
+    every in-flight URL fails and a new browser is started.  While no
+    browser can be launched, each URL this thread takes is failed with
+    the launch error instead of being left to wait forever.
+    """
+
+    def __init__(self, make_driver, parse_fn, jobs, tabs, settle=0.0, name=None):
+        super().__init__(daemon=True, name=name or "tab-browser")
+        self.make_driver = make_driver
+        self.parse_fn = parse_fn
+        self.jobs = jobs
+        self.n_tabs = tabs
+        self.settle = settle
+        self.driver = None
+        self.tabs = []
+        self._stopping = False
+
+    # ── browser / tab lifecycle ──
+    def _open_browser(self):
+        self.driver = self.make_driver()
+        self.tabs = [Tab(self.driver.current_window_handle)]
+        for _ in range(self.n_tabs - 1):
+            self.driver.switch_to.new_window("tab")
+            self.tabs.append(Tab(self.driver.current_window_handle))
+
+    def _replace_tab(self, tab):
+        """Close a tab that misbehaved and put a fresh one in its place."""
+        self.driver.switch_to.new_window("tab")
+        fresh = self.driver.current_window_handle
+        self.driver.switch_to.window(tab.handle)
+        self.driver.close()
+        self.driver.switch_to.window(fresh)
+        tab.handle = fresh
+
+    def _quit_browser(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
+
+    def _launch(self):
+        """_open_browser() with backoff; returns None on success, else the last error."""
+        error = None
+        for attempt in range(LAUNCH_TRIES):
+            try:
+                self._open_browser()
+                return None
+            except Exception as e:
+                error = e
+                self._quit_browser()
+                print(f"⚠️ {self.name}: browser launch failed ({type(e).__name__}: {e})")
+                if attempt < LAUNCH_TRIES - 1:
+                    time.sleep(LAUNCH_BACKOFF * 2 ** attempt)
+        return error
+
+    def _drop_browser(self, error):
+        for tab in self.tabs:
+            if tab.job is not None:
+                tab.job[1].set_exception(error)
+                tab.job = None
+        self.tabs = []
+        self._quit_browser()
+        print(f"⚠️ {self.name}: browser died ({type(error).__name__}), restarting")
+
+    # ── per-tab steps ──
+    def _start(self, tab, job):
+        url, _, trace = job
+        # owned by the tab before any driver call, so a browser crash still fails it
+        tab.job = job
+        tab.started = time.monotonic()
+        self.driver.switch_to.window(tab.handle)
+        with use_trace(trace), stage("navigate"):
+            # returns as soon as navigation starts, unlike driver.get(); the mark on the
+            # old window tells _wait_ready which document it is looking at
+            self.driver.execute_script(
+                "window.__tabPoolOld = true; window.location.href = arguments[0];", url
+            )
+
+    def _wait_ready(self, tab):
+        deadline = tab.started + READY_TIMEOUT
+        while time.monotonic() < deadline:
+            try:
+                # the old document stays "complete" until the navigation commits
+                state = self.driver.execute_script(
+                    "return window.__tabPoolOld ? 'old' : document.readyState"
+                )
+                if state == "complete":
+                    return
+            except Exception:
+                # the old document can go away mid-call while the new one loads
+                pass
+            time.sleep(READY_POLL)
+        # parsing whatever is showing now (the old page, a blank one) would be a wrong row
+        raise TimeoutError(f"page not loaded after {READY_TIMEOUT}s")
+
+    def _finish(self, tab):
+        url, fut, trace = tab.job
+        self.driver.switch_to.window(tab.handle)
+        try:
+            with use_trace(trace):
+                with stage("wait_ready"):
+                    self._wait_ready(tab)
+                # PAGE_LOAD_PAUSE-style settle, minus the time the tab already spent loading
+                left = self.settle - (time.monotonic() - tab.started)
+                if left > 0:
+                    with stage("sleep:page_load"):
+                        time.sleep(left)
+                result = self.parse_fn(self.driver, url)
+        except Exception as e:
+            tab.job = None
+            fut.set_exception(e)
+            self._replace_tab(tab)
+        else:
+            tab.job = None
+            fut.set_result(result)
+
+    def _next_job(self, block):
+        if self._stopping:
+            return None
+        try:
+            job = self.jobs.get(timeout=1.0) if block else self.jobs.get_nowait()
+        except queue.Empty:
+            return None
+        if job is _STOP:
+            self._stopping = True
+            return None
+        return job
+
+    # ── main loop ──
+    def _serve(self):
+        """Ring over the tabs until stopped (returns True) or the browser dies (False)."""
+        while True:
+            busy = False
+            for tab in self.tabs:
+                try:
+                    if tab.job is not None:
+                        self._finish(tab)
+                    # only block for work when every tab is idle
+                    idle = not any(t.job is not None for t in self.tabs)
+                    job = self._next_job(block=idle)
+                    if job is not None:
+                        self._start(tab, job)
+                except Exception as e:
+                    # parse errors are handled per tab; anything here is the browser
+                    self._drop_browser(e)
+                    return False
+                busy = busy or tab.job is not None
+            if self._stopping and not busy:
+                return True
+
+    def run(self):
+        try:
+            while not self._stopping:
+                error = self._launch()
+                if error is None:
+                    if self._serve():
+                        break
+                    continue
+                # no browser: fail the next URL with the launch error, then try again
+                job = self._next_job(block=True)
+                if job is not None:
+                    job[1].set_exception(error)
+        finally:
+            self._quit_browser()
+
+
+class TabPool:
+    """
+    `browsers` browser processes × `tabs` tabs each, fed from one queue.
+
+    scrape(url) blocks the calling thread until some tab has loaded and
+    parsed the URL, so it drops in where `extract_product_data(get_driver(), url)`
+    was called from a worker pool — just run browsers × tabs workers.
+    Stage timings from the tab thread are recorded under the caller's trace.
+    """
+
+    def __init__(self, make_driver, parse_fn, browsers, tabs, settle=0.0):
+        self.jobs = queue.Queue()
+        self.browsers = [
+            TabBrowser(make_driver, parse_fn, self.jobs, tabs, settle, name=f"tab-browser-{i}")
+            for i in range(browsers)
+        ]
+        for b in self.browsers:
+            b.start()
+
+    @property
+    def slots(self):
+        return sum(b.n_tabs for b in self.browsers)
+
+    def submit(self, url):
+        fut = concurrent.futures.Future()
+        self.jobs.put((url, fut, current_trace()))
+        return fut
+
+    def scrape(self, url):
+        return self.submit(url).result()
+
+    def close(self):
+        for _ in self.browsers:
+            self.jobs.put(_STOP)
+        for b in self.browsers:
+            b.join()
@@ -0,0 +1,210 @@
+import os
+import csv
+import glob
+import json
+import argparse
+import concurrent.futures
+
+from image_store import PATH_COLUMN
+from shard_export import sample_key
+
+# ─── CONFIG ────────────────────────────────────────────────────────────────────
+INPUT_DIRS = ["csv_with_image_paths", "output_csv_with_paths"]  # CSVs with an images_path column
+OUTPUT_DIR = "tensor_cache"
+SIZE       = 256             # every image becomes SIZE × SIZE × 3 uint8
+FIT        = "pad"           # "pad": letterbox, keeps the whole garment; "crop": centre crop
+FILL       = (255, 255, 255) # product shots are on white
+WORKERS    = os.cpu_count() or 4
+BATCH      = 256             # images per pool task
+
+IMAGES_FILE = "images.npy"   # (N, SIZE, SIZE, 3) uint8, np.load(..., mmap_mode="r")
+INDEX_FILE  = "index.csv"    # one line per tensor: position, id, source, row, idx, path, ok + CSV columns
+INFO_FILE   = "info.json"
+
+
+# ─── PLAN ──────────────────────────────────────────────────────────────────────
+def collect(csv_paths):
+    """(fieldnames, entries): one entry per image file listed in images_path, in CSV order."""
+    fields, entries = [], []
+    seen = set()
+    for csv_path in csv_paths:
+        # the same file named twice (as a folder and a path) would repeat every id
+        if os.path.abspath(csv_path) in seen:
+            continue
+        seen.add(os.path.abspath(csv_path))
+        source = os.path.splitext(os.path.basename(csv_path))[0]
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            if PATH_COLUMN not in (reader.fieldnames or []):
+                continue
+            for name in reader.fieldnames:
+                if name != PATH_COLUMN and name not in fields:
+                    fields.append(name)
+            for rn, row in enumerate(reader, start=1):
+                paths = [p for p in (row.pop(PATH_COLUMN, "") or "").split(";") if p.strip()]
+                for n, path in enumerate(paths):
+                    if os.path.isfile(path):
+                        entries.append({
+                            **row, "id": f"{sample_key(csv_path, rn)}-{n}",
+                            "source": source, "row": rn, "idx": n, "path": path,
+                        })
+    return fields, entries
+
+
+# ─── WORKERS ───────────────────────────────────────────────────────────────────
+_out = None
+
+
+def _init_worker(images_path):
+    # each worker maps the output once and writes its slots in place; only
+    # (position, ok) travels back to the parent, never the pixels
+    global _out
+    import numpy as np
+    _out = np.load(images_path, mmap_mode="r+")
+
+
+def load_image(path, size=SIZE, fit=FIT):
+    """Decode + resize one file to a (size, size, 3) uint8 array."""
+    import numpy as np
+    from PIL import Image, ImageOps
+
+    with Image.open(path) as img:
+        # JPEG can decode straight at 1/2, 1/4, 1/8 scale: far less work for big originals
+        img.draft("RGB", (size, size))
+        img = img.convert("RGB")
+        if fit == "crop":
+            img = ImageOps.fit(img, (size, size), method=Image.BILINEAR)
+        else:
+            img = ImageOps.pad(img, (size, size), method=Image.BILINEAR, color=FILL)
+    return np.asarray(img, dtype=np.uint8)
+
+
+def _process(batch, size, fit):
+    results = []
+    for pos, path in batch:
+        try:
+            _out[pos] = load_image(path, size, fit)
+            results.append((pos, True))
+        except Exception:
+            # unreadable/corrupt file: slot stays zeros, flagged ok=0 in the index
+            results.append((pos, False))
+    _out.flush()
+    return results
+
+
+# ─── BUILD ─────────────────────────────────────────────────────────────────────
+def build(csv_paths, out_dir=OUTPUT_DIR, size=SIZE, fit=FIT, workers=WORKERS):
+    """
+    Decode every image once into OUTPUT_DIR/images.npy and write
+    index.csv alongside (tensor position → id, CSV row, file and the
+    row's metadata columns).  Files are built under temporary names and
+    swapped in at the end, so readers never see a half-written cache.
+    Returns (images, failed).
+    """
+    import numpy as np
+
+    fields, entries = collect(csv_paths)
+    if not entries:
+        return 0, 0
+    os.makedirs(out_dir, exist_ok=True)
+    images_tmp = os.path.join(out_dir, IMAGES_FILE + ".part.npy")
+    out = np.lib.format.open_memmap(images_tmp, mode="w+", dtype=np.uint8,
+                                    shape=(len(entries), size, size, 3))
+    del out   # allocated on disk; workers fill it
+
+    ok = [False] * len(entries)
+    batches = [
+        [(pos, entries[pos]["path"]) for pos in range(start, min(start + BATCH, len(entries)))]
+        for start in range(0, len(entries), BATCH)
+    ]
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(images_tmp,)
+    ) as pool:
+        futures = [pool.submit(_process, batch, size, fit) for batch in batches]
+        for done, fut in enumerate(concurrent.futures.as_completed(futures), start=1):
+            for pos, good in fut.result():
+                ok[pos] = good
+            print(f"  • {min(done * BATCH, len(entries))}/{len(entries)} images decoded")
+
+    index_tmp = os.path.join(out_dir, INDEX_FILE + ".part")
+    with open(index_tmp, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["position", "id", "source", "row", "idx", "path", "ok"] + fields,
+                                extrasaction="ignore")
+        writer.writeheader()
+        for pos, entry in enumerate(entries):
+            writer.writerow({**entry, "position": pos, "ok": int(ok[pos])})
+
+    info = {"count": len(entries), "shape": [size, size, 3], "dtype": "uint8", "fit": fit,
+            "failed": ok.count(False), "sources": [os.path.abspath(p) for p in csv_paths]}
+    info_tmp = os.path.join(out_dir, INFO_FILE + ".part")
+    with open(info_tmp, "w", encoding="utf-8") as f:
+        json.dump(info, f, indent=2)
+    os.replace(images_tmp, os.path.join(out_dir, IMAGES_FILE))
+    os.replace(index_tmp, os.path.join(out_dir, INDEX_FILE))
+    os.replace(info_tmp, os.path.join(out_dir, INFO_FILE))
+    return len(entries), info["failed"]
+
+
+# ─── READER ────────────────────────────────────────────────────────────────────
+class TensorCache:
+    """
+    Zero-copy view of a built cache.
+
+        cache = TensorCache()
+        batch = cache.images[i:i + 64]      # (64, SIZE, SIZE, 3) uint8, straight from the page cache
+        img   = cache["csv_with_image_paths_farfetch1-0000012-0"]
+        meta  = cache.meta[i]               # that tensor's CSV row
+
+    `images` is a read-only np.memmap; nothing is decoded.
+    """
+
+    def __init__(self, folder=OUTPUT_DIR):
+        import numpy as np
+        self.folder = folder
+        self.images = np.load(os.path.join(folder, IMAGES_FILE), mmap_mode="r")
+        with open(os.path.join(folder, INDEX_FILE), newline="", encoding="utf-8") as f:
+            self.meta = list(csv.DictReader(f))
+        self.ids = {m["id"]: i for i, m in enumerate(self.meta)}
+
+    def __len__(self):
+        return len(self.meta)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            key = self.ids[key]
+        return self.images[key]
+
+    def valid_positions(self):
+        """Positions whose image decoded; failed slots are all zeros."""
+        return [i for i, m in enumerate(self.meta) if m["ok"] == "1"]
+
+
+# ─── MAIN ──────────────────────────────────────────────────────────────────────
+def main():
+    parser = argparse.ArgumentParser(description="Decode + resize downloaded images into one uint8 memmap")
+    parser.add_argument("inputs", nargs="*", default=INPUT_DIRS,
+                        help="annotated CSV files or folders of CSVs")
+    parser.add_argument("--out", default=OUTPUT_DIR)
+    parser.add_argument("--size", type=int, default=SIZE)
+    parser.add_argument("--fit", choices=("pad", "crop"), default=FIT)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    args = parser.parse_args()
+
+    csv_paths = []
+    for inp in args.inputs:
+        if os.path.isdir(inp):
+            csv_paths.extend(sorted(glob.glob(os.path.join(inp, "*.csv"))))
+        elif os.path.isfile(inp):
+            csv_paths.append(inp)
+
+    if not csv_paths:
+        print("Nothing to cache.")
+        return
+
+    count, failed = build(csv_paths, args.out, args.size, args.fit, args.workers)
+    note = f" ({failed} failed to decode, left as zeros)" if failed else ""
+    print(f"✅ {count} images → {os.path.join(args.out, IMAGES_FILE)}{note}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import re
+from urllib.parse import urlsplit
+
+# ─── PRODUCT URL PATTERNS ──────────────────────────────────────────────────────
+# Farfetch: /in/shopping/women/max-mara-cashmere-coat-item-27607868.aspx?storeid=9681
+# ASOS:     /adidas-performance/adidas-football-bayern-munich-t-shirt-in-grey-marl/prd/207197260
+# NA-KD:    /en/products/wide-leg-high-waist-jeans-blue-1100-004305-0003
+SITE_URL_PATTERNS = {
+    "farfetch": r"/(?P<slug>[^/?#]+?)-item-(?P<item_id>\d+)\.aspx",
+    "asos":     r"/(?P<brand>[^/?#]+)/(?P<slug>[^/?#]+)/prd/(?P<item_id>\d+)",
+    "nakd":     r"/products/(?P<slug>[^/?#]+?)-(?P<item_id>\d[\d-]*\d)(?:[/?#]|$)",
+}
+ITEM_ID_PATTERNS = {site: re.compile(p, re.I) for site, p in SITE_URL_PATTERNS.items()}
+
+SITE_HOSTS = {
+    "farfetch.com": "farfetch",
+    "asos.com":     "asos",
+    "na-kd.com":    "nakd",
+}
+HOST_PATTERN = r"^[a-z]+://(?:[^/]*\.)?(farfetch|asos|na-kd)\.com(?:[:/?#]|$)"
+
+# ASOS slugs end in "-in-<colour>"; drop it so the last token is the garment.  The greedy
+# prefix makes it the *last* "-in-" ("nike-running-2-in-1-shorts-in-black" → "...-shorts");
+# RE2 has no lookaround, so this is a replace with the prefix kept as \1
+ASOS_COLOUR_SUFFIX = r"^(.*)-in-[a-z0-9-]+$"
+# NA-KD slugs end in the bare colour ("wide-leg-high-waist-jeans-blue", "...-dress-light-pink");
+# drop the trailing run of colour words, keeping at least the first token
+NAKD_COLOURS = (
+    "black", "white", "offwhite", "blue", "navy", "denim", "red", "burgundy", "wine", "pink",
+    "rose", "purple", "lilac", "lavender", "green", "khaki", "olive", "mint", "yellow", "orange",
+    "rust", "brown", "beige", "camel", "cognac", "sand", "nude", "cream", "ecru", "grey", "gray",
+    "silver", "gold", "multicolor", "print", "light", "dark", "off", "mid", "bright", "dusty",
+    "pale", "washed", "melange", "stone", "taupe", "mole", "coral", "turquoise", "aqua",
+)
+# (no lookbehind: Arrow's RE2 kernels don't support it; the leading "-" already keeps token one)
+NAKD_COLOUR_SUFFIX = r"(?:-(?:" + "|".join(NAKD_COLOURS) + r"))+$"
+
+OUTPUT_COLUMNS = ["site", "item_id", "slug", "brand_token", "category_token"]
+
+
+def site_of(url):
+    """Return our short site name for a product URL ('' if unknown)."""
+    host = urlsplit(url).netloc.lower()
+    for suffix, site in SITE_HOSTS.items():
+        if host == suffix or host.endswith("." + suffix):
+            return site
+    return ""
+
+
+def parse_product_url(url):
+    """
+    Split a product URL into (site, item_id).
+    Unknown shapes fall back to the URL path so they still get a stable key.
+    """
+    url = (url or "").strip()
+    site = site_of(url)
+    pattern = ITEM_ID_PATTERNS.get(site)
+    m = pattern.search(url) if pattern else None
+    if m:
+        return site, m.group("item_id")
+    parts = urlsplit(url)
+    return site or parts.netloc.lower(), parts.path.rstrip("/") or url
+
+
+# ─── VECTORISED PARSING ────────────────────────────────────────────────────────
+def _string_series(urls):
+    import pandas as pd
+    s = pd.Series(urls) if not isinstance(urls, pd.Series) else urls
+    try:
+        # Arrow-backed strings run the .str kernels in C++
+        return s.astype("string[pyarrow]").str.strip()
+    except (ImportError, TypeError):
+        return s.astype("string").str.strip()
+
+
+def parse_url_column(urls):
+    """
+    Parse a whole column of product URLs in one vectorised pass.
+
+    Returns a DataFrame (same index) with site, item_id, slug, brand_token
+    and category_token; cells that don't apply are <NA>.
+      • Farfetch: brand_token = first slug token only — multi-word brands
+                  are cut short ("max" for max-mara), so it is not a brand
+      • ASOS:     brand_token = the brand path segment
+      • NA-KD:    brand_token = "na-kd"
+    category_token is the last slug token after dropping the colour (ASOS's
+    "-in-<colour>", NA-KD's trailing colour words), which is what
+    parentcategory has always counted.
+    """
+    import pandas as pd
+
+    s = _string_series(urls)
+    lower = s.str.lower()
+    site = lower.str.extract(HOST_PATTERN, expand=False).replace({"na-kd": "nakd"})
+
+    out = pd.DataFrame(index=s.index, columns=OUTPUT_COLUMNS, dtype="string")
+    out["site"] = site.astype("string")
+
+    for name, pattern in SITE_URL_PATTERNS.items():
+        mask = (site == name).fillna(False)
+        if not mask.any():
+            continue
+        parts = s[mask].str.extract(pattern, flags=re.I)
+        out.loc[mask, "item_id"] = parts["item_id"]
+        slug = parts["slug"].str.lower()
+        out.loc[mask, "slug"] = slug
+        if name == "asos":
+            out.loc[mask, "brand_token"] = parts["brand"].str.lower()
+            slug = slug.str.replace(ASOS_COLOUR_SUFFIX, r"\1", regex=True)
+        elif name == "nakd":
+            out.loc[mask, "brand_token"] = "na-kd"
+            slug = slug.str.replace(NAKD_COLOUR_SUFFIX, "", regex=True)
+        else:
+            out.loc[mask, "brand_token"] = slug.str.split("-").str[0]
+        out.loc[mask, "category_token"] = slug.str.split("-").str[-1]
+
+    return out
+
+
+# ─── SELF-CHECK ────────────────────────────────────────────────────────────────
+# python url_parse.py: the vectorised parser must agree with parse_product_url
+# and pick the expected category token
+EXAMPLES = [
+    ("https://www.farfetch.com/in/shopping/women/max-mara-cashmere-coat-item-27607868.aspx?storeid=9681", "coat"),
+    ("https://www.asos.com/adidas-performance/adidas-football-bayern-munich-t-shirt-in-grey-marl/prd/207197260", "shirt"),
+    ("https://www.asos.com/nike-running/nike-running-2-in-1-shorts-in-black/prd/204512345", "shorts"),
+    ("https://www.asos.com/asos-design/asos-design-built-in-bra-midi-dress-in-black/prd/203998877", "dress"),
+    ("https://www.na-kd.com/en/products/wide-leg-high-waist-jeans-blue-1100-004305-0003", "jeans"),
+    ("https://www.na-kd.com/en/products/satin-slip-dress-light-pink-1018-008776-0094", "dress"),
+]
+
+if __name__ == "__main__":
+    parsed = parse_url_column([url for url, _ in EXAMPLES])
+    for (url, category), (_, row) in zip(EXAMPLES, parsed.iterrows()):
+        assert (row["site"], row["item_id"]) == parse_product_url(url), url
+        assert row["category_token"] == category, (url, row["category_token"])
+    print(f"✅ {len(EXAMPLES)} URLs parse the same both ways")
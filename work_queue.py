@@ -0,0 +1,71 @@
+import concurrent.futures
+from collections import deque
+
+
+class FileJob:
+    """
+    One input file's worth of tasks plus whatever the caller needs to
+    route results back (output path, writer, DataFrame, …) in `ctx`.
+    """
+
+    def __init__(self, name, tasks, ctx=None):
+        self.name = name
+        self.tasks = list(tasks)
+        self.ctx = ctx
+        self.remaining = len(self.tasks)
+        self.failed = 0
+
+
+class CrossFileScheduler:
+    """
+    Runs the tasks of many files as one stream on a single worker pool.
+
+    Workers never wait for a file to finish before starting the next
+    file's tasks; results go back to their own FileJob through
+    `on_result`, and `on_file_done` fires as soon as a file's last task
+    completes.  Both callbacks run on the calling (main) thread, so they
+    can touch per-file state without extra locking.
+    """
+
+    def __init__(self, workers, max_in_flight=None):
+        self.workers = workers
+        self.max_in_flight = max_in_flight or workers * 2
+
+    def run(self, jobs, worker_fn, on_result=None, on_file_done=None):
+        """
+        worker_fn(job, task) runs on a pool thread; on_result(job, task, result, error)
+        and on_file_done(job) run here.  Returns the list of jobs.
+        """
+        jobs = list(jobs)
+        for job in jobs:
+            if not job.tasks and on_file_done:
+                on_file_done(job)
+        stream = deque((job, task) for job in jobs for task in job.tasks)
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=self.workers) as ex:
+            in_flight = {}
+
+            def top_up():
+                # submit lazily so memory doesn't scale with the total task count
+                while stream and len(in_flight) < self.max_in_flight:
+                    job, task = stream.popleft()
+                    in_flight[ex.submit(worker_fn, job, task)] = (job, task)
+
+            top_up()
+            while in_flight:
+                done, _ = concurrent.futures.wait(
+                    in_flight, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for fut in done:
+                    job, task = in_flight.pop(fut)
+                    error = fut.exception()
+                    result = None if error else fut.result()
+                    if error:
+                        job.failed += 1
+                    if on_result:
+                        on_result(job, task, result, error)
+                    job.remaining -= 1
+                    if job.remaining == 0 and on_file_done:
+                        on_file_done(job)
+                top_up()
+        return jobs